@@ -0,0 +1,132 @@
+"""Пропускная способность WSGI и ASGI при параллельных запросах.
+
+Оба приложения вызываются в процессе, без сетевого сервера: WSGI -
+из пула потоков, как его вызывает многопоточный сервер, ASGI - из
+цикла событий, который держит все соединения сразу и отдает работу
+пулу того же размера.
+"""
+import asyncio
+import itertools
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIHandler
+
+from yatube.asgi_handler import WsgiToAsgi, build_environ, run_wsgi
+
+from .runner import percentile, scenario_urls
+
+
+def make_scope(url):
+    parts = urlsplit(url)
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': parts.path,
+        'query_string': parts.query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 0),
+    }
+
+
+def run_wsgi_clients(urls, requests, threads, concurrency):
+    """Запросы к WSGI-приложению: сервер с threads рабочими потоками.
+
+    Клиенты сверх числа потоков ждут свободный поток, как в очереди
+    accept многопоточного сервера; ожидание входит в задержку.
+    """
+    application = WSGIHandler()
+    workers = threading.Semaphore(threads)
+    urls = itertools.islice(itertools.cycle(urls), requests)
+    lock = threading.Lock()
+    results = []
+
+    def client():
+        while True:
+            with lock:
+                url = next(urls, None)
+            if url is None:
+                return
+            started = time.perf_counter()
+            with workers:
+                environ = build_environ(make_scope(url), BytesIO())
+                status, _, _ = run_wsgi(application, environ)
+            results.append((status, time.perf_counter() - started))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(client)
+    return results, time.perf_counter() - started
+
+
+def run_asgi_clients(urls, requests, threads, concurrency):
+    """Запросы к ASGI-приложению от concurrency клиентов сразу"""
+    application = WsgiToAsgi(WSGIHandler(), max_workers=threads)
+    urls = itertools.islice(itertools.cycle(urls), requests)
+    results = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def call(url):
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        started = time.perf_counter()
+        await application(make_scope(url), receive, send)
+        return messages[0]['status'], time.perf_counter() - started
+
+    async def client():
+        for url in urls:
+            results.append(await call(url))
+
+    async def main():
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+
+    started = time.perf_counter()
+    try:
+        asyncio.run(main())
+    finally:
+        application.executor.shutdown()
+    return results, time.perf_counter() - started
+
+
+def summarize(results, elapsed):
+    latencies = [latency * 1000 for _, latency in results]
+    return {
+        'requests': len(results),
+        'errors': sum(status >= 400 for status, _ in results),
+        'throughput_rps': round(len(results) / elapsed, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.5), 3),
+            'p90': round(percentile(latencies, 0.9), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'mean': round(statistics.mean(latencies), 3),
+        },
+    }
+
+
+def run(requests=200, threads=4, concurrency=16):
+    """Сравнить WSGI и ASGI на анонимных страницах набора данных"""
+    urls, _ = scenario_urls()
+    urls = [url for name, url in urls.items() if name != 'follow_index']
+    wsgi = run_wsgi_clients(urls, requests, threads, concurrency)
+    asgi = run_asgi_clients(urls, requests, threads, concurrency)
+    return {
+        'threads': threads,
+        'concurrency': concurrency,
+        'wsgi': summarize(*wsgi),
+        'asgi': summarize(*asgi),
+    }
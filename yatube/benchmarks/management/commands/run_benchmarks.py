@@ -0,0 +1,115 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from benchmarks import concurrency, runner, seed, sqlite
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет отдельную тестовую базу синтетическими данными и '
+        'замеряет задержку и число запросов основных страниц'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--follows', type=int, default=10)
+        parser.add_argument('--comments', type=int, default=2000)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='Не сбрасывать кеш перед каждым запросом',
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=runner.SCENARIOS,
+            help='Сценарий для замера; по умолчанию все',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=0,
+            help='Сравнить WSGI и ASGI при стольких параллельных клиентах',
+        )
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--sqlite-clients',
+            type=int,
+            default=0,
+            help=(
+                'Сравнить настройки SQLite при стольких параллельных '
+                'клиентах: половина читает главную, половина '
+                'комментирует; база создается в файле'
+            ),
+        )
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл для JSON-отчета, "-" - стандартный вывод',
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        # Как в тестах: замеряем боевой режим, без отладочной панели
+        settings.DEBUG = False
+        old_name = connection.settings_dict['NAME']
+        directory = None
+        if options['sqlite_clients']:
+            # У базы в памяти нет журнала, сравнивать нечего
+            directory = tempfile.mkdtemp()
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                directory, 'benchmark.sqlite3'
+            )
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            dataset = seed.seed(
+                users=options['users'],
+                posts=options['posts'],
+                follows=options['follows'],
+                comments=options['comments'],
+                groups=options['groups'],
+                random_seed=options['seed'],
+            )
+            report = runner.run(
+                repeat=options['repeat'],
+                cold=not options['warm_cache'],
+                scenarios=options['scenario'] or runner.SCENARIOS,
+            )
+            if options['concurrency']:
+                report['concurrency'] = concurrency.run(
+                    requests=options['requests'],
+                    threads=options['threads'],
+                    concurrency=options['concurrency'],
+                )
+            if options['sqlite_clients']:
+                writers = options['sqlite_clients'] // 2
+                report['sqlite'] = sqlite.run(
+                    requests=options['requests'],
+                    readers=options['sqlite_clients'] - writers,
+                    writers=writers,
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            if directory is not None:
+                shutil.rmtree(directory, ignore_errors=True)
+        report['dataset'] = dataset
+        data = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(data)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(data + '\n')
@@ -0,0 +1,119 @@
+"""Замер задержки и числа запросов к базе для страниц yatube.
+
+Каждая страница запрашивается тестовым клиентом Django заданное число
+раз; по замерам считаются перцентили задержки, по перехваченным
+запросам - их число и суммарное время в базе.
+"""
+import statistics
+import time
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Follow, Group, Post
+from yatube.middleware import QueryCollector
+
+User = get_user_model()
+
+SCENARIOS = ('index', 'follow_index', 'profile', 'group_posts', 'post_view')
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(share * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def scenario_urls():
+    """Адреса страниц на типичных объектах набора данных"""
+    reader = User.objects.filter(
+        pk__in=Follow.objects.values('user')
+    ).order_by('pk').first()
+    author = User.objects.filter(
+        pk__in=Post.objects.values('author')
+    ).order_by('pk').first()
+    group = Group.objects.order_by('pk').first()
+    post = Post.objects.select_related('author').order_by('-pub_date').first()
+    urls = {'index': reverse('index')}
+    if reader is not None:
+        urls['follow_index'] = reverse('follow_index')
+    if author is not None:
+        urls['profile'] = reverse(
+            'profile', kwargs={'username': author.username}
+        )
+    if group is not None:
+        urls['group_posts'] = reverse(
+            'group_posts', kwargs={'slug': group.slug}
+        )
+    if post is not None:
+        urls['post_view'] = reverse(
+            'post_view',
+            kwargs={'username': post.author.username, 'post_id': post.pk}
+        )
+    return urls, reader
+
+
+def measure(client, url, repeat, cold=True):
+    latencies = []
+    queries = []
+    db_times = []
+    status = None
+    for _ in range(repeat):
+        if cold:
+            cache.clear()
+        # Обертка execute видит и запросы из потоков posts.fanout
+        collector = QueryCollector()
+        with connection.execute_wrapper(collector):
+            started = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - started) * 1000)
+        status = response.status_code
+        queries.append(collector.count)
+        db_times.append(collector.time * 1000)
+    return {
+        'url': url,
+        'status': status,
+        'requests': repeat,
+        'latency_ms': {
+            'min': round(min(latencies), 3),
+            'p50': round(percentile(latencies, 0.5), 3),
+            'p90': round(percentile(latencies, 0.9), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'max': round(max(latencies), 3),
+            'mean': round(statistics.mean(latencies), 3),
+        },
+        'queries': {
+            'min': min(queries),
+            'max': max(queries),
+        },
+        'db_time_ms': round(statistics.mean(db_times), 3),
+    }
+
+
+def run(repeat=20, cold=True, scenarios=SCENARIOS):
+    """Прогнать сценарии; вернуть отчет, пригодный для json.dump"""
+    urls, reader = scenario_urls()
+    anonymous = Client()
+    authorized = Client()
+    if reader is not None:
+        authorized.force_login(reader)
+    results = {}
+    for name in scenarios:
+        if name not in urls:
+            continue
+        client = authorized if name == 'follow_index' else anonymous
+        measure(client, urls[name], 1, cold)  # прогрев шаблонов и импорта
+        results[name] = measure(client, urls[name], repeat, cold)
+    return {
+        'created': timezone.now().isoformat(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'repeat': repeat,
+        'cold_cache': cold,
+        'results': results,
+    }
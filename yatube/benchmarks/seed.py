@@ -0,0 +1,102 @@
+"""Синтетический набор данных заданного размера для замеров.
+
+Генерация детерминирована (random.Random с фиксированным seed), поэтому
+два прогона на разных версиях кода меряют одни и те же данные.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from posts import search, stats, timeline
+from posts.dump import keep_dates
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+WORDS = (
+    'яндекс практикум пост лента подписка группа комментарий '
+    'кот собака море горы поход фото новости код django python'
+).split()
+
+
+def text(rnd, words=20):
+    return ' '.join(rnd.choice(WORDS) for _ in range(words))
+
+
+def seed(users=100, posts=1000, follows=10, comments=2000, groups=10,
+         random_seed=42):
+    """Заполнить базу; вернуть описание набора данных"""
+    rnd = random.Random(random_seed)
+    User.objects.bulk_create(
+        User(username=f'bench_user_{i}') for i in range(users)
+    )
+    user_ids = list(
+        User.objects.filter(username__startswith='bench_user_')
+        .values_list('pk', flat=True)
+    )
+    Group.objects.bulk_create(
+        Group(
+            title=f'Группа {i}',
+            slug=f'bench-group-{i}',
+            description=text(rnd),
+        )
+        for i in range(groups)
+    )
+    group_ids = list(
+        Group.objects.filter(slug__startswith='bench-group-')
+        .values_list('pk', flat=True)
+    )
+    now = timezone.now()
+    with keep_dates():
+        Post.objects.bulk_create(
+            (
+                Post(
+                    text=text(rnd, rnd.randint(5, 60)),
+                    author_id=rnd.choice(user_ids),
+                    group_id=rnd.choice(group_ids + [None]),
+                    pub_date=now - timedelta(minutes=rnd.randint(0, 10 ** 6)),
+                )
+                for _ in range(posts)
+            )
+        )
+        post_ids = list(
+            Post.objects.filter(author_id__in=user_ids)
+            .values_list('pk', flat=True)
+        )
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    post_id=rnd.choice(post_ids),
+                    author_id=rnd.choice(user_ids),
+                    text=text(rnd, 10),
+                    created=now,
+                )
+                for _ in range(comments if post_ids else 0)
+            )
+        )
+    Follow.objects.bulk_create(
+        (
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id in user_ids
+            for author_id in rnd.sample(
+                user_ids, min(follows, len(user_ids))
+            )
+            if author_id != user_id
+        ),
+        ignore_conflicts=True,
+    )
+    # bulk_create не шлет сигналы: строим производные данные сами
+    stats.recount(user_ids)
+    for user_id in user_ids:
+        timeline.rebuild(user_id)
+    search.get_backend().rebuild()
+    return {
+        'users': users,
+        'posts': posts,
+        'follows_per_user': follows,
+        'comments': comments,
+        'groups': groups,
+        'random_seed': random_seed,
+    }
@@ -0,0 +1,157 @@
+"""Пропускная способность SQLite до и после настройки соединений.
+
+Читатели запрашивают главную страницу и профиль (его запросы идут
+через потоки posts.fanout), писатели одновременно отправляют
+комментарии к одному посту. Прогон повторяется для профилей
+соединения: default - журнал отката и новое соединение на запрос, как
+у django.db.backends.sqlite3 без настроек; tuned - PRAGMA из
+SQLITE_PRAGMAS и CONN_MAX_AGE. В отчете - и число открытых за прогон
+соединений и записанных комментариев. Кеш на время замера отключен,
+чтобы каждый запрос доходил до базы.
+
+Имеет смысл только на файловой базе: у базы в памяти нет журнала.
+"""
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+from .concurrency import summarize
+
+User = get_user_model()
+
+NO_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+}
+
+
+def profiles():
+    return {
+        'default': {
+            # Режим WAL сохраняется в файле базы, поэтому его
+            # нужно явно выключить
+            'PRAGMAS': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+            'CONN_MAX_AGE': 0,
+        },
+        'tuned': {
+            'PRAGMAS': settings.SQLITE_PRAGMAS,
+            'CONN_MAX_AGE': settings.DATABASES['default']['CONN_MAX_AGE'],
+        },
+    }
+
+
+def run_clients(clients, requests):
+    """Запросы clients [(вид, клиент, метод, адрес, данные)] по кругу"""
+    results = {kind: [] for kind, *_ in clients}
+    budget = itertools.count()
+    lock = threading.Lock()
+
+    def client(kind, http, method, url, data):
+        try:
+            while True:
+                with lock:
+                    if next(budget) >= requests:
+                        return
+                started = time.perf_counter()
+                try:
+                    status = getattr(http, method)(url, data).status_code
+                except DatabaseError:
+                    # "database is locked" после busy_timeout
+                    status = 500
+                results[kind].append((status, time.perf_counter() - started))
+                # Как request_finished сервера: соединение закрывается,
+                # если CONN_MAX_AGE истек или равен нулю
+                close_old_connections()
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        for args in clients:
+            executor.submit(client, *args)
+    return results, time.perf_counter() - started
+
+
+class ConnectionCounter:
+    """Число соединений, открытых за время блока with"""
+
+    def __init__(self):
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, **kwargs):
+        with self.lock:
+            self.count += 1
+
+    def __enter__(self):
+        connection_created.connect(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        connection_created.disconnect(self)
+
+
+def make_clients(readers, writers):
+    post = Post.objects.select_related('author').order_by('-pub_date').first()
+    writer = User.objects.order_by('pk').first()
+    comment_url = reverse(
+        'add_comment',
+        kwargs={'username': post.author.username, 'post_id': post.pk}
+    )
+    read_urls = itertools.cycle((
+        reverse('index'),
+        reverse('profile', kwargs={'username': post.author.username}),
+    ))
+    clients = []
+    for url in itertools.islice(read_urls, readers):
+        clients.append(('read', Client(), 'get', url, None))
+    for number in range(writers):
+        http = Client()
+        http.force_login(writer)
+        clients.append((
+            'write', http, 'post', comment_url,
+            {'text': f'Комментарий из замера {number}'},
+        ))
+    return clients
+
+
+def run(requests=200, readers=4, writers=4):
+    """Замерить чтение и запись под нагрузкой в каждом профиле"""
+    database = connections.databases['default']
+    original = {
+        key: database.get(key) for key in ('PRAGMAS', 'CONN_MAX_AGE')
+    }
+    clients = make_clients(readers, writers)
+    report = {'readers': readers, 'writers': writers}
+    try:
+        with override_settings(CACHES=NO_CACHE, WRITE_BUFFER_ENABLED=False):
+            for name, profile in profiles().items():
+                connections.close_all()
+                database.update(profile)
+                # Режим журнала переключается одним соединением,
+                # пока клиенты еще не подключились
+                connections['default'].ensure_connection()
+                comments = Comment.objects.count()
+                with ConnectionCounter() as counter:
+                    results, elapsed = run_clients(clients, requests)
+                report[name] = {
+                    kind: summarize(items, elapsed)
+                    for kind, items in results.items() if items
+                }
+                report[name]['connections'] = counter.count
+                report[name]['comments'] = (
+                    Comment.objects.count() - comments
+                )
+    finally:
+        connections.close_all()
+        database.update(original)
+    return report
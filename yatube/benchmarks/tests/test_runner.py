@@ -0,0 +1,79 @@
+import json
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+
+from posts.models import AuthorStats, Post, TimelineEntry
+
+from .. import runner, seed, sqlite
+
+
+class BenchmarkTests(TestCase):
+    def test_seed_builds_dataset(self):
+        """seed создает данные и производные таблицы"""
+        dataset = seed.seed(users=5, posts=20, follows=2, comments=10,
+                            groups=2)
+        self.assertEqual(dataset['posts'], 20)
+        self.assertEqual(Post.objects.count(), 20)
+        self.assertTrue(TimelineEntry.objects.exists())
+        self.assertEqual(AuthorStats.objects.count(), 5)
+
+    def test_run_reports_every_scenario(self):
+        """Отчет содержит задержки и число запросов по всем сценариям"""
+        seed.seed(users=5, posts=20, follows=2, comments=10, groups=2)
+        report = runner.run(repeat=2)
+        self.assertEqual(set(report['results']), set(runner.SCENARIOS))
+        for name, result in report['results'].items():
+            with self.subTest(name=name):
+                self.assertEqual(result['status'], 200)
+                self.assertGreater(result['queries']['max'], 0)
+                self.assertLessEqual(
+                    result['latency_ms']['p50'], result['latency_ms']['max']
+                )
+
+
+class SQLiteBenchmarkTests(SimpleTestCase):
+    """Замер в отдельном процессе: run_benchmarks создает файловую базу,
+    у тестовой базы в памяти нет журнала и закрытия соединений"""
+
+    def run_command(self, *args):
+        process = subprocess.run(
+            [sys.executable, 'manage.py', 'run_benchmarks', *args],
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True,
+        )
+        return json.loads(process.stdout)
+
+    def test_reports_every_profile(self):
+        """Замер SQLite отчитывается по чтению и записи в профилях"""
+        clients = 4
+        requests = 20
+        report = self.run_command(
+            '--users', '5', '--posts', '20', '--follows', '2',
+            '--comments', '10', '--groups', '2', '--repeat', '1',
+            '--scenario', 'index', '--sqlite-clients', str(clients),
+            '--requests', str(requests),
+        )['sqlite']
+        for name in sqlite.profiles():
+            with self.subTest(name=name):
+                self.assertEqual(
+                    set(report[name]),
+                    {'read', 'write', 'connections', 'comments'},
+                )
+                result = report[name]['write']
+                # Комментарий пишется в одной транзакции с обработчиками
+                # post_save: ответ 500 значит, что записи нет
+                self.assertEqual(result['errors'], 0)
+                self.assertEqual(report[name]['comments'], result['requests'])
+        # Без CONN_MAX_AGE каждый запрос открывает новое соединение
+        self.assertGreaterEqual(report['default']['connections'], requests)
+        # С CONN_MAX_AGE каждый поток клиентов и пула posts.fanout
+        # открывает соединение один раз, плюс соединение замера
+        self.assertLessEqual(
+            report['tuned']['connections'],
+            clients + settings.VIEW_FANOUT_WORKERS + 1,
+        )
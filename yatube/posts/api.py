@@ -0,0 +1,240 @@
+"""Легкое JSON API для лент и страницы поста.
+
+Записи выбираются через values() - только нужные поля, без создания
+моделей и без шаблонов. ETag строится по тем же счетчикам versioning,
+что и кеш HTML-страницы, и проверяется до обращения к базе, поэтому
+неизменившаяся лента отвечает 304 сразу. Last-Modified - самое позднее
+изменение поста или комментария на странице.
+"""
+import hashlib
+from calendar import timegm
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db.models import Max
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+
+from . import repository, stats, timeline, versioning
+from .models import Comment, Post
+from .paginator import CursorPaginator
+from .views import COMMENTS_PER_PAGE, MAX_POST_PER_PAGE
+
+User = get_user_model()
+
+# Поле ответа - путь в values()
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+    'comment_count': 'comment_count',
+}
+
+COMMENT_FIELDS = {
+    'id': 'id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+
+
+def make_etag(request, names, private=False):
+    """ETag по версиям страницы, адресу и, для личных лент, пользователю"""
+    versions = versioning.get_versions(*names)
+    parts = [f'{name}={versions[name]}' for name in names]
+    parts.append(request.get_full_path())
+    if private:
+        parts.append(str(request.user.pk))
+    return quote_etag(hashlib.md5(':'.join(parts).encode()).hexdigest())
+
+
+def respond(request, etag, load, private=False):
+    """JSON-ответ с ETag и Last-Modified или 304.
+
+    load() возвращает данные и время последнего изменения; если ETag
+    клиента совпал, она не вызывается.
+    """
+    response = None
+    if request.META.get('HTTP_IF_NONE_MATCH'):
+        response = get_conditional_response(request, etag=etag)
+    last_modified = None
+    if response is None:
+        data, modified = load()
+        if modified is not None:
+            last_modified = timegm(modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = JsonResponse(
+                data, json_dumps_params={'ensure_ascii': False}
+            )
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Клиент хранит копию, но перепроверяет ее при каждом запросе
+    patch_cache_control(response, no_cache=True, private=private)
+    return response
+
+
+def serialize(row, fields):
+    data = {name: row[source] for name, source in fields.items()}
+    if 'image' in data:
+        data['image'] = (
+            default_storage.url(data['image']) if data['image'] else None
+        )
+    return data
+
+
+def page_links(request, page):
+    def link(cursor):
+        return f'{request.path}?cursor={cursor}' if cursor else None
+    return link(page.next_cursor), link(page.previous_cursor)
+
+
+def newest(*dates):
+    dates = [date for date in dates if date is not None]
+    return max(dates) if dates else None
+
+
+def load_feed(request, post_list, ordering=('-pub_date', '-id')):
+    """Функция загрузки страницы ленты для respond()"""
+    def load():
+        keys = [name.lstrip('-') for name in ordering] + ['updated_at']
+        rows = post_list.values(
+            *POST_FIELDS.values(),
+            *(name for name in keys if name not in POST_FIELDS.values()),
+        )
+        paginator = CursorPaginator(
+            rows,
+            MAX_POST_PER_PAGE,
+            ordering=ordering,
+            with_count=False,
+        )
+        page = paginator.get_page(request.GET.get('cursor'))
+        next_url, previous_url = page_links(request, page)
+        comments = Comment.objects.filter(
+            post_id__in=[row['id'] for row in page]
+        ).aggregate(newest=Max('created'))
+        modified = newest(
+            comments['newest'], *(row['updated_at'] for row in page)
+        )
+        data = {
+            'results': [serialize(row, POST_FIELDS) for row in page],
+            'next': next_url,
+            'previous': previous_url,
+        }
+        return data, modified
+    return load
+
+
+@require_GET
+def index(request):
+    post_list = Post.objects.for_feed()
+    return respond(
+        request,
+        make_etag(request, [versioning.FEED]),
+        load_feed(request, post_list),
+    )
+
+
+@require_GET
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Требуется авторизация'}, status=401
+        )
+    post_list = timeline.timeline_posts(request.user).for_feed()
+    return respond(
+        request,
+        make_etag(
+            request,
+            [versioning.FEED, versioning.timeline(request.user.pk)],
+            private=True,
+        ),
+        load_feed(request, post_list, timeline.ORDERING),
+        private=True,
+    )
+
+
+@require_GET
+def group_posts(request, slug):
+    group = repository.get_group(slug)
+    if group is None:
+        raise Http404
+    load_posts = load_feed(request, group.posts.for_feed())
+
+    def load():
+        data, modified = load_posts()
+        data['group'] = {
+            'title': group.title,
+            'slug': group.slug,
+            'description': group.description,
+        }
+        return data, modified
+    return respond(
+        request, make_etag(request, [versioning.group(slug)]), load
+    )
+
+
+@require_GET
+def profile(request, username):
+    author = repository.get_user(username)
+    if author is None:
+        raise Http404
+    load_posts = load_feed(request, author.posts.for_feed())
+
+    def load():
+        data, modified = load_posts()
+        author_stats = stats.for_author(author)
+        data['author'] = {
+            'username': author.username,
+            'full_name': author.get_full_name(),
+            'posts_count': author_stats.posts_count,
+            'followers_count': author_stats.followers_count,
+            'following_count': author_stats.following_count,
+        }
+        return data, modified
+    return respond(
+        request, make_etag(request, [versioning.profile(username)]), load
+    )
+
+
+@require_GET
+def post_view(request, post_id):
+    def load():
+        post = get_object_or_404(
+            Post.objects.for_feed().values(
+                *POST_FIELDS.values(), 'updated_at'
+            ),
+            pk=post_id,
+        )
+        comments = Comment.objects.filter(post_id=post_id).values(
+            *COMMENT_FIELDS.values()
+        )
+        page = CursorPaginator(
+            comments,
+            COMMENTS_PER_PAGE,
+            ordering=('created', 'id'),
+            with_count=False,
+        ).get_page(request.GET.get('cursor'))
+        next_url, previous_url = page_links(request, page)
+        newest_comment = Comment.objects.filter(
+            post_id=post_id
+        ).aggregate(newest=Max('created'))['newest']
+        data = {
+            'post': serialize(post, POST_FIELDS),
+            'comments': [serialize(row, COMMENT_FIELDS) for row in page],
+            'next': next_url,
+            'previous': previous_url,
+        }
+        return data, newest(post['updated_at'], newest_comment)
+    return respond(
+        request, make_etag(request, [versioning.post(post_id)]), load
+    )
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import api
+
+urlpatterns = [
+    path("posts/", api.index, name="api_index"),
+    path("posts/<int:post_id>/", api.post_view, name="api_post"),
+    path("follow/", api.follow_index, name="api_follow_index"),
+    path("group/<slug:slug>/", api.group_posts, name="api_group_posts"),
+    path("profile/<str:username>/", api.profile, name="api_profile"),
+]
@@ -0,0 +1,71 @@
+"""Кеш отрендеренных карточек постов.
+
+Карточка поста в ленте (include/post_card.html) меняется редко, а
+рендер каждой стоит linebreaksbr, нескольких {% url %} и тега
+картинки. Карточка кешируется целиком под ключом из id поста, его
+updated_at и числа комментариев: правка или новый комментарий дают
+новый ключ, а старая запись уходит по TTL. Переименование группы
+сдвигает общую версию CARDS.
+
+Ссылка "Редактировать" зависит от зрителя, поэтому в кеш карточка
+попадает с меткой на ее месте, а ссылка подставляется при сборке.
+Страница собирается одним cache.get_many на все свои карточки.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from yatube.metrics import registry
+
+from . import versioning
+
+KEY_PREFIX = 'posts:card:'
+
+# Метка места ссылок автора в закешированной карточке
+ACTIONS_MARKER = mark_safe('<!-- post-actions -->')
+
+
+def make_key(post, version):
+    updated = post.updated_at.timestamp() if post.updated_at else ''
+    comments = getattr(post, 'comment_count', '')
+    return f'{KEY_PREFIX}{version}:{post.pk}:{updated}:{comments}'
+
+
+def render_card(post):
+    return render_to_string(
+        'include/post_card.html',
+        {'post': post, 'actions': ACTIONS_MARKER},
+    )
+
+
+def render_actions(post, user):
+    """Ссылки карточки, которые видит только автор поста"""
+    if user is None or user.pk != post.author_id:
+        return ''
+    return render_to_string('include/post_actions.html', {'post': post})
+
+
+def render_cards(posts, user=None):
+    """HTML карточек постов в их порядке, для зрителя user"""
+    posts = list(posts)
+    if not posts:
+        return []
+    version = versioning.get_version(versioning.CARDS)
+    keys = [make_key(post, version) for post in posts]
+    cards = cache.get_many(keys)
+    missing = {}
+    for key, post in zip(keys, posts):
+        if key in cards:
+            registry.record_cache('post_card', 'hit')
+            continue
+        registry.record_cache('post_card', 'miss')
+        missing[key] = render_card(post)
+    if missing:
+        cache.set_many(missing, timeout=settings.POST_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    html = []
+    for key, post in zip(keys, posts):
+        before, _, after = cards[key].partition(ACTIONS_MARKER)
+        html.append(before + render_actions(post, user) + after)
+    return [mark_safe(card) for card in html]
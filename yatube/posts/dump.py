@@ -0,0 +1,253 @@
+"""Потоковая выгрузка и загрузка постов, комментариев, подписок и групп.
+
+Формат - JSON Lines (одна запись на строку, поле "model" указывает
+модель) или CSV с одной моделью на файл. Пользователи передаются
+по username, поэтому дамп переносится между базами с разными id.
+Чтение идет чанками через iterator(), запись - bulk_create пачками,
+так что память не зависит от размера дампа.
+"""
+import csv
+import json
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import repository, versioning
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Модели в порядке зависимостей: поля и поля-ссылки на пользователей
+MODELS = {
+    'group': (Group, ('id', 'title', 'slug', 'description'), ()),
+    'post': (
+        Post,
+        ('id', 'text', 'pub_date', 'author', 'group', 'image'),
+        ('author',),
+    ),
+    'comment': (
+        Comment,
+        ('id', 'post', 'author', 'text', 'created'),
+        ('author',),
+    ),
+    'follow': (Follow, ('id', 'user', 'author'), ('user', 'author')),
+}
+
+DATETIME_FIELDS = ('pub_date', 'created')
+FOREIGN_KEYS = ('group', 'post')
+
+
+def export_rows(model_name, chunk_size):
+    """Записи модели словарями, без загрузки всей таблицы в память"""
+    model, fields, user_fields = MODELS[model_name]
+    columns = [
+        f'{name}__username' if name in user_fields
+        else f'{name}_id' if name in FOREIGN_KEYS
+        else name
+        for name in fields
+    ]
+    rows = model.objects.order_by('pk').values_list(*columns)
+    for row in rows.iterator(chunk_size=chunk_size):
+        record = dict(zip(fields, row))
+        for name in DATETIME_FIELDS:
+            if record.get(name) is not None:
+                record[name] = record[name].isoformat()
+        yield record
+
+
+def write_jsonl(stream, model_names, chunk_size):
+    count = 0
+    for model_name in model_names:
+        for record in export_rows(model_name, chunk_size):
+            record = {'model': model_name, **record}
+            stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def write_csv(stream, model_name, chunk_size):
+    writer = csv.DictWriter(stream, fieldnames=MODELS[model_name][1])
+    writer.writeheader()
+    count = 0
+    for record in export_rows(model_name, chunk_size):
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def read_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            record = json.loads(line)
+            yield record.pop('model'), record
+
+
+def read_csv(stream, model_name):
+    for record in csv.DictReader(stream):
+        yield model_name, {
+            name: (value if value != '' else None)
+            for name, value in record.items()
+        }
+
+
+@contextmanager
+def keep_dates():
+    """Не затирать даты из дампа текущим временем (auto_now_add)"""
+    fields = [
+        Post._meta.get_field('pub_date'),
+        Comment._meta.get_field('created'),
+    ]
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+class Loader:
+    """Копит записи по моделям и сбрасывает их пачками bulk_create.
+
+    bulk_create не шлет сигналов, поэтому загрузчик сам удаляет из
+    кеша посты с новыми комментариями и собирает в versions счетчики
+    versioning страниц, на которых видны записи.
+    """
+
+    def __init__(self, batch_size, ignore_conflicts=False,
+                 create_users=False):
+        self.batch_size = batch_size
+        self.ignore_conflicts = ignore_conflicts
+        self.create_users = create_users
+        self.buffers = {model_name: [] for model_name in MODELS}
+        self.loaded = {model_name: 0 for model_name in MODELS}
+        self.versions = set()
+
+    def add(self, model_name, record):
+        if model_name not in MODELS:
+            raise ValueError(f'Неизвестная модель в дампе: {model_name}')
+        buffer = self.buffers[model_name]
+        buffer.append(record)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # Сбрасываем все буферы в порядке зависимостей: пост не должен
+        # попасть в базу раньше своей группы
+        for model_name, buffer in self.buffers.items():
+            if buffer:
+                self.save(model_name, buffer)
+                self.loaded[model_name] += len(buffer)
+                buffer.clear()
+
+    def resolve_users(self, records, user_fields):
+        usernames = {
+            record[name] for record in records for name in user_fields
+        }
+        users = dict(
+            User.objects.filter(username__in=usernames)
+            .values_list('username', 'pk')
+        )
+        missing = usernames - set(users)
+        if missing and self.create_users:
+            User.objects.bulk_create(
+                (User(username=username) for username in missing),
+                ignore_conflicts=True,
+            )
+            users.update(
+                User.objects.filter(username__in=missing)
+                .values_list('username', 'pk')
+            )
+            missing = usernames - set(users)
+        if missing:
+            raise ValueError(
+                f'Нет пользователей: {", ".join(sorted(missing))}'
+            )
+        return users
+
+    def save(self, model_name, records):
+        model, fields, user_fields = MODELS[model_name]
+        users = self.resolve_users(records, user_fields)
+        objects = []
+        for record in records:
+            values = {}
+            for name in fields:
+                value = record.get(name)
+                if name in user_fields:
+                    values[f'{name}_id'] = users[value]
+                elif name in FOREIGN_KEYS:
+                    values[f'{name}_id'] = int(value) if value else None
+                elif name in DATETIME_FIELDS:
+                    values[name] = (
+                        parse_datetime(value) if value else timezone.now()
+                    )
+                elif name == 'id':
+                    values[name] = int(value) if value else None
+                else:
+                    values[name] = value if value is not None else ''
+            objects.append(model(**values))
+        with transaction.atomic():
+            model.objects.bulk_create(
+                objects,
+                batch_size=self.batch_size,
+                ignore_conflicts=self.ignore_conflicts,
+            )
+        if model is Comment:
+            # Закешированный пост хранит число комментариев
+            repository.invalidate(
+                Post, *{comment.post_id for comment in objects}
+            )
+        usernames = {pk: username for username, pk in users.items()}
+        self.versions.update(self.page_versions(objects, usernames))
+
+    def page_versions(self, objects, usernames):
+        """Версии страниц групп, профилей и постов с этими объектами"""
+        names = set()
+        group_ids = set()
+        post_ids = set()
+        for obj in objects:
+            if isinstance(obj, Group):
+                names.add(versioning.group(obj.slug))
+            elif isinstance(obj, Post):
+                names.add(versioning.profile(usernames[obj.author_id]))
+                group_ids.add(obj.group_id)
+                if obj.pk is not None:
+                    names.add(versioning.post(obj.pk))
+            elif isinstance(obj, Comment):
+                # Число комментариев видно во всех лентах с постом
+                post_ids.add(obj.post_id)
+            else:
+                names.update((
+                    versioning.profile(usernames[obj.user_id]),
+                    versioning.profile(usernames[obj.author_id]),
+                    versioning.timeline(obj.user_id),
+                ))
+        posts = Post.objects.filter(pk__in=post_ids).values_list(
+            'pk', 'author__username', 'group_id'
+        )
+        for pk, username, group_id in posts:
+            names.update((versioning.post(pk), versioning.profile(username)))
+            group_ids.add(group_id)
+        slugs = Group.objects.filter(pk__in=group_ids).values_list(
+            'slug', flat=True
+        )
+        names.update(map(versioning.group, slugs))
+        return names
+
+
+def load(records, batch_size, ignore_conflicts=False, create_users=False):
+    """Загрузить записи (пары модель, словарь).
+
+    Вернуть число записей по моделям и версии страниц, которые нужно
+    сдвинуть после загрузки.
+    """
+    loader = Loader(batch_size, ignore_conflicts, create_users)
+    with keep_dates():
+        for model_name, record in records:
+            loader.add(model_name, record)
+        loader.flush()
+    return loader.loaded, loader.versions
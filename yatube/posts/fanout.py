@@ -0,0 +1,72 @@
+"""Параллельное выполнение независимых запросов страницы.
+
+Страница профиля ждет подряд посты, статистику автора и статус
+подписки, хотя эти запросы не зависят друг от друга. gather()
+выполняет их в пуле потоков, и задержка страницы определяется самым
+долгим запросом, а не суммой. У каждого потока свое соединение с
+базой, поэтому внутри транзакции (ATOMIC_REQUESTS, тесты) запросы
+выполняются по очереди: другие соединения не видят ее изменений.
+"""
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+
+from yatube import routers
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.VIEW_FANOUT_WORKERS,
+                thread_name_prefix='fanout',
+            )
+            atexit.register(_executor.shutdown)
+        return _executor
+
+
+def run_in_thread(func, wrappers, replica):
+    try:
+        with ExitStack() as stack:
+            stack.enter_context(routers.replica_reads(replica))
+            # Обертки execute (замеры запросов) переносятся из потока
+            # запроса, чтобы запросы потока учитывались в его метриках
+            for alias, items in wrappers.items():
+                for wrapper in items:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(wrapper)
+                    )
+            return func()
+    finally:
+        # Как в конце запроса: соединение потока пула живет
+        # CONN_MAX_AGE и переиспользуется следующими задачами
+        close_old_connections()
+
+
+def gather(*funcs):
+    """Вызвать функции параллельно; вернуть результаты в том же порядке"""
+    if (
+        not settings.VIEW_FANOUT_WORKERS
+        or len(funcs) < 2
+        or connection.in_atomic_block
+    ):
+        return [func() for func in funcs]
+    wrappers = {
+        alias: list(connections[alias].execute_wrappers)
+        for alias in connections
+    }
+    replica = routers.use_replica()
+    executor = get_executor()
+    futures = [
+        executor.submit(run_in_thread, func, wrappers, replica)
+        for func in funcs
+    ]
+    return [future.result() for future in futures]
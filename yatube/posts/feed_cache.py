@@ -0,0 +1,84 @@
+"""Кеширование дорогих фрагментов ленты без «давки» при истечении.
+
+Обычный {% cache %} после истечения TTL или сдвига версии ленты
+отдает промах всем процессам сразу, и каждый заново рендерит ленту.
+Здесь промах рендерит один процесс под блокировкой, а остальные
+коротко ждут его результат. Кроме того, незадолго до истечения
+TTL фрагмент обновляется досрочно с вероятностью, растущей по мере
+приближения срока (XFetch, Vattani et al.): пока один процесс
+обновляет, остальные отдают текущую копию.
+"""
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+from yatube.metrics import registry
+
+# Чем больше, тем раньше начинается досрочное обновление
+BETA = 1.0
+
+# Сколько держится блокировка рендера, если процесс упал
+LOCK_TIMEOUT = 10
+
+# Сколько ждать чужой рендер при промахе, прежде чем рендерить самому
+LOCK_WAIT = 0.5
+POLL_INTERVAL = 0.05
+
+
+def lock_key(key):
+    return f'{key}:lock'
+
+
+def should_refresh(expires, delta, now):
+    return now - delta * BETA * math.log(random.random()) >= expires
+
+
+def render_and_store(key, timeout, render):
+    started = time.monotonic()
+    value = render()
+    delta = time.monotonic() - started
+    expires = None if timeout is None else time.time() + timeout
+    # Запись живет дольше своего срока: пока идет досрочное
+    # обновление, остальные процессы отдают текущую копию
+    physical = None if timeout is None else timeout * 2
+    cache.set(key, (value, expires, delta), physical)
+    return value
+
+
+def wait_for(key):
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_render(key, timeout, render, name):
+    """Фрагмент из кеша или render() с защитой от одновременного рендера"""
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires, delta = entry
+        if expires is None or not should_refresh(expires, delta, time.time()):
+            registry.record_cache(name, 'hit')
+            return value
+        if not cache.add(lock_key(key), 1, LOCK_TIMEOUT):
+            registry.record_cache(name, 'stale')
+            return value
+        registry.record_cache(name, 'refresh')
+    elif not cache.add(lock_key(key), 1, LOCK_TIMEOUT):
+        entry = wait_for(key)
+        if entry is not None:
+            registry.record_cache(name, 'wait')
+            return entry[0]
+        registry.record_cache(name, 'miss')
+        return render_and_store(key, timeout, render)
+    else:
+        registry.record_cache(name, 'miss')
+    try:
+        return render_and_store(key, timeout, render)
+    finally:
+        cache.delete(lock_key(key))
@@ -0,0 +1,137 @@
+"""Ленты RSS и Atom: весь сайт, группа и автор.
+
+Лента - последние SYNDICATION_ITEMS постов одним запросом по индексу
+(pub_date, id) источника. Готовый документ кешируется целиком
+(posts.page_cache) до сдвига версии источника, а читатели лент,
+опрашивающие сайт каждые несколько минут, получают 304 по ETag или
+If-Modified-Since без обращения к базе.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.http import Http404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from . import repository, versioning
+from .models import Post
+from .page_cache import cache_anonymous_page
+
+User = get_user_model()
+
+
+class PostsFeed(Feed):
+    title = 'Yatube: последние записи'
+    description = 'Новые посты всех авторов'
+
+    def link(self):
+        return reverse('index')
+
+    def get_posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.get_posts(obj).select_related(
+            'author', 'group'
+        ).order_by('-pub_date', '-id')[:settings.SYNDICATION_ITEMS]
+
+    def item_title(self, item):
+        return Truncator(item.text).words(10)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse(
+            'post_view',
+            kwargs={'username': item.author.username, 'post_id': item.pk}
+        )
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_categories(self, item):
+        return [item.group.title] if item.group_id else []
+
+
+class GroupFeed(PostsFeed):
+    def get_object(self, request, slug):
+        group = repository.get_group(slug)
+        if group is None:
+            raise Http404
+        return group
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('group_posts', kwargs={'slug': obj.slug})
+
+    def get_posts(self, obj):
+        return obj.posts.all()
+
+
+class AuthorFeed(PostsFeed):
+    def get_object(self, request, username):
+        author = repository.get_user(username)
+        if author is None:
+            raise Http404
+        return author
+
+    def title(self, obj):
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def description(self, obj):
+        return f'Новые посты автора {obj.username}'
+
+    def link(self, obj):
+        return reverse('profile', kwargs={'username': obj.username})
+
+    def get_posts(self, obj):
+        return obj.posts.all()
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class PostsAtomFeed(AtomMixin, PostsFeed):
+    pass
+
+
+class GroupAtomFeed(AtomMixin, GroupFeed):
+    pass
+
+
+class AuthorAtomFeed(AtomMixin, AuthorFeed):
+    pass
+
+
+def cached_feed(feed, tags):
+    return cache_anonymous_page(tags, shared=True)(feed)
+
+
+site_rss = cached_feed(PostsFeed(), lambda: [versioning.FEED])
+site_atom = cached_feed(PostsAtomFeed(), lambda: [versioning.FEED])
+group_rss = cached_feed(
+    GroupFeed(), lambda slug: [versioning.group(slug)]
+)
+group_atom = cached_feed(
+    GroupAtomFeed(), lambda slug: [versioning.group(slug)]
+)
+author_rss = cached_feed(
+    AuthorFeed(), lambda username: [versioning.profile(username)]
+)
+author_atom = cached_feed(
+    AuthorAtomFeed(), lambda username: [versioning.profile(username)]
+)
@@ -1,6 +1,8 @@
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import ModelForm
 from django.utils.translation import gettext_lazy as _
 
+from . import images
 from .models import Comment, Post
 
 
@@ -14,6 +16,13 @@ class PostForm(ModelForm):
             'image': _('Иллюстрация к посту'),
         }
 
+    def clean_image(self):
+        """Новая картинка пересохраняется в компактном формате"""
+        image = self.cleaned_data['image']
+        if isinstance(image, UploadedFile):
+            return images.process_upload(image)
+        return image
+
 
 class CommentForm(ModelForm):
     class Meta:
@@ -0,0 +1,83 @@
+"""Обработка картинок постов при загрузке.
+
+Загрузка пишется на диск (TemporaryFileUploadHandler), размеры
+проверяются по заголовку файла, до распаковки пикселей. Картинка
+разворачивается по EXIF, уменьшается до IMAGE_MAX_SIDE и пересохраняется
+в IMAGE_FORMAT без метаданных: в хранилище попадает один компактный
+файл, из которого posts.thumbnails режет варианты для srcset.
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageOps, features
+
+# Параметры сохранения и расширение файла по формату
+FORMATS = {
+    'WEBP': ({'quality': 80, 'method': 4}, 'webp'),
+    'JPEG': ({'quality': 82, 'optimize': True, 'progressive': True}, 'jpg'),
+}
+
+
+def get_format():
+    # Pillow без libwebp не умеет WebP: сохраняем в JPEG
+    if settings.IMAGE_FORMAT == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return settings.IMAGE_FORMAT
+
+
+def validate(upload):
+    """Проверить размер файла и картинки, не распаковывая пиксели"""
+    if upload.size > settings.IMAGE_MAX_UPLOAD_SIZE:
+        raise ValidationError(
+            'Файл больше %(limit)s',
+            code='file_too_large',
+            params={'limit': filesizeformat(settings.IMAGE_MAX_UPLOAD_SIZE)},
+        )
+    upload.seek(0)
+    with Image.open(upload) as image:
+        width, height = image.size
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'Картинка %(width)s×%(height)s слишком большая',
+            code='image_too_large',
+            params={'width': width, 'height': height},
+        )
+
+
+def reencode(upload):
+    """Новый файл: развернутый по EXIF, уменьшенный, без метаданных"""
+    image_format = get_format()
+    options, extension = FORMATS[image_format]
+    upload.seek(0)
+    with Image.open(upload) as source:
+        # У анимаций остается первый кадр
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail(
+            (settings.IMAGE_MAX_SIDE, settings.IMAGE_MAX_SIDE),
+            Image.LANCZOS,
+        )
+        has_alpha = image.mode in ('RGBA', 'LA') or (
+            image.mode == 'P' and 'transparency' in image.info
+        )
+        if image_format == 'WEBP' and has_alpha:
+            image = image.convert('RGBA')
+        else:
+            image = image.convert('RGB')
+        buffer = BytesIO()
+        # Без exif= и icc_profile= Pillow не переносит метаданные
+        image.save(buffer, image_format, **options)
+    stem = os.path.splitext(os.path.basename(upload.name))[0]
+    return SimpleUploadedFile(
+        f'{stem}.{extension}',
+        buffer.getvalue(),
+        content_type=Image.MIME[image_format],
+    )
+
+
+def process_upload(upload):
+    validate(upload)
+    return reencode(upload)
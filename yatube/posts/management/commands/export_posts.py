@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import dump
+
+
+class Command(BaseCommand):
+    help = 'Выгружает группы, посты, комментарии и подписки в JSONL или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=('jsonl', 'csv'),
+            default='jsonl',
+        )
+        parser.add_argument(
+            '--model',
+            action='append',
+            choices=tuple(dump.MODELS),
+            help='Модель для выгрузки; для CSV ровно одна. '
+                 'По умолчанию все модели (только JSONL)',
+        )
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл для записи, "-" - стандартный вывод',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        model_names = options['model'] or list(dump.MODELS)
+        if options['format'] == 'csv' and len(model_names) != 1:
+            raise CommandError('Для CSV укажите ровно одну --model')
+        if options['output'] == '-':
+            stream = self.stdout
+        else:
+            stream = open(options['output'], 'w', encoding='utf-8',
+                          newline='')
+        try:
+            if options['format'] == 'csv':
+                count = dump.write_csv(
+                    stream, model_names[0], options['chunk_size']
+                )
+            else:
+                count = dump.write_jsonl(
+                    stream, model_names, options['chunk_size']
+                )
+        finally:
+            if stream is not self.stdout:
+                stream.close()
+        self.stderr.write(f'Выгружено записей: {count}')
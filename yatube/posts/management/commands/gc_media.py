@@ -0,0 +1,87 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+from sorl.thumbnail import delete as delete_thumbnails
+
+from posts.models import Post
+
+BATCH_SIZE = 500
+
+
+def walk(directory):
+    """Все файлы каталога хранилища, включая подкаталоги"""
+    directories, files = default_storage.listdir(directory)
+    for name in files:
+        yield os.path.join(directory, name)
+    for name in directories:
+        yield from walk(os.path.join(directory, name))
+
+
+def batches(items, size=BATCH_SIZE):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def reference_counts(names):
+    """Сколько постов ссылается на каждый файл"""
+    return dict(
+        Post.objects.filter(image__in=names).order_by().values(
+            'image'
+        ).annotate(refs=Count('pk')).values_list('image', 'refs')
+    )
+
+
+class Command(BaseCommand):
+    help = 'Удаляет картинки, на которые не ссылается ни один пост'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace',
+            type=int,
+            default=settings.MEDIA_GC_GRACE_SECONDS,
+            help='Не трогать файлы моложе стольких секунд',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, что будет удалено',
+        )
+
+    def handle(self, *args, **options):
+        directory = Post._meta.get_field('image').upload_to.rstrip('/')
+        if not default_storage.exists(directory):
+            self.stdout.write('Файлов нет')
+            return
+        cutoff = timezone.now() - timedelta(seconds=options['grace'])
+        checked = deleted = freed = 0
+        for batch in batches(walk(directory)):
+            checked += len(batch)
+            counts = reference_counts(batch)
+            for name in batch:
+                if counts.get(name):
+                    continue
+                if default_storage.get_modified_time(name) > cutoff:
+                    continue
+                deleted += 1
+                freed += default_storage.size(name)
+                if options['dry_run']:
+                    self.stdout.write(name)
+                    continue
+                # Вместе с миниатюрами и записями sorl о них
+                delete_thumbnails(name, delete_file=False)
+                default_storage.delete(name)
+        self.stdout.write(
+            f'Проверено файлов: {checked}, удалено: {deleted}, '
+            f'освобождено байт: {freed}'
+        )
@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Нарезает миниатюры для картинок уже опубликованных постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=max(settings.THUMBNAIL_WORKERS, 1),
+            help='Число параллельных потоков',
+        )
+
+    def handle(self, *args, **options):
+        names = Post.objects.exclude(image='').exclude(
+            image__isnull=True
+        ).order_by().values_list('image', flat=True).distinct()
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                results = list(
+                    pool.map(thumbnails.generate_in_thread, names.iterator())
+                )
+        else:
+            results = [thumbnails.generate(name) for name in names]
+        failed = results.count(False)
+        self.stdout.write(
+            f'Обработано картинок: {len(results)}, с ошибками: {failed}'
+        )
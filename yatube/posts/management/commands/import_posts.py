@@ -0,0 +1,75 @@
+import sys
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import dump, versioning
+
+
+class Command(BaseCommand):
+    help = 'Загружает группы, посты, комментарии и подписки из JSONL или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input',
+            help='Файл дампа, "-" - стандартный ввод',
+        )
+        parser.add_argument(
+            '--format',
+            choices=('jsonl', 'csv'),
+            default='jsonl',
+        )
+        parser.add_argument(
+            '--model',
+            choices=tuple(dump.MODELS),
+            help='Модель записей CSV-файла',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--ignore-conflicts',
+            action='store_true',
+            help='Пропускать записи, которые уже есть в базе',
+        )
+        parser.add_argument(
+            '--create-users',
+            action='store_true',
+            help='Создавать отсутствующих пользователей',
+        )
+        parser.add_argument(
+            '--skip-rebuild',
+            action='store_true',
+            help='Не пересчитывать ленты, счетчики и поисковый индекс',
+        )
+
+    def handle(self, *args, **options):
+        if options['format'] == 'csv' and not options['model']:
+            raise CommandError('Для CSV укажите --model')
+        if options['input'] == '-':
+            stream = sys.stdin
+        else:
+            stream = open(options['input'], encoding='utf-8', newline='')
+        try:
+            if options['format'] == 'csv':
+                records = dump.read_csv(stream, options['model'])
+            else:
+                records = dump.read_jsonl(stream)
+            loaded, versions = dump.load(
+                records,
+                options['batch_size'],
+                ignore_conflicts=options['ignore_conflicts'],
+                create_users=options['create_users'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        for model_name, count in loaded.items():
+            self.stdout.write(f'{model_name}: {count}')
+        # bulk_create не шлет сигналы: производные данные строим заново
+        if not options['skip_rebuild']:
+            call_command('recount_author_stats', stdout=self.stdout)
+            call_command('rebuild_timelines', stdout=self.stdout)
+            call_command('rebuild_search_index', stdout=self.stdout)
+        # Загруженное видно в лентах, карточках, RSS и ETag API
+        versioning.bump(versioning.FEED, versioning.CARDS, *versions)
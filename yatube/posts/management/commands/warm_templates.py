@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from yatube import templating
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает все шаблоны проекта и приложений: заполняет кеш '
+        'загрузчика и находит ошибки синтаксиса до первого запроса'
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        loaded, errors = templating.warm()
+        elapsed = (time.perf_counter() - started) * 1000
+        for name, error in errors:
+            self.stderr.write(f'{name}: {error}')
+        self.stdout.write(
+            f'Разобрано шаблонов: {loaded}, с ошибками: {len(errors)}, '
+            f'за {elapsed:.0f} мс'
+        )
+        if errors:
+            raise CommandError('Есть шаблоны с ошибками')
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.6 on 2026-10-18 04:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_stats(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    counters = (
+        ('followers_count', apps.get_model('posts', 'Follow'), 'author'),
+        ('following_count', apps.get_model('posts', 'Follow'), 'user'),
+        ('posts_count', apps.get_model('posts', 'Post'), 'author'),
+        ('comments_count', apps.get_model('posts', 'Comment'), 'author'),
+    )
+    values = {}
+    for name, model, field in counters:
+        rows = model.objects.order_by().values_list(field).annotate(
+            count=models.Count('pk')
+        )
+        for user_id, count in rows:
+            values.setdefault(user_id, {})[name] = count
+    AuthorStats.objects.bulk_create(
+        (
+            AuthorStats(user_id=user_id, **values.get(user_id, {}))
+            for user_id in User.objects.values_list('pk', flat=True)
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0012_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('followers_count', models.IntegerField(default=0, verbose_name='Подписчиков')),
+                ('following_count', models.IntegerField(default=0, verbose_name='Подписок')),
+                ('posts_count', models.IntegerField(default=0, verbose_name='Записей')),
+                ('comments_count', models.IntegerField(default=0, verbose_name='Комментариев')),
+            ],
+            options={
+                'verbose_name': 'Статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS posts_search_post '
+        'USING fts5(text, group_title)'
+    )
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS posts_search_comment '
+        'USING fts5(post_id UNINDEXED, text)'
+    )
+    schema_editor.execute(
+        'INSERT INTO posts_search_post (rowid, text, group_title) '
+        'SELECT p.id, p.text, COALESCE(g.title, \'\') FROM posts_post p '
+        'LEFT JOIN posts_group g ON g.id = p.group_id'
+    )
+    schema_editor.execute(
+        'INSERT INTO posts_search_comment (rowid, post_id, text) '
+        'SELECT id, post_id, text FROM posts_comment'
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS posts_search_post')
+    schema_editor.execute('DROP TABLE IF EXISTS posts_search_comment')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_authorstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
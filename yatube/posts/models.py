@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 User = get_user_model()
 
@@ -23,6 +25,23 @@ class Group(models.Model):
         verbose_name = "Группа"
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для списков: автор, группа и число комментариев
+        одним запросом, без дополнительных запросов на каждый пост"""
+        comments = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            count=Count('pk')
+        ).values('count')
+        return self.select_related('author', 'group').annotate(
+            comment_count=Coalesce(
+                Subquery(comments, output_field=IntegerField()),
+                0
+            )
+        )
+
+
 class Post(models.Model):
     text = models.TextField(verbose_name="Текст поста")
     pub_date = models.DateTimeField("Дата публикации", auto_now_add=True)
@@ -46,6 +65,10 @@ class Post(models.Model):
         null=True,
         verbose_name="Изображение"
     )
+    # Версия отрендеренной карточки поста (posts.cards)
+    updated_at = models.DateTimeField("Дата изменения", auto_now=True)
+
+    objects = PostQuerySet.as_manager()
 
     def __str__(self):
         return self.text[:15]
@@ -54,6 +77,22 @@ class Post(models.Model):
         ordering = ['-pub_date']
         verbose_name_plural = "Посты"
         verbose_name = "Пост"
+        # Индексы повторяют порядок курсорной пагинации (-pub_date, -id),
+        # поэтому ленты читаются по индексу без сортировки
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_date_idx'
+            ),
+        ]
 
 
 class Comment(models.Model):
@@ -81,6 +120,12 @@ class Comment(models.Model):
     class Meta:
         verbose_name_plural = "Комментарии"
         verbose_name = "Коментарий"
+        indexes = [
+            models.Index(
+                fields=['post', 'created', 'id'],
+                name='comment_post_created_idx'
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -112,3 +157,71 @@ class Follow(models.Model):
                 name='unique_follow'
             )
         ]
+
+
+class TimelineEntry(models.Model):
+    """Материализованная лента подписчика (fan-out on write)"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline",
+        verbose_name="Подписчик"
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Пост"
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Автор поста"
+    )
+    pub_date = models.DateTimeField("Дата публикации")
+
+    def __str__(self):
+        return f'User: {self.user_id}, Post: {self.post_id}'
+
+    class Meta:
+        verbose_name_plural = "Записи ленты"
+        verbose_name = "Запись ленты"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_timeline_entry'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_date_idx'
+            ),
+            models.Index(
+                fields=['user', 'author'],
+                name='timeline_user_author_idx'
+            ),
+        ]
+
+
+class AuthorStats(models.Model):
+    """Денормализованные счетчики для карточки автора"""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+        verbose_name="Пользователь"
+    )
+    followers_count = models.IntegerField("Подписчиков", default=0)
+    following_count = models.IntegerField("Подписок", default=0)
+    posts_count = models.IntegerField("Записей", default=0)
+    comments_count = models.IntegerField("Комментариев", default=0)
+
+    def __str__(self):
+        return f'Stats: {self.user_id}'
+
+    class Meta:
+        verbose_name_plural = "Статистика авторов"
+        verbose_name = "Статистика автора"
@@ -0,0 +1,115 @@
+"""Кеш страниц целиком для анонимных посетителей.
+
+Гости получают по одному адресу одну и ту же страницу, поэтому ответ
+сохраняется целиком по ключу из адреса с параметрами и версий
+страницы (posts.versioning). Изменения постов, комментариев и подписок
+сдвигают версии только затронутых страниц (posts.signals).
+Пользователи с сессией и запросы кроме GET/HEAD идут мимо кеша.
+
+Промах рендерится из основной базы, даже если страница читает с
+реплик (yatube.routers): отстающая реплика еще не видит изменения,
+сдвинувшего версию, и ее страница хранилась бы под новой версией до
+PAGE_CACHE_TIMEOUT.
+
+Ответ гостю получает ETag и Cache-Control: public, s-maxage - обратный
+прокси может хранить его сам и перепроверять по ETag; Vary: Cookie не
+дает прокси отдать гостевую страницу пользователю с сессией.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers,
+)
+from django.utils.http import parse_http_date_safe, quote_etag
+
+from yatube import routers
+from yatube.metrics import registry
+
+from . import versioning
+
+KEY_PREFIX = 'posts:page:'
+
+
+def make_key(request, versions):
+    parts = [request.get_full_path()]
+    parts += [f'{name}={versions[name]}' for name in sorted(versions)]
+    digest = hashlib.md5('\n'.join(parts).encode()).hexdigest()
+    return f'{KEY_PREFIX}{digest}'
+
+
+def is_cacheable(response):
+    # Ответ с cookie (csrftoken, сообщения) принадлежит одному клиенту
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+    )
+
+
+def cache_anonymous_page(tags, shared=False):
+    """Кешировать страницу для гостей.
+
+    tags(**kwargs) получает параметры адреса и возвращает имена
+    версий, от которых зависит страница. shared - страница не зависит
+    от пользователя (ленты RSS) и кешируется для всех.
+    """
+    def decorator(view):
+        # Ленты - экземпляры Feed, у них нет __name__
+        name = f'page:{getattr(view, "__name__", type(view).__name__)}'
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or (
+                not shared and request.user.is_authenticated
+            ):
+                response = view(request, *args, **kwargs)
+                patch_cache_control(response, private=True)
+                return response
+            key = make_key(
+                request, versioning.get_versions(*tags(**kwargs))
+            )
+            etag = quote_etag(key[len(KEY_PREFIX):])
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = cache.get(key)
+                if response is not None:
+                    registry.record_cache(name, 'hit')
+                    # If-Modified-Since без ETag тоже получает 304
+                    response = get_conditional_response(
+                        request,
+                        etag=etag,
+                        last_modified=parse_http_date_safe(
+                            response.get('Last-Modified', '')
+                        ),
+                        response=response,
+                    )
+            if response is None:
+                registry.record_cache(name, 'miss')
+                with routers.replica_reads(False):
+                    response = view(request, *args, **kwargs)
+                if not is_cacheable(response):
+                    if not shared:
+                        patch_vary_headers(response, ('Cookie',))
+                    return response
+                prepare(response, etag, shared)
+                cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+                return response
+            prepare(response, etag, shared)
+            return response
+        return wrapper
+    return decorator
+
+
+def prepare(response, etag, shared=False):
+    response['ETag'] = etag
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=0,
+        s_maxage=settings.PAGE_CACHE_PROXY_TIMEOUT,
+    )
+    if not shared:
+        patch_vary_headers(response, ('Cookie',))
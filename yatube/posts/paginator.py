@@ -0,0 +1,169 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# Методы Page, которым нужен номер страницы
+NUMBERED_METHODS = (
+    'next_page_number', 'previous_page_number', 'start_index', 'end_index',
+)
+
+
+def unnumbered(name):
+    def method():
+        raise TypeError(
+            f'У страницы CursorPaginator нет номера ({name}); '
+            f'используйте next_cursor и previous_cursor'
+        )
+    return method
+
+
+class CursorPaginator(Paginator):
+    """Пагинатор по ключу сортировки (keyset) вместо LIMIT/OFFSET.
+
+    Страница выбирается условием «после/до ключа последней записи»,
+    поэтому стоимость запроса не зависит от глубины листания.
+    """
+
+    def __init__(self, object_list, per_page,
+                 ordering=('-pub_date', '-id'), with_count=True):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.orphans = 0
+        self.allow_empty_first_page = True
+        self.ordering = tuple(ordering)
+        self.with_count = with_count
+
+    @cached_property
+    def count(self):
+        if not self.with_count:
+            return None
+        return super().count
+
+    @cached_property
+    def num_pages(self):
+        if not self.with_count:
+            return None
+        return super().num_pages
+
+    @property
+    def page_range(self):
+        raise TypeError(
+            'У CursorPaginator нет номеров страниц: страницы '
+            'листаются через next_cursor и previous_cursor'
+        )
+
+    @property
+    def fields(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def get_page(self, cursor):
+        """Страница по курсору; битый курсор ведет на первую страницу"""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
+
+    def page(self, cursor):
+        """Страница после (или до) курсора.
+
+        Возвращается обычный Page: вместо номеров страниц у него есть
+        next_cursor и previous_cursor, а has_next/has_previous
+        вычисляются по лишней выбранной записи, без COUNT(*). number у
+        страницы None, методы с номерами бросают TypeError.
+        """
+        values, reverse = None, False
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self.seek(values, reverse))
+        queryset = queryset.order_by(*self.ordered(reverse))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        page = Page(rows, None, self)
+        page.has_next = lambda: has_next and bool(rows)
+        page.has_previous = lambda: has_previous and bool(rows)
+        for name in NUMBERED_METHODS:
+            setattr(page, name, unnumbered(name))
+        page.next_cursor = (
+            self.encode_cursor(rows[-1]) if page.has_next() else None
+        )
+        page.previous_cursor = (
+            self.encode_cursor(rows[0], reverse=True)
+            if page.has_previous() else None
+        )
+        return page
+
+    def get_key(self, obj):
+        if isinstance(obj, dict):
+            return [obj[name] for name in self.fields]
+        return [getattr(obj, name) for name in self.fields]
+
+    def encode_cursor(self, obj, reverse=False):
+        key = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in self.get_key(obj)
+        ]
+        payload = json.dumps({'k': key, 'r': int(reverse)},
+                             separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode())
+        return token.rstrip(b'=').decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            raw_key, reverse = payload['k'], bool(payload['r'])
+            values = [
+                self.key_field(name).to_python(raw)
+                for name, raw in zip(self.fields, raw_key)
+            ]
+        except (ValueError, TypeError, KeyError, binascii.Error,
+                ValidationError) as error:
+            raise InvalidCursor(str(error))
+        if len(values) != len(self.fields) or None in values:
+            raise InvalidCursor('Курсор не соответствует сортировке')
+        return values, reverse
+
+    def key_field(self, name):
+        """Поле модели или аннотации, по которому идет сортировка"""
+        annotations = self.object_list.query.annotations
+        if name in annotations:
+            return annotations[name].output_field
+        return self.object_list.model._meta.get_field(name)
+
+    def seek(self, values, reverse=False):
+        """Условие «строго после ключа» в порядке сортировки (или до него)"""
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.ordering, values):
+            field = name.lstrip('-')
+            descending = name.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def ordered(self, reverse=False):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        )
@@ -0,0 +1,134 @@
+"""Кеш постов, групп и пользователей по первичному ключу.
+
+Страница ленты выбирает из базы только ключи своих постов, а сами
+посты берет отсюда: все ключи страницы читаются одним cache.get_many,
+промахи догружаются одним запросом in_bulk и записываются обратно
+одним set_many. Так страница стоит одного обращения к кешу и не
+больше одного запроса к базе за объектами. Группы и авторы страниц
+ищутся по slug и имени через get_by.
+
+Посты кешируются вместе с автором, группой и числом комментариев
+(Post.objects.for_feed()); сигналы удаляют записи, которые изменение
+сделало устаревшими. Запись, прочитанная до изменения и сохраненная
+после, проживет не дольше REPOSITORY_CACHE_TIMEOUT. Промахи читаются
+из основной базы: с отстающей реплики в кеш попала бы версия до
+изменения, уже удаленная сигналом.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+from yatube import routers
+from yatube.metrics import registry
+
+from .models import Group, Post
+
+User = get_user_model()
+
+KEY_PREFIX = 'posts:repo:'
+
+
+def make_key(model, pk):
+    return f'{KEY_PREFIX}{model._meta.label_lower}:{pk}'
+
+
+def lookup_key(model, field, value):
+    return f'{make_key(model, field)}:{value}'
+
+
+def get_many(queryset, ids):
+    """Объекты queryset с ключами ids: {pk: объект}, без ненайденных"""
+    model = queryset.model
+    keys = {make_key(model, pk): pk for pk in ids}
+    if not keys:
+        return {}
+    objects = {
+        keys[key]: obj for key, obj in cache.get_many(keys).items()
+    }
+    name = f'repository:{model._meta.model_name}'
+    for pk in keys.values():
+        registry.record_cache(name, 'hit' if pk in objects else 'miss')
+    missing = [pk for pk in keys.values() if pk not in objects]
+    if missing:
+        loaded = queryset.using(routers.PRIMARY).in_bulk(missing)
+        cache.set_many(
+            {make_key(model, pk): obj for pk, obj in loaded.items()},
+            timeout=settings.REPOSITORY_CACHE_TIMEOUT,
+        )
+        objects.update(loaded)
+    return objects
+
+
+def ordered(objects, ids):
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+def posts(ids):
+    """Посты для лент в порядке ids; удаленные пропускаются"""
+    return ordered(get_many(Post.objects.for_feed(), ids), ids)
+
+
+def get_post(pk):
+    return get_many(Post.objects.for_feed(), [pk]).get(pk)
+
+
+def get_by(queryset, field, value):
+    """Объект по уникальному полю или None.
+
+    Кешируется ключ объекта по значению поля, сам объект берется по
+    ключу через get_many. Значение сверяется с объектом: после
+    переименования или удаления старая запись не найдет объект и будет
+    перезаписана; новый объект с тем же значением удаляет ее сигналом.
+    """
+    model = queryset.model
+    key = lookup_key(model, field, value)
+    pk = cache.get(key)
+    if pk is not None:
+        obj = get_many(queryset, [pk]).get(pk)
+        if obj is not None and getattr(obj, field) == value:
+            return obj
+    obj = queryset.using(routers.PRIMARY).filter(**{field: value}).first()
+    if obj is not None:
+        cache.set_many(
+            {key: obj.pk, make_key(model, obj.pk): obj},
+            timeout=settings.REPOSITORY_CACHE_TIMEOUT,
+        )
+    return obj
+
+
+def get_group(slug):
+    return get_by(Group.objects.all(), 'slug', slug)
+
+
+def get_user(username):
+    return get_by(User.objects.all(), 'username', username)
+
+
+def delete(keys):
+    """Удалить ключи; внутри транзакции - еще раз после фиксации.
+
+    Промах, прочитанный до фиксации, вернул бы в кеш прежнюю запись
+    (как сдвиг версий в posts.versioning).
+    """
+    cache.delete_many(keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate(model, *ids):
+    """Удалить из кеша объекты model с ключами ids"""
+    if ids:
+        delete([make_key(model, pk) for pk in ids])
+
+
+def invalidate_lookup(model, field, value):
+    """Удалить ключ объекта по значению уникального поля"""
+    delete([lookup_key(model, field, value)])
+
+
+def invalidate_posts(**filters):
+    """Удалить из кеша посты, подходящие под фильтр"""
+    invalidate(
+        Post, *Post.objects.filter(**filters).values_list('pk', flat=True)
+    )
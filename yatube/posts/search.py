@@ -0,0 +1,242 @@
+"""Полнотекстовый поиск по постам, комментариям и названиям групп.
+
+Бэкенд выбирается настройкой POSTS_SEARCH_BACKEND. Основной бэкенд -
+SQLite FTS5: две виртуальные таблицы, у которых rowid совпадает с id
+поста или комментария, поэтому обновление и удаление документа - это
+поиск по rowid, а не перебор индекса. Индекс обновляется сигналами
+при сохранении и удалении, команда rebuild_search_index строит его
+заново.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from .models import Comment, Post
+
+POSTS_TABLE = 'posts_search_post'
+COMMENTS_TABLE = 'posts_search_comment'
+
+# Совпадение в комментарии весит меньше совпадения в самом посте
+COMMENT_WEIGHT = 0.5
+
+BATCH_SIZE = 1000
+
+
+def get_backend():
+    return import_string(settings.POSTS_SEARCH_BACKEND)()
+
+
+class BaseSearchBackend:
+    """Интерфейс бэкенда поиска"""
+
+    def index_post(self, post):
+        raise NotImplementedError
+
+    def remove_post(self, post_id):
+        raise NotImplementedError
+
+    def index_comment(self, comment):
+        raise NotImplementedError
+
+    def remove_comment(self, comment_id):
+        raise NotImplementedError
+
+    def reindex_group(self, group):
+        raise NotImplementedError
+
+    def rebuild(self):
+        raise NotImplementedError
+
+    def search(self, query):
+        """Посты по запросу, лучшие совпадения первыми.
+
+        Возвращает последовательность с len() и срезами, которую
+        можно передать в Paginator.
+        """
+        raise NotImplementedError
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Поиск без индекса через LIKE - для баз без полнотекстового поиска"""
+
+    def index_post(self, post):
+        pass
+
+    def remove_post(self, post_id):
+        pass
+
+    def index_comment(self, comment):
+        pass
+
+    def remove_comment(self, comment_id):
+        pass
+
+    def reindex_group(self, group):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, query):
+        condition = Q()
+        for word in tokenize(query):
+            condition &= (
+                Q(text__icontains=word)
+                | Q(comments__text__icontains=word)
+                | Q(group__title__icontains=word)
+            )
+        if not condition:
+            return Post.objects.none()
+        post_ids = Post.objects.filter(condition).values('pk')
+        return Post.objects.for_feed().filter(pk__in=post_ids).order_by(
+            '-pub_date', '-id'
+        )
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """Поиск по индексу SQLite FTS5 с ранжированием bm25"""
+
+    def execute(self, sql, params=()):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def executemany(self, sql, rows):
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+
+    def index_post(self, post):
+        group_title = post.group.title if post.group_id else ''
+        self.remove_post(post.pk)
+        self.execute(
+            f'INSERT INTO {POSTS_TABLE} (rowid, text, group_title) '
+            f'VALUES (%s, %s, %s)',
+            (post.pk, post.text, group_title),
+        )
+
+    def remove_post(self, post_id):
+        self.execute(
+            f'DELETE FROM {POSTS_TABLE} WHERE rowid = %s', (post_id,)
+        )
+
+    def index_comment(self, comment):
+        self.remove_comment(comment.pk)
+        self.execute(
+            f'INSERT INTO {COMMENTS_TABLE} (rowid, post_id, text) '
+            f'VALUES (%s, %s, %s)',
+            (comment.pk, comment.post_id, comment.text),
+        )
+
+    def remove_comment(self, comment_id):
+        self.execute(
+            f'DELETE FROM {COMMENTS_TABLE} WHERE rowid = %s', (comment_id,)
+        )
+
+    def reindex_group(self, group):
+        post_table = Post._meta.db_table
+        self.execute(
+            f'UPDATE {POSTS_TABLE} SET group_title = %s WHERE rowid IN '
+            f'(SELECT id FROM {post_table} WHERE group_id = %s)',
+            (group.title, group.pk),
+        )
+
+    def rebuild(self):
+        self.execute(f'DELETE FROM {POSTS_TABLE}')
+        self.execute(f'DELETE FROM {COMMENTS_TABLE}')
+        posts = Post.objects.values_list('pk', 'text', 'group__title')
+        self.insert_batches(
+            f'INSERT INTO {POSTS_TABLE} (rowid, text, group_title) '
+            f'VALUES (%s, %s, %s)',
+            (
+                (pk, text, group_title or '')
+                for pk, text, group_title in posts.iterator()
+            ),
+        )
+        comments = Comment.objects.values_list('pk', 'post_id', 'text')
+        self.insert_batches(
+            f'INSERT INTO {COMMENTS_TABLE} (rowid, post_id, text) '
+            f'VALUES (%s, %s, %s)',
+            comments.iterator(),
+        )
+
+    def insert_batches(self, sql, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                self.executemany(sql, batch)
+                batch = []
+        if batch:
+            self.executemany(sql, batch)
+
+    def search(self, query):
+        return SQLiteSearchResults(self, build_match(query))
+
+
+class SQLiteSearchResults:
+    """Ленивая выдача FTS5: считает и читает только запрошенный срез"""
+
+    def __init__(self, backend, match):
+        self.backend = backend
+        self.match = match
+
+    @property
+    def matches(self):
+        return (
+            f'SELECT rowid AS post_id, bm25({POSTS_TABLE}) AS rank '
+            f'FROM {POSTS_TABLE} WHERE {POSTS_TABLE} MATCH %s '
+            f'UNION ALL '
+            f'SELECT post_id, bm25({COMMENTS_TABLE}) * {COMMENT_WEIGHT} '
+            f'FROM {COMMENTS_TABLE} WHERE {COMMENTS_TABLE} MATCH %s'
+        )
+
+    @cached_property
+    def total(self):
+        if not self.match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(DISTINCT post_id) FROM ({self.matches})',
+                (self.match, self.match),
+            )
+            return cursor.fetchone()[0]
+
+    def count(self):
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        stop = self.total if index.stop is None else index.stop
+        if not self.match or stop <= start:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT post_id, MIN(rank) AS score FROM ({self.matches}) '
+                f'GROUP BY post_id ORDER BY score, post_id DESC '
+                f'LIMIT %s OFFSET %s',
+                (self.match, self.match, stop - start, start),
+            )
+            post_ids = [row[0] for row in cursor.fetchall()]
+        posts = Post.objects.for_feed().in_bulk(post_ids)
+        return [posts[pk] for pk in post_ids if pk in posts]
+
+
+def tokenize(query):
+    return re.findall(r'\w+', query or '')
+
+
+def build_match(query):
+    """Запрос FTS5 из пользовательского ввода: все слова, по префиксу.
+
+    Каждое слово берется в кавычки, поэтому операторы FTS5 во вводе
+    не ломают синтаксис запроса.
+    """
+    return ' '.join(f'"{word}"*' for word in tokenize(query))
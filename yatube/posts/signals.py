@@ -0,0 +1,225 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from . import repository, search, stats, timeline, versioning
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+def page_versions(post):
+    """Версии страниц, на которых виден пост"""
+    names = [
+        versioning.FEED,
+        versioning.post(post.pk),
+        versioning.profile(post.author.username),
+    ]
+    if post.group_id is not None:
+        names.append(versioning.group(post.group.slug))
+    return names
+
+
+def comment_page_versions(comment):
+    # Число комментариев видно в лентах, поэтому сдвигаются
+    # все страницы поста, а не только его собственная
+    try:
+        return page_versions(comment.post)
+    except Post.DoesNotExist:
+        # Комментарии удаляются каскадом вместе с постом
+        return [versioning.FEED, versioning.post(comment.post_id)]
+
+
+@receiver(pre_save, sender=Post)
+def post_moving(sender, instance, raw=False, **kwargs):
+    """Пост, перенесенный в другую группу, уходит со страницы старой"""
+    if raw or instance.pk is None:
+        return
+    old_slug = Post.objects.filter(pk=instance.pk).values_list(
+        'group__slug', flat=True
+    ).first()
+    if old_slug is not None and old_slug != getattr(
+        instance.group, 'slug', None
+    ):
+        versioning.bump(versioning.group(old_slug))
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    """Новый пост попадает в ленты подписчиков и в счетчик автора"""
+    repository.invalidate(Post, instance.pk)
+    if raw:
+        versioning.bump(versioning.FEED)
+        return
+    versioning.bump(*page_versions(instance))
+    search.get_backend().index_post(instance)
+    if created:
+        timeline.fan_out(instance)
+        stats.bump(instance.author_id, posts_count=1)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    repository.invalidate(Post, instance.pk)
+    versioning.bump(*page_versions(instance))
+    search.get_backend().remove_post(instance.pk)
+    stats.bump(instance.author_id, create=False, posts_count=-1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    """Число комментариев видно в ленте: кеш ленты устаревает"""
+    repository.invalidate(Post, instance.post_id)
+    if raw:
+        versioning.bump(versioning.FEED)
+        return
+    versioning.bump(*comment_page_versions(instance))
+    search.get_backend().index_comment(instance)
+    if created:
+        stats.bump(instance.author_id, comments_count=1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    repository.invalidate(Post, instance.post_id)
+    versioning.bump(*comment_page_versions(instance))
+    search.get_backend().remove_comment(instance.pk)
+    stats.bump(instance.author_id, create=False, comments_count=-1)
+
+
+@receiver(pre_save, sender=Group)
+def group_renaming(sender, instance, raw=False, **kwargs):
+    """Запомнить прежние название и адрес группы до сохранения"""
+    instance.old_title = instance.old_slug = None
+    if raw or instance.pk is None:
+        return
+    old = Group.objects.filter(pk=instance.pk).values_list(
+        'title', 'slug'
+    ).first()
+    if old is not None:
+        instance.old_title, instance.old_slug = old
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, raw=False, **kwargs):
+    versioning.bump(versioning.group(instance.slug))
+    repository.invalidate(Group, instance.pk)
+    repository.invalidate_lookup(Group, 'slug', instance.slug)
+    if created or raw:
+        return
+    repository.invalidate_posts(group=instance)
+    search.get_backend().reindex_group(instance)
+    old_slug = getattr(instance, 'old_slug', None)
+    if getattr(instance, 'old_title', None) == instance.title and (
+        old_slug == instance.slug
+    ):
+        return
+    # Название и адрес группы есть в карточках ее постов: в лентах,
+    # профилях их авторов и на страницах самих постов
+    posts = Post.objects.filter(group=instance)
+    names = [
+        versioning.FEED,
+        versioning.CARDS,
+        *map(versioning.profile, User.objects.filter(
+            posts__in=posts
+        ).values_list('username', flat=True).distinct()),
+        *map(versioning.post, posts.values_list('pk', flat=True)),
+    ]
+    if old_slug not in (None, instance.slug):
+        names.append(versioning.group(old_slug))
+    versioning.bump(*names)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    # Посты остаются без группы через UPDATE, без сигналов
+    repository.invalidate(Group, instance.pk)
+    repository.invalidate_posts(group=instance)
+    # Страницы постов и профили их авторов сдвигаются после удаления,
+    # когда посты уже без группы
+    instance.author_usernames = list(User.objects.filter(
+        posts__group=instance
+    ).values_list('username', flat=True).distinct())
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    """Карточки постов группы больше не ссылаются на нее"""
+    versioning.bump(
+        versioning.FEED,
+        versioning.CARDS,
+        versioning.group(instance.slug),
+        *map(versioning.profile, getattr(instance, 'author_usernames', [])),
+    )
+
+
+@receiver(pre_save, sender=User)
+def user_renaming(sender, instance, raw=False, update_fields=None,
+                  **kwargs):
+    """Профиль под старым именем больше не существует"""
+    instance.old_username = None
+    if raw or instance.pk is None or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    instance.old_username = User.objects.filter(
+        pk=instance.pk
+    ).values_list('username', flat=True).first()
+    if instance.old_username not in (None, instance.username):
+        versioning.bump(versioning.profile(instance.old_username))
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    """Автор закеширован вместе со своими постами"""
+    if update_fields == frozenset(['last_login']):
+        # Вход пользователя обновляет только last_login
+        return
+    # Имя могло принадлежать удаленному или откаченному пользователю
+    repository.invalidate_lookup(User, 'username', instance.username)
+    if created:
+        return
+    repository.invalidate(User, instance.pk)
+    repository.invalidate_posts(author=instance)
+    versioning.bump(versioning.profile(instance.username))
+    if getattr(instance, 'old_username', None) not in (
+        None, instance.username
+    ):
+        # Имя автора есть в карточках его постов
+        versioning.bump(versioning.FEED, versioning.CARDS)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    repository.invalidate(User, instance.pk)
+
+
+def follow_page_versions(follow):
+    """Счетчики подписок видны в профилях и на страницах постов"""
+    return [
+        versioning.profile(follow.author.username),
+        versioning.profile(follow.user.username),
+        versioning.timeline(follow.user_id),
+    ]
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    """После подписки в ленту подтягиваются посты автора"""
+    if created and not raw:
+        versioning.bump(*follow_page_versions(instance))
+        stats.bump(instance.author_id, followers_count=1)
+        stats.bump(instance.user_id, following_count=1)
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    """После отписки посты автора убираются из ленты"""
+    versioning.bump(*follow_page_versions(instance))
+    timeline.remove(instance.user_id, instance.author_id)
+    stats.bump(instance.author_id, create=False, followers_count=-1)
+    stats.bump(instance.user_id, create=False, following_count=-1)
+    timeline.follower_removed(instance.author_id)
@@ -0,0 +1,89 @@
+"""Счетчики карточки автора: подписчики, подписки, записи, комментарии.
+
+Счетчики обновляются сигналами при создании и удалении Post, Follow и
+Comment, поэтому карточка читает одну строку AuthorStats вместо трех
+COUNT(*). recount() пересчитывает их с нуля пачкой запросов.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F
+
+from yatube import routers
+
+from .models import AuthorStats, Comment, Follow, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 500
+
+COUNTERS = (
+    # поле счетчика, модель и поле пользователя, по которому группируем
+    ('followers_count', Follow, 'author'),
+    ('following_count', Follow, 'user'),
+    ('posts_count', Post, 'author'),
+    ('comments_count', Comment, 'author'),
+)
+
+
+def bump(user_id, create=True, **deltas):
+    """Атомарно сдвинуть счетчики пользователя.
+
+    Если строки еще нет, она создается полным пересчетом (create=True)
+    или пропускается - при удалениях, чтобы не пересоздавать статистику
+    удаляемого каскадом пользователя.
+    """
+    with transaction.atomic():
+        updated = AuthorStats.objects.filter(user_id=user_id).update(
+            **{name: F(name) + delta for name, delta in deltas.items()}
+        )
+        if not updated and create:
+            recount([user_id])
+
+
+def recount(user_ids=None):
+    """Пересчитать счетчики пользователей (по умолчанию всех).
+
+    Считает по основной базе: реплика может отставать.
+    """
+    users = User.objects.using(routers.PRIMARY)
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    user_ids = list(users.values_list('pk', flat=True))
+    counters = {}
+    for name, model, field in COUNTERS:
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            chunk = user_ids[start:start + BATCH_SIZE]
+            rows = model.objects.using(routers.PRIMARY).filter(
+                **{f'{field}__in': chunk}
+            ).order_by().values_list(field).annotate(count=Count('pk'))
+            for user_id, count in rows:
+                counters.setdefault(user_id, {})[name] = count
+    with transaction.atomic():
+        for start in range(0, len(user_ids), BATCH_SIZE):
+            chunk = user_ids[start:start + BATCH_SIZE]
+            AuthorStats.objects.filter(user_id__in=chunk).delete()
+            AuthorStats.objects.bulk_create(
+                AuthorStats(user_id=user_id, **counters.get(user_id, {}))
+                for user_id in chunk
+            )
+    return len(user_ids)
+
+
+def ensure(user_ids):
+    """Создать недостающие строки пересчетом, чтобы bump() их сдвигал"""
+    existing = AuthorStats.objects.filter(
+        user_id__in=user_ids
+    ).values_list('user_id', flat=True)
+    missing = set(user_ids) - set(existing)
+    if missing:
+        recount(missing)
+
+
+def for_author(author):
+    """Статистика автора для карточки; создается при первом обращении"""
+    try:
+        return AuthorStats.objects.get(user=author)
+    except AuthorStats.DoesNotExist:
+        recount([author.pk])
+        # Строка только что записана и на реплике ее может не быть
+        return AuthorStats.objects.using(routers.PRIMARY).get(user=author)
@@ -0,0 +1,50 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+from django.templatetags.cache import CacheNode
+
+from ..feed_cache import get_or_render
+
+register = template.Library()
+
+
+class FeedCacheNode(CacheNode):
+    def render(self, context):
+        try:
+            timeout = self.expire_time_var.resolve(context)
+        except template.VariableDoesNotExist:
+            raise template.TemplateSyntaxError(
+                f'"feedcache" tag got an unknown variable: '
+                f'{self.expire_time_var.var!r}'
+            )
+        if timeout is not None:
+            timeout = int(timeout)
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        key = make_template_fragment_key(self.fragment_name, vary_on)
+        return get_or_render(
+            key,
+            timeout,
+            lambda: self.nodelist.render(context),
+            self.fragment_name,
+        )
+
+
+@register.tag('feedcache')
+def do_feedcache(parser, token):
+    """Как {% cache %}, но с защитой от одновременного рендера.
+
+        {% feedcache timeout fragment_name [var1] [var2] ... %}
+    """
+    nodelist = parser.parse(('endfeedcache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f'{tokens[0]!r} tag requires at least 2 arguments.'
+        )
+    return FeedCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],
+        [parser.compile_filter(token) for token in tokens[3:]],
+        None,
+    )
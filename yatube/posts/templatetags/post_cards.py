@@ -0,0 +1,20 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from .. import cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Карточки страницы постов, собранные из кеша одним get_many"""
+    return mark_safe(
+        ''.join(cards.render_cards(posts, context.get('user')))
+    )
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """Одна карточка поста из того же кеша"""
+    return cards.render_cards([post], context.get('user'))[0]
@@ -0,0 +1,33 @@
+import logging
+
+from django import template
+
+from .. import thumbnails
+
+logger = logging.getLogger(__name__)
+
+register = template.Library()
+
+
+@register.inclusion_tag('include/post_image.html')
+def post_image(image):
+    """Картинка поста с вариантами разной ширины в srcset"""
+    if not image:
+        return {}
+    try:
+        items = thumbnails.renditions(image)
+    except Exception:
+        # Как {% thumbnail %}: битая картинка не роняет страницу
+        logger.exception('Не удалось получить миниатюры %s', image)
+        return {}
+    srcset = {}
+    for thumbnail in items.values():
+        # Варианты шире исходника не увеличиваются и совпадают по
+        # ширине с ним; в srcset остается один, с настоящей шириной
+        srcset.setdefault(thumbnail.width, thumbnail.url)
+    return {
+        'src': items[thumbnails.DEFAULT_THUMBNAIL].url,
+        'srcset': ', '.join(
+            f'{url} {width}w' for width, url in srcset.items()
+        ),
+    }
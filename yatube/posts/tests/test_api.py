@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+POST_PER_PAGE = 10
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            description='Тестовый текст',
+            slug='test-slug'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        for i in range(POST_PER_PAGE + 3):
+            cls.post = Post.objects.create(
+                text=f'Тестовый пост {i}',
+                author=cls.user,
+                group=cls.group,
+            )
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ApiTests.reader)
+
+    def test_feeds_serialize_posts(self):
+        """Ленты отдают посты в JSON с курсором следующей страницы"""
+        urls = (
+            reverse('api_index'),
+            reverse('api_group_posts', kwargs={'slug': 'test-slug'}),
+            reverse('api_profile', kwargs={'username': 'GulyaevEO'}),
+            reverse('api_follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                data = response.json()
+                self.assertEqual(len(data['results']), POST_PER_PAGE)
+                first = data['results'][0]
+                self.assertEqual(first['id'], ApiTests.post.pk)
+                self.assertEqual(first['author'], 'GulyaevEO')
+                self.assertEqual(first['group'], 'test-slug')
+                self.assertEqual(first['comment_count'], 1)
+                second = self.authorized_client.get(data['next']).json()
+                self.assertEqual(len(second['results']), 3)
+                self.assertIsNone(second['next'])
+
+    def test_post_view(self):
+        """Пост отдается вместе с комментариями"""
+        response = self.guest_client.get(
+            reverse('api_post', kwargs={'post_id': ApiTests.post.pk})
+        )
+        data = response.json()
+        self.assertEqual(data['post']['text'], ApiTests.post.text)
+        self.assertEqual(data['comments'][0]['author'], 'reader')
+        response = self.guest_client.get(
+            reverse('api_post', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_follow_requires_login(self):
+        """Лента подписок без авторизации - 401"""
+        response = self.guest_client.get(reverse('api_follow_index'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_etag_answers_not_modified(self):
+        """Совпавший ETag дает 304 без запросов к базе"""
+        url = reverse('api_index')
+        response = self.guest_client.get(url)
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_changes_reset_etag(self):
+        """Новый комментарий меняет ETag"""
+        url = reverse('api_index')
+        etag = self.guest_client.get(url)['ETag']
+        Comment.objects.create(
+            post=ApiTests.post, author=ApiTests.user, text='Еще один'
+        )
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_follow_resets_etag(self):
+        """Подписка меняет ETag ленты подписок и профиля автора"""
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Пост нового автора', author=author)
+        urls = (
+            reverse('api_follow_index'),
+            reverse('api_profile', kwargs={'username': 'author'}),
+        )
+        etags = [self.authorized_client.get(url)['ETag'] for url in urls]
+        Follow.objects.create(user=ApiTests.reader, author=author)
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_page_etag_ignores_other_pages(self):
+        """Пост другого автора не меняет ETag профиля"""
+        url = reverse('api_profile', kwargs={'username': 'GulyaevEO'})
+        etag = self.guest_client.get(url)['ETag']
+        Post.objects.create(text='Чужой пост', author=ApiTests.reader)
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_changes_last_modified(self):
+        """Правка поста сдвигает Last-Modified"""
+        post = Post.objects.create(text='Черновик', author=ApiTests.user)
+        url = reverse('api_post', kwargs={'post_id': post.pk})
+        modified = self.guest_client.get(url)['Last-Modified']
+        Post.objects.filter(pk=post.pk).update(
+            updated_at=post.updated_at + timedelta(minutes=1)
+        )
+        response = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=modified
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['Last-Modified'], modified)
+
+    def test_last_modified(self):
+        """Last-Modified - дата последнего комментария на странице"""
+        url = reverse('api_index')
+        response = self.guest_client.get(url)
+        self.assertIn('Last-Modified', response)
+        response = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,94 @@
+import asyncio
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from yatube.asgi_handler import WsgiToAsgi, build_environ
+
+
+class AsgiTests(SimpleTestCase):
+    def setUp(self):
+        self.application = WsgiToAsgi(WSGIHandler(), max_workers=2)
+
+    def tearDown(self):
+        self.application.executor.shutdown()
+
+    def request(self, path, query_string=b''):
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': path,
+            'query_string': query_string,
+            'headers': [(b'host', b'testserver')],
+        }
+        asyncio.run(self.application(scope, receive, send))
+        return messages
+
+    def test_page_served_over_asgi(self):
+        """Страница отдается через ASGI-адаптер"""
+        start, body = self.request(reverse('author'))
+        self.assertEqual(start['type'], 'http.response.start')
+        self.assertEqual(start['status'], 200)
+        self.assertIn(
+            (b'content-type', b'text/html; charset=utf-8'), start['headers']
+        )
+        self.assertIn('Об авторе'.encode(), body['body'])
+
+    def test_not_found(self):
+        """Статус ответа Django передается серверу"""
+        start, _ = self.request('/about/missing/')
+        self.assertEqual(start['status'], 404)
+
+    def test_environ(self):
+        """Заголовки, путь и строка запроса переходят в окружение WSGI"""
+        environ = build_environ(
+            {
+                'method': 'POST',
+                'path': '/поиск/',
+                'query_string': b'q=1',
+                'headers': [
+                    (b'content-type', b'text/plain'),
+                    (b'accept', b'text/html'),
+                    (b'accept', b'application/json'),
+                ],
+            },
+            None,
+        )
+        self.assertEqual(environ['REQUEST_METHOD'], 'POST')
+        self.assertEqual(
+            environ['PATH_INFO'].encode('latin-1').decode(), '/поиск/'
+        )
+        self.assertEqual(environ['QUERY_STRING'], 'q=1')
+        self.assertEqual(environ['CONTENT_TYPE'], 'text/plain')
+        self.assertEqual(
+            environ['HTTP_ACCEPT'], 'text/html,application/json'
+        )
+
+    def test_lifespan(self):
+        """Сервер получает подтверждение запуска и остановки"""
+        incoming = [
+            {'type': 'lifespan.startup'},
+            {'type': 'lifespan.shutdown'},
+        ]
+        sent = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        asyncio.run(self.application({'type': 'lifespan'}, receive, send))
+        self.assertEqual(
+            sent,
+            ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+        )
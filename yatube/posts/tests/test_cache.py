@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import versioning
+from ..models import Comment, Post
+
+User = get_user_model()
+POST_PER_PAGE = 10
+
+
+class FeedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый пост {i}', author=cls.user)
+            for i in range(POST_PER_PAGE + 1)
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(FeedCacheTests.user)
+        cache.clear()
+
+    def test_cached_index_skips_feed_query(self):
+        """Повторный запрос главной берет ленту из кеша без запросов"""
+        self.guest_client.get(reverse('index'))
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(reverse('index'))
+        self.assertContains(response, 'Тестовый пост')
+
+    def test_new_post_invalidates_cache(self):
+        """Новый пост виден сразу, несмотря на долгий TTL"""
+        self.guest_client.get(reverse('index'))
+        Post.objects.create(text='Свежий пост', author=FeedCacheTests.user)
+        response = self.guest_client.get(reverse('index'))
+        self.assertContains(response, 'Свежий пост')
+
+    def test_comment_bumps_feed_version(self):
+        """Комментарий сдвигает версию ленты"""
+        version = versioning.get_version(versioning.FEED)
+        Comment.objects.create(
+            post=Post.objects.first(),
+            author=FeedCacheTests.user,
+            text='Комментарий',
+        )
+        self.assertNotEqual(
+            versioning.get_version(versioning.FEED), version
+        )
+
+    def test_pages_cached_separately(self):
+        """Вторая страница не отдает закешированную первую"""
+        first = self.guest_client.get(reverse('index'))
+        cursor = first.context['page'].next_cursor
+        second = self.guest_client.get(reverse('index'), {'cursor': cursor})
+        self.assertContains(second, 'Тестовый пост 0')
+        self.assertNotContains(second, 'Тестовый пост 10')
+
+    def test_edit_links_not_shared(self):
+        """Ссылки редактирования автора не попадают гостю из кеша"""
+        response = self.authorized_client.get(reverse('index'))
+        self.assertContains(response, 'Редактировать')
+        response = self.guest_client.get(reverse('index'))
+        self.assertNotContains(response, 'Редактировать')
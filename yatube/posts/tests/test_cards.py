@@ -0,0 +1,123 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import cards
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Коты', slug='cats')
+        for i in range(3):
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.user, group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def posts(self):
+        return list(Post.objects.for_feed())
+
+    def test_cards_cached(self):
+        """Повторная сборка берет карточки из кеша без рендера"""
+        first = cards.render_cards(self.posts())
+        with mock.patch.object(cards, 'render_card') as render:
+            second = cards.render_cards(self.posts())
+        render.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_single_get_many(self):
+        """Все карточки страницы читаются одним обращением к кешу"""
+        cards.render_cards(self.posts())
+        with mock.patch.object(
+            cards.cache, 'get_many', wraps=cards.cache.get_many
+        ) as get_many:
+            cards.render_cards(self.posts())
+        # get_many версии CARDS и get_many всех карточек
+        self.assertEqual(get_many.call_count, 2)
+        self.assertEqual(len(get_many.call_args[0][0]), 3)
+
+    def test_edit_changes_card(self):
+        """Правка поста дает новый ключ карточки"""
+        cards.render_cards(self.posts())
+        post = Post.objects.get(text='Пост 1')
+        post.text = 'Новый текст'
+        post.save()
+        html = ''.join(cards.render_cards(self.posts()))
+        self.assertIn('Новый текст', html)
+        self.assertNotIn('Пост 1', html)
+
+    def test_comment_changes_card(self):
+        """Новый комментарий обновляет их число в карточке"""
+        cards.render_cards(self.posts())
+        post = Post.objects.get(text='Пост 1')
+        Comment.objects.create(
+            post=post, author=PostCardCacheTests.reader, text='Мяу'
+        )
+        html = ''.join(cards.render_cards(self.posts()))
+        self.assertIn('Комментариев: 1', html)
+
+    def test_group_rename_changes_card(self):
+        """Переименование группы сдвигает версию всех карточек"""
+        cards.render_cards(self.posts())
+        group = PostCardCacheTests.group
+        group.title = 'Кошки'
+        group.save()
+        html = ''.join(cards.render_cards(self.posts()))
+        self.assertIn('#Кошки', html)
+
+    def test_group_delete_changes_card(self):
+        """Удаление группы убирает ее из карточек"""
+        cards.render_cards(self.posts())
+        Group.objects.get(slug='cats').delete()
+        html = ''.join(cards.render_cards(self.posts()))
+        self.assertNotIn('#Коты', html)
+
+    def test_username_change_changes_card(self):
+        """Новое имя автора появляется в карточках"""
+        cards.render_cards(self.posts())
+        user = User.objects.get(username='GulyaevEO')
+        user.username = 'Gulyaev'
+        user.save()
+        html = ''.join(cards.render_cards(self.posts()))
+        self.assertIn('/Gulyaev/', html)
+        self.assertNotIn('/GulyaevEO/', html)
+
+    def test_edit_link_for_author_only(self):
+        """Ссылку на редактирование видит только автор поста"""
+        posts = self.posts()
+        for user, count in (
+            (PostCardCacheTests.user, 3),
+            (PostCardCacheTests.reader, 0),
+            (AnonymousUser(), 0),
+        ):
+            with self.subTest(user=user):
+                html = ''.join(cards.render_cards(posts, user))
+                self.assertEqual(html.count('Редактировать'), count)
+                self.assertNotIn(str(cards.ACTIONS_MARKER), html)
+
+    def test_pages_use_cards(self):
+        """Списки постов собираются из карточек"""
+        client = Client()
+        client.force_login(PostCardCacheTests.user)
+        for url in (
+            reverse('index'),
+            reverse('group_posts', kwargs={'slug': 'cats'}),
+            reverse('profile', kwargs={'username': 'GulyaevEO'}),
+        ):
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertContains(response, 'Редактировать', count=3)
+                self.assertContains(response, '#Коты', count=3)
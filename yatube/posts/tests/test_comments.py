@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Post
+from ..views import COMMENTS_PER_PAGE
+
+User = get_user_model()
+
+
+# Проверяется рендер страницы поста, а не кеш страниц для гостей
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        cls.post = Post.objects.create(
+            text='Популярный пост',
+            author=cls.user,
+        )
+        authors = [
+            User.objects.create_user(username=f'reader{i}')
+            for i in range(3)
+        ]
+        Comment.objects.bulk_create(
+            Comment(
+                post=cls.post,
+                author=authors[i % len(authors)],
+                text=f'Комментарий {i}',
+            )
+            for i in range(COMMENTS_PER_PAGE + 5)
+        )
+        cls.ids = list(
+            Comment.objects.order_by('created', 'id')
+            .values_list('id', flat=True)
+        )
+        cls.post_url = reverse(
+            'post_view',
+            kwargs={'username': cls.user.username, 'post_id': cls.post.pk}
+        )
+        cls.comments_url = reverse(
+            'post_comments',
+            kwargs={'username': cls.user.username, 'post_id': cls.post.pk}
+        )
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_post_page_shows_first_chunk(self):
+        """Страница поста выводит только первую порцию комментариев"""
+        response = self.client.get(CommentPaginationTests.post_url)
+        page = response.context['comments_page']
+        self.assertEqual(
+            [comment.pk for comment in page],
+            CommentPaginationTests.ids[:COMMENTS_PER_PAGE]
+        )
+        self.assertContains(response, 'id="comments-more"')
+        self.assertNotContains(
+            response, f'Комментарий {COMMENTS_PER_PAGE}<'
+        )
+
+    def test_comment_authors_loaded_with_comments(self):
+        """Авторы комментариев выбираются тем же запросом"""
+        self.client.get(CommentPaginationTests.post_url)
+        # Статистика автора и комментарии; автор и пост - из кеша
+        with self.assertNumQueries(2):
+            self.client.get(CommentPaginationTests.post_url)
+
+    def test_json_endpoint_returns_next_chunk(self):
+        """JSON-адрес отдает следующую порцию и признак конца"""
+        response = self.client.get(CommentPaginationTests.post_url)
+        cursor = response.context['comments_page'].next_cursor
+        response = self.client.get(
+            CommentPaginationTests.comments_url, {'cursor': cursor}
+        )
+        data = response.json()
+        self.assertEqual(
+            [comment['id'] for comment in data['comments']],
+            CommentPaginationTests.ids[COMMENTS_PER_PAGE:]
+        )
+        self.assertIsNone(data['next_url'])
+        self.assertIn(f'Комментарий {COMMENTS_PER_PAGE}<', data['html'])
+
+    def test_json_endpoint_checks_author(self):
+        """Комментарии чужого поста по адресу автора не отдаются"""
+        response = self.client.get(
+            reverse(
+                'post_comments',
+                kwargs={
+                    'username': 'reader0',
+                    'post_id': CommentPaginationTests.post.pk,
+                }
+            )
+        )
+        self.assertEqual(response.status_code, 404)
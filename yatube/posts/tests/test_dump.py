@@ -0,0 +1,130 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import AuthorStats, Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class DumpCommandsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.dump_dir = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            description='Тестовый текст',
+            slug='test-slug'
+        )
+        cls.pub_date = timezone.make_aware(datetime(2021, 5, 1, 12, 0))
+        for i in range(5):
+            post = Post.objects.create(
+                text=f'Тестовый пост {i}',
+                author=cls.user,
+                group=cls.group,
+            )
+            Comment.objects.create(post=post, author=cls.reader, text='Ок')
+        Post.objects.update(pub_date=cls.pub_date)
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.dump_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def export(self, name, **options):
+        path = os.path.join(self.dump_dir, name)
+        call_command('export_posts', output=path, stderr=StringIO(),
+                     **options)
+        return path
+
+    def clear(self):
+        Group.objects.all().delete()
+        Post.objects.all().delete()
+        Follow.objects.all().delete()
+
+    def test_jsonl_round_trip(self):
+        """Дамп JSONL загружается обратно со всеми связями и датами"""
+        path = self.export('dump.jsonl')
+        self.clear()
+        call_command('import_posts', path, batch_size=2, stdout=StringIO())
+        self.assertEqual(Group.objects.count(), 1)
+        self.assertEqual(Post.objects.count(), 5)
+        self.assertEqual(Comment.objects.count(), 5)
+        self.assertTrue(
+            Follow.objects.filter(
+                user=DumpCommandsTests.reader, author=DumpCommandsTests.user
+            ).exists()
+        )
+        self.assertEqual(
+            set(Post.objects.values_list('pub_date', flat=True)),
+            {DumpCommandsTests.pub_date}
+        )
+        self.assertEqual(
+            AuthorStats.objects.get(user=DumpCommandsTests.user).posts_count,
+            5
+        )
+
+    def test_csv_single_model(self):
+        """CSV выгружает и загружает одну модель"""
+        path = self.export('groups.csv', format='csv', model=['group'])
+        Group.objects.all().delete()
+        call_command('import_posts', path, format='csv', model='group',
+                     skip_rebuild=True, stdout=StringIO())
+        self.assertEqual(
+            Group.objects.get().slug, DumpCommandsTests.group.slug
+        )
+
+    def test_ignore_conflicts(self):
+        """Повторная загрузка с --ignore-conflicts не дублирует записи"""
+        path = self.export('dump.jsonl', model=['post'])
+        call_command('import_posts', path, ignore_conflicts=True,
+                     skip_rebuild=True, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 5)
+
+    def test_missing_users(self):
+        """Без --create-users неизвестный автор - ошибка команды"""
+        path = self.export('dump.jsonl', model=['follow'])
+        Follow.objects.all().delete()
+        User.objects.filter(username='reader').delete()
+        with self.assertRaises(CommandError):
+            call_command('import_posts', path, stdout=StringIO())
+        call_command('import_posts', path, create_users=True,
+                     skip_rebuild=True, stdout=StringIO())
+        self.assertTrue(User.objects.filter(username='reader').exists())
+
+    def test_import_purges_cached_pages(self):
+        """Загруженные комментарии сразу видны в кешированных страницах"""
+        cache.clear()
+        path = self.export('comments.jsonl', model=['comment'])
+        Comment.objects.all().delete()
+        post = Post.objects.order_by('pk').first()
+        urls = (
+            reverse('profile', kwargs={'username': 'GulyaevEO'}),
+            reverse('group_posts', kwargs={'slug': 'test-slug'}),
+            reverse(
+                'post_view',
+                kwargs={'username': 'GulyaevEO', 'post_id': post.pk}
+            ),
+        )
+        client = Client()
+        for url in urls:
+            self.assertNotContains(client.get(url), 'Ок')
+        call_command('import_posts', path, stdout=StringIO())
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertContains(client.get(url), 'Комментариев: 1')
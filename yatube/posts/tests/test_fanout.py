@@ -0,0 +1,93 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from .. import fanout
+from ..models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(VIEW_FANOUT_WORKERS=2)
+class FanoutTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='GulyaevEO')
+        self.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.post = Post.objects.create(
+            text='Тестовый пост', author=self.user
+        )
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        self.client = Client()
+        self.client.force_login(self.reader)
+        cache.clear()
+
+    def test_gather_runs_in_threads(self):
+        """Функции выполняются в пуле, результаты - в порядке вызова"""
+        results = fanout.gather(
+            lambda: (1, threading.get_ident()),
+            lambda: (2, Post.objects.count()),
+        )
+        self.assertEqual(results[0][0], 1)
+        self.assertNotEqual(results[0][1], threading.get_ident())
+        self.assertEqual(results[1], (2, 1))
+
+    def test_gather_inline_in_transaction(self):
+        """В транзакции запросы идут по очереди в том же соединении"""
+        with transaction.atomic():
+            Post.objects.create(text='Черновик', author=self.user)
+            results = fanout.gather(
+                threading.get_ident,
+                Post.objects.count,
+            )
+        self.assertEqual(results, [threading.get_ident(), 2])
+
+    def test_threads_keep_connections(self):
+        """Потоки пула не закрывают соединения раньше CONN_MAX_AGE"""
+        # Свой пул: в потоках общего могли остаться соединения,
+        # открытые другими тестами без CONN_MAX_AGE
+        executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(executor.shutdown)
+        wrapper = type(connections['default'])
+        with mock.patch.object(
+            fanout, 'get_executor', return_value=executor
+        ), mock.patch.dict(
+            connections.databases['default'], CONN_MAX_AGE=600
+        ), mock.patch.object(wrapper, 'close', autospec=True) as close:
+            fanout.gather(Post.objects.count, Post.objects.count)
+        close.assert_not_called()
+
+    def test_pages_render_with_fanout(self):
+        """Профиль и пост собираются из параллельных запросов"""
+        response = self.client.get(
+            reverse('profile', kwargs={'username': 'GulyaevEO'})
+        )
+        self.assertTrue(response.context['following'])
+        self.assertEqual(response.context['stats'].posts_count, 1)
+        self.assertEqual(list(response.context['page']), [self.post])
+        response = self.client.get(
+            reverse(
+                'post_view',
+                kwargs={'username': 'GulyaevEO', 'post_id': self.post.pk}
+            )
+        )
+        self.assertEqual(response.context['post'], self.post)
+        self.assertEqual(len(response.context['comments_page']), 1)
+
+    def test_missing_post_is_404(self):
+        """Http404 из потока пула доходит до обработчика"""
+        response = self.client.get(
+            reverse(
+                'post_view',
+                kwargs={'username': 'reader', 'post_id': self.post.pk}
+            )
+        )
+        self.assertEqual(response.status_code, 404)
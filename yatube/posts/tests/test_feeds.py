@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(SYNDICATION_ITEMS=3)
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(title='Коты', slug='cats')
+        for i in range(5):
+            Post.objects.create(
+                text=f'Пост автора {i}', author=cls.user, group=cls.group
+            )
+        Post.objects.create(text='Чужой пост', author=cls.other)
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def test_feeds_bounded_and_ordered(self):
+        """Лента - последние посты источника в обратном порядке"""
+        response = self.client.get(reverse('rss'))
+        self.assertTrue(
+            response['Content-Type'].startswith('application/rss+xml')
+        )
+        content = response.content.decode()
+        self.assertEqual(content.count('<item>'), 3)
+        self.assertLess(
+            content.index('Чужой пост'), content.index('Пост автора 4')
+        )
+        self.assertNotIn('Пост автора 2', content)
+
+    def test_source_feeds(self):
+        """Ленты группы и автора содержат только свои посты"""
+        for url in (
+            reverse('group_rss', kwargs={'slug': 'cats'}),
+            reverse('group_atom', kwargs={'slug': 'cats'}),
+            reverse('profile_rss', kwargs={'username': 'GulyaevEO'}),
+            reverse('profile_atom', kwargs={'username': 'GulyaevEO'}),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, 'Пост автора 4')
+                self.assertNotContains(response, 'Чужой пост')
+        response = self.client.get(
+            reverse('profile_rss', kwargs={'username': 'nobody'})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_get(self):
+        """Опрос неизменившейся ленты стоит 304 без запросов к базе"""
+        url = reverse('group_atom', kwargs={'slug': 'cats'})
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            by_etag = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            by_date = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+        self.assertEqual(by_etag.status_code, 304)
+        self.assertEqual(by_date.status_code, 304)
+
+    def test_new_post_invalidates_feed(self):
+        """Новый пост сразу попадает в ленту своего источника"""
+        url = reverse('profile_rss', kwargs={'username': 'GulyaevEO'})
+        etag = self.client.get(url)['ETag']
+        other_url = reverse('profile_rss', kwargs={'username': 'other'})
+        other_etag = self.client.get(other_url)['ETag']
+        Post.objects.create(text='Свежий пост', author=FeedTests.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Свежий пост')
+        response = self.client.get(other_url, HTTP_IF_NONE_MATCH=other_etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_pages_link_feeds(self):
+        """Страницы объявляют свои ленты"""
+        response = self.client.get(reverse('group_posts', args=['cats']))
+        self.assertContains(
+            response, reverse('group_rss', kwargs={'slug': 'cats'})
+        )
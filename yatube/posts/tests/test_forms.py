@@ -76,7 +76,8 @@ class TaskCreateFormTests(TestCase):
         self.assertTrue(
             Post.objects.filter(
                 text=TaskCreateFormTests.text_post2,
-                image='posts/small.gif'
+                image__startswith='posts/',
+                image__endswith='.webp',
             ).exists()
         )
 
@@ -125,7 +126,8 @@ class TaskCreateFormTests(TestCase):
         self.assertTrue(
             Post.objects.filter(
                 text=TaskCreateFormTests.text_post3,
-                image='posts/small2.gif'
+                image__startswith='posts/',
+                image__endswith='.webp',
             ).exists()
         )
 
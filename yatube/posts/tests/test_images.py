@@ -0,0 +1,128 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .. import images
+from ..models import Post
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+# Тег EXIF Orientation: 6 - снято с поворотом на 90° по часовой
+ORIENTATION = 0x0112
+
+
+def make_upload(size=(400, 200), mode='RGB', image_format='JPEG',
+                name='photo.jpg', orientation=None):
+    buffer = BytesIO()
+    image = Image.new(mode, size, (255, 0, 0, 128)[:len(mode)])
+    options = {}
+    if orientation is not None:
+        exif = Image.Exif()
+        exif[ORIENTATION] = orientation
+        options['exif'] = exif.tobytes()
+    image.save(buffer, image_format, **options)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+def open_result(upload):
+    return Image.open(BytesIO(upload.read()))
+
+
+@override_settings(IMAGE_FORMAT='WEBP', IMAGE_MAX_SIDE=300)
+class ImageProcessingTests(TestCase):
+    def test_reencoded_to_webp(self):
+        """Картинка пересохраняется в WebP под новым расширением"""
+        result = images.process_upload(make_upload())
+        self.assertEqual(result.name, 'photo.webp')
+        self.assertEqual(open_result(result).format, 'WEBP')
+
+    def test_downscaled(self):
+        """Большая сторона уменьшается до IMAGE_MAX_SIDE"""
+        image = open_result(images.process_upload(make_upload()))
+        self.assertEqual(image.size, (300, 150))
+
+    def test_exif_applied_and_stripped(self):
+        """Поворот из EXIF применяется, сами метаданные удаляются"""
+        image = open_result(
+            images.process_upload(make_upload(orientation=6))
+        )
+        self.assertEqual(image.size, (150, 300))
+        self.assertNotIn(ORIENTATION, image.getexif())
+
+    def test_transparency_kept(self):
+        """Прозрачность PNG сохраняется в WebP"""
+        upload = make_upload(
+            mode='RGBA', image_format='PNG', name='logo.png'
+        )
+        image = open_result(images.process_upload(upload))
+        self.assertEqual(image.mode, 'RGBA')
+
+    @override_settings(IMAGE_FORMAT='JPEG')
+    def test_progressive_jpeg(self):
+        """Формат JPEG сохраняется прогрессивным"""
+        image = open_result(images.process_upload(make_upload()))
+        self.assertEqual(image.format, 'JPEG')
+        self.assertTrue(image.info.get('progressive'))
+
+    @override_settings(IMAGE_MAX_UPLOAD_SIZE=100)
+    def test_file_size_limit(self):
+        """Слишком тяжелый файл отклоняется"""
+        with self.assertRaisesMessage(ValidationError, 'Файл больше'):
+            images.process_upload(make_upload())
+
+    @override_settings(IMAGE_MAX_PIXELS=1000)
+    def test_pixel_limit(self):
+        """Слишком большая картинка отклоняется до распаковки"""
+        with self.assertRaises(ValidationError):
+            images.process_upload(make_upload())
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(ImageUploadTests.user)
+        cache.clear()
+
+    @override_settings(IMAGE_MAX_PIXELS=1000)
+    def test_form_rejects_large_image(self):
+        """Форма показывает ошибку вместо сохранения поста"""
+        response = self.client.post(
+            reverse('new_post'),
+            {'text': 'Пост', 'image': make_upload()},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Post.objects.exists())
+        self.assertTrue(response.context['form'].errors['image'])
+
+    def test_page_has_srcset(self):
+        """В ленте картинка выводится с вариантами ширины"""
+        self.client.post(
+            reverse('new_post'),
+            {'text': 'Пост', 'image': make_upload(size=(2000, 1000))},
+        )
+        post = Post.objects.get()
+        self.assertTrue(post.image.name.endswith('.webp'))
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, 'srcset=')
+        self.assertContains(response, ' 1920w')
@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from yatube.metrics import registry
+from yatube.middleware import QueryBudgetExceeded
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(QUERY_BUDGETS_STRICT=True)
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            description='Тестовый текст',
+            slug='test-slug'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        for i in range(15):
+            post = Post.objects.create(
+                text=f'Тестовый пост {i}',
+                author=cls.user,
+                group=cls.group,
+            )
+            Comment.objects.create(
+                post=post, author=cls.reader, text='Комментарий'
+            )
+        cls.post = post
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(QueryBudgetTests.reader)
+        cache.clear()
+        registry.reset()
+
+    def test_pages_within_budget(self):
+        """Страницы укладываются в бюджет запросов из QUERY_BUDGETS"""
+        user = QueryBudgetTests.user
+        urls = {
+            'index': reverse('index'),
+            'follow_index': reverse('follow_index'),
+            'group_posts': reverse(
+                'group_posts', kwargs={'slug': QueryBudgetTests.group.slug}
+            ),
+            'profile': reverse(
+                'profile', kwargs={'username': user.username}
+            ),
+            'post_view': reverse(
+                'post_view',
+                kwargs={
+                    'username': user.username,
+                    'post_id': QueryBudgetTests.post.pk,
+                }
+            ),
+            'search': reverse('search') + '?q=пост',
+        }
+        for name, url in urls.items():
+            with self.subTest(name=name):
+                response = self.authorized_client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    @override_settings(QUERY_BUDGETS={'index': 0})
+    def test_budget_exceeded_fails(self):
+        """Превышение бюджета в строгом режиме поднимает исключение"""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.guest_client.get(reverse('index'))
+
+    @override_settings(QUERY_BUDGETS={'index': 0},
+                       QUERY_BUDGETS_STRICT=False)
+    def test_budget_exceeded_logged(self):
+        """Без строгого режима превышение пишется в лог"""
+        with self.assertLogs('yatube.metrics', 'WARNING'):
+            response = self.guest_client.get(reverse('index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(registry.snapshot()['index']['over_budget'], 1)
+
+    def test_metrics_recorded(self):
+        """Замеры попадают в гистограммы по имени URL"""
+        self.guest_client.get(reverse('index'))
+        self.guest_client.get(reverse('index'))
+        metrics = registry.snapshot()['index']
+        self.assertEqual(metrics['time_ms']['count'], 2)
+        self.assertEqual(sum(metrics['queries']['buckets'].values()), 2)
+        self.assertGreater(metrics['queries']['max'], 0)
+
+    def test_metrics_endpoint_staff_only(self):
+        """Замеры отдаются только сотрудникам"""
+        response = self.authorized_client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 302)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.authorized_client.force_login(staff)
+        self.guest_client.get(reverse('index'))
+        response = self.authorized_client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('index', response.json()['views'])
+        self.assertEqual(
+            response.json()['cache']['index_page']['miss'], 1
+        )
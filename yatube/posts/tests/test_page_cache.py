@@ -0,0 +1,177 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Коты', slug='cats')
+        cls.other_group = Group.objects.create(title='Собаки', slug='dogs')
+        cls.post = Post.objects.create(
+            text='Пост про котов', author=cls.user, group=cls.group
+        )
+        cls.group_url = reverse('group_posts', kwargs={'slug': 'cats'})
+        cls.other_group_url = reverse('group_posts', kwargs={'slug': 'dogs'})
+        cls.profile_url = reverse(
+            'profile', kwargs={'username': 'GulyaevEO'}
+        )
+        cls.post_url = reverse(
+            'post_view',
+            kwargs={'username': 'GulyaevEO', 'post_id': cls.post.pk}
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(AnonymousPageCacheTests.reader)
+        cache.clear()
+
+    def assertCached(self, url):
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_guest_page_cached(self):
+        """Повторный запрос гостя отдается из кеша без запросов"""
+        for url in (
+            reverse('index'),
+            AnonymousPageCacheTests.group_url,
+            AnonymousPageCacheTests.profile_url,
+            AnonymousPageCacheTests.post_url,
+        ):
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                second = self.assertCached(url)
+                self.assertEqual(first.content, second.content)
+
+    def test_proxy_headers(self):
+        """Гостевой ответ пригоден для хранения в обратном прокси"""
+        response = self.guest_client.get(reverse('index'))
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('s-maxage=', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        response = self.guest_client.get(
+            reverse('index'), HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_query_string_cached_separately(self):
+        """Каждая страница ленты кешируется по своему адресу"""
+        first = self.guest_client.get(reverse('index'))
+        second = self.guest_client.get(reverse('index'), {'cursor': 'x'})
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_authorized_bypasses_cache(self):
+        """Пользователь с сессией получает свою страницу"""
+        self.guest_client.get(AnonymousPageCacheTests.profile_url)
+        response = self.authorized_client.get(
+            AnonymousPageCacheTests.profile_url
+        )
+        self.assertIsNotNone(response.context)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertContains(response, 'Подписаться')
+
+    def test_new_post_purges_only_its_pages(self):
+        """Новый пост сбрасывает свои страницы, но не чужую группу"""
+        self.guest_client.get(AnonymousPageCacheTests.group_url)
+        self.guest_client.get(AnonymousPageCacheTests.other_group_url)
+        self.guest_client.get(AnonymousPageCacheTests.profile_url)
+        Post.objects.create(
+            text='Еще пост', author=AnonymousPageCacheTests.user,
+            group=AnonymousPageCacheTests.group,
+        )
+        for url in (
+            AnonymousPageCacheTests.group_url,
+            AnonymousPageCacheTests.profile_url,
+        ):
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), 'Еще пост')
+        self.assertCached(AnonymousPageCacheTests.other_group_url)
+
+    def test_moved_post_leaves_old_group(self):
+        """Пост, перенесенный в другую группу, пропадает со старой"""
+        self.guest_client.get(AnonymousPageCacheTests.group_url)
+        post = Post.objects.get(pk=AnonymousPageCacheTests.post.pk)
+        post.group = AnonymousPageCacheTests.other_group
+        post.save()
+        response = self.guest_client.get(AnonymousPageCacheTests.group_url)
+        self.assertNotContains(response, 'Пост про котов')
+
+    def test_comment_purges_post_page(self):
+        """Новый комментарий сразу виден на странице поста"""
+        self.guest_client.get(AnonymousPageCacheTests.post_url)
+        Comment.objects.create(
+            post=AnonymousPageCacheTests.post,
+            author=AnonymousPageCacheTests.reader,
+            text='Свежий комментарий',
+        )
+        response = self.guest_client.get(AnonymousPageCacheTests.post_url)
+        self.assertContains(response, 'Свежий комментарий')
+
+    def test_follow_purges_profile(self):
+        """Подписка меняет счетчик в профиле автора"""
+        self.guest_client.get(AnonymousPageCacheTests.profile_url)
+        Follow.objects.create(
+            user=AnonymousPageCacheTests.reader,
+            author=AnonymousPageCacheTests.user,
+        )
+        response = self.guest_client.get(AnonymousPageCacheTests.profile_url)
+        self.assertEqual(response.context['stats'].followers_count, 1)
+
+    def test_group_delete_purges_post_page(self):
+        """После удаления группы страница поста без ссылки на нее"""
+        self.guest_client.get(AnonymousPageCacheTests.post_url)
+        Group.objects.get(slug='cats').delete()
+        response = self.guest_client.get(AnonymousPageCacheTests.post_url)
+        self.assertNotContains(response, '#Коты')
+
+    def test_rename_purges_old_profile(self):
+        """Профиль под старым именем больше не отдается из кеша"""
+        self.guest_client.get(AnonymousPageCacheTests.profile_url)
+        user = User.objects.get(username='GulyaevEO')
+        user.username = 'Gulyaev'
+        user.save()
+        response = self.guest_client.get(AnonymousPageCacheTests.profile_url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_unrelated_saves_keep_feed(self):
+        """Сохранение без смены имени и названия не сбрасывает ленту"""
+        self.guest_client.get(reverse('index'))
+        user = User.objects.get(username='GulyaevEO')
+        user.first_name = 'Евгений'
+        user.save()
+        group = Group.objects.get(slug='cats')
+        group.description = 'Все о котах'
+        group.save()
+        Group.objects.create(title='Птицы', slug='birds')
+        self.assertCached(reverse('index'))
+        group.title = 'Кошки'
+        group.save()
+        self.assertContains(self.guest_client.get(reverse('index')), '#Кошки')
+
+    def test_group_rename_purges_post_pages(self):
+        """Новое название группы видно в профиле и на странице поста"""
+        for url in (
+            AnonymousPageCacheTests.profile_url,
+            AnonymousPageCacheTests.post_url,
+        ):
+            self.guest_client.get(url)
+        group = Group.objects.get(slug='cats')
+        group.title = 'Кошки'
+        group.save()
+        for url in (
+            AnonymousPageCacheTests.profile_url,
+            AnonymousPageCacheTests.post_url,
+        ):
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url), '#Кошки')
@@ -0,0 +1,105 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Post
+from ..paginator import CursorPaginator, InvalidCursor
+
+User = get_user_model()
+POST_PER_PAGE = 10
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый пост {i}', author=cls.user)
+            for i in range(25)
+        )
+        # Одинаковая дата у всех постов: порядок держится на id
+        Post.objects.update(pub_date=timezone.now())
+        cls.ids = list(
+            Post.objects.order_by('-pub_date', '-id')
+            .values_list('id', flat=True)
+        )
+
+    def setUp(self):
+        self.paginator = CursorPaginator(
+            Post.objects.all(), POST_PER_PAGE, with_count=False
+        )
+        self.client = Client()
+        cache.clear()
+
+    def test_pages_follow_each_other(self):
+        """Курсор следующей страницы продолжает ленту без пропусков"""
+        first = self.paginator.get_page(None)
+        second = self.paginator.get_page(first.next_cursor)
+        third = self.paginator.get_page(second.next_cursor)
+        ids = [post.id for page in (first, second, third) for post in page]
+        self.assertEqual(ids, CursorPaginatorTests.ids)
+        self.assertFalse(first.has_previous())
+        self.assertTrue(second.has_previous())
+        self.assertTrue(second.has_next())
+        self.assertFalse(third.has_next())
+        self.assertEqual(len(third), 5)
+
+    def test_previous_cursor_returns_same_page(self):
+        """Курсор назад возвращает предыдущую страницу целиком"""
+        first = self.paginator.get_page(None)
+        second = self.paginator.get_page(first.next_cursor)
+        back = self.paginator.get_page(second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_invalid_cursor(self):
+        """Битый курсор дает первую страницу, а page() - исключение"""
+        page = self.paginator.get_page('не-курсор')
+        self.assertEqual(
+            [post.id for post in page],
+            CursorPaginatorTests.ids[:POST_PER_PAGE]
+        )
+        with self.assertRaises(InvalidCursor):
+            self.paginator.page('bm90LWpzb24')
+
+    def test_without_count_no_count_query(self):
+        """Без подсчета записей страница стоит ровно один запрос"""
+        with self.assertNumQueries(1):
+            page = self.paginator.get_page(None)
+            self.assertTrue(page.has_other_pages())
+            self.assertEqual(len(page), POST_PER_PAGE)
+        self.assertIsNone(self.paginator.count)
+
+    def test_page_numbers_unsupported(self):
+        """Номера страниц недоступны, ошибка подсказывает курсоры"""
+        page = self.paginator.get_page(None)
+        self.assertIsNone(page.number)
+        for method in (page.next_page_number, page.start_index):
+            with self.subTest(method=method):
+                with self.assertRaisesMessage(TypeError, 'next_cursor'):
+                    method()
+        with self.assertRaisesMessage(TypeError, 'next_cursor'):
+            self.paginator.page_range
+
+    def test_with_count(self):
+        """В режиме с подсчетом доступно общее число записей"""
+        paginator = CursorPaginator(Post.objects.all(), POST_PER_PAGE)
+        self.assertEqual(paginator.count, 25)
+        self.assertEqual(paginator.num_pages, 3)
+
+    def test_index_cursor_navigation(self):
+        """Главная страница листается через ?cursor="""
+        response = self.client.get(reverse('index'))
+        page = response.context['page']
+        self.assertContains(response, f'?cursor={page.next_cursor}')
+        response = self.client.get(
+            reverse('index'), {'cursor': page.next_cursor}
+        )
+        self.assertEqual(
+            [post.id for post in response.context['page']],
+            CursorPaginatorTests.ids[POST_PER_PAGE:POST_PER_PAGE * 2]
+        )
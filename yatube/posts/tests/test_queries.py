@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+POST_PER_PAGE = 10
+
+
+class FeedQueryCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            description='Тестовый текст',
+            slug='test-slug'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        cls.urls = (
+            reverse('index'),
+            reverse('group_posts', kwargs={'slug': cls.group.slug}),
+            reverse('profile', kwargs={'username': cls.user.username}),
+            reverse('follow_index'),
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(FeedQueryCountTests.reader)
+
+    def create_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(
+                text=f'Тестовый пост {i}',
+                author=FeedQueryCountTests.user,
+                group=FeedQueryCountTests.group,
+            )
+            Comment.objects.create(
+                post=post,
+                author=FeedQueryCountTests.reader,
+                text='Комментарий',
+            )
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        """Число запросов ленты не растет вместе с числом постов"""
+        self.create_posts(1)
+        one_post = {url: self.count_queries(url) for url in self.urls}
+        self.create_posts(POST_PER_PAGE)
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), one_post[url])
+
+    def test_comment_count_annotation(self):
+        """for_feed подставляет число комментариев без запроса"""
+        self.create_posts(2)
+        posts = list(Post.objects.for_feed())
+        with self.assertNumQueries(0):
+            self.assertEqual([post.comment_count for post in posts], [1, 1])
+            self.assertEqual(posts[0].author, FeedQueryCountTests.user)
+            self.assertEqual(posts[0].group, FeedQueryCountTests.group)
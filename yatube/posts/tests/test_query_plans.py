@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class QueryPlanTests(TestCase):
+    """Каждый запрос страниц читает данные по индексу, без сортировки"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            description='Тестовый текст',
+            slug='test-slug'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        for i in range(15):
+            cls.post = Post.objects.create(
+                text=f'Тестовый пост {i}',
+                author=cls.user,
+                group=cls.group,
+            )
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text='Комментарий'
+            )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(QueryPlanTests.reader)
+        cache.clear()
+
+    def capture(self, url):
+        """SQL и параметры всех запросов страницы"""
+        queries = []
+
+        def collect(execute, sql, params, many, context):
+            queries.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(collect):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, queries
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_plans_use_indexes(self, url):
+        response, queries = self.capture(url)
+        for sql, params in queries:
+            if not sql.startswith('SELECT'):
+                continue
+            for step in self.explain(sql, params):
+                with self.subTest(url=url, sql=sql[:80], step=step):
+                    self.assertNotIn('TEMP B-TREE', step)
+                    if step.startswith('SCAN '):
+                        self.assertIn('USING', step)
+        return response
+
+    def test_feed_pages(self):
+        """Ленты, профиль и пост читаются по составным индексам"""
+        user = QueryPlanTests.user
+        urls = (
+            reverse('index'),
+            reverse('follow_index'),
+            reverse(
+                'group_posts', kwargs={'slug': QueryPlanTests.group.slug}
+            ),
+            reverse('profile', kwargs={'username': user.username}),
+            reverse(
+                'post_view',
+                kwargs={
+                    'username': user.username,
+                    'post_id': QueryPlanTests.post.pk,
+                }
+            ),
+        )
+        for url in urls:
+            response = self.assert_plans_use_indexes(url)
+            page = response.context.get('page')
+            if page is not None and page.has_next():
+                # Следующая страница добавляет условие по курсору
+                self.assert_plans_use_indexes(
+                    f'{url}?cursor={page.next_cursor}'
+                )
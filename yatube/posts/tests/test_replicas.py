@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from yatube import routers
+from yatube.metrics import registry
+
+from .. import fanout, repository, stats
+from ..models import AuthorStats, Post
+
+User = get_user_model()
+
+REPLICA = 'replica'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA], VIEW_FANOUT_WORKERS=2)
+class ReplicaRoutingTests(TransactionTestCase):
+    """Реплика - отдельный файл SQLite, отстающий от основной базы"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Один путь на все тесты: потоки posts.fanout хранят свои
+        # обертки соединений с настройками реплики
+        cls.directory = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.directory, 'replica.sqlite3')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        connections.databases[REPLICA] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': self.path,
+        }
+        self.user = User.objects.create_user(username='GulyaevEO')
+        Post.objects.create(text='Пост на реплике', author=self.user)
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.replicate()
+        Post.objects.create(text='Пост только в основной', author=self.user)
+        cache.clear()
+
+    def tearDown(self):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.databases[REPLICA]
+        os.remove(self.path)
+
+    def replicate(self):
+        primary = connections['default']
+        primary.ensure_connection()
+        connections[REPLICA].ensure_connection()
+        primary.connection.backup(connections[REPLICA].connection)
+
+    def test_feed_reads_from_replica(self):
+        """Лента читается с реплики и не видит свежей записи"""
+        response = self.authorized_client.get(reverse('index'))
+        self.assertContains(response, 'Пост на реплике')
+        self.assertNotContains(response, 'Пост только в основной')
+
+    def test_forms_read_from_primary(self):
+        """Страница вне REPLICA_READ_VIEWS читает из основной базы"""
+        post = Post.objects.get(text='Пост только в основной')
+        response = self.authorized_client.get(
+            reverse(
+                'post_edit',
+                kwargs={'username': 'GulyaevEO', 'post_id': post.pk}
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_author_reads_own_writes(self):
+        """После записи автор читает из основной базы"""
+        response = self.authorized_client.post(
+            reverse('new_post'), {'text': 'Новый пост'}
+        )
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+        self.assertEqual(Post.objects.using(REPLICA).count(), 1)
+        url = reverse('profile', kwargs={'username': 'GulyaevEO'})
+        response = self.authorized_client.get(url)
+        self.assertContains(response, 'Новый пост')
+        del self.authorized_client.cookies[routers.PIN_COOKIE]
+        response = self.authorized_client.get(url)
+        self.assertNotContains(response, 'Новый пост')
+
+    def test_page_cache_miss_reads_primary(self):
+        """Страница для гостей кешируется из основной базы"""
+        response = self.guest_client.get(reverse('index'))
+        self.assertContains(response, 'Пост только в основной')
+
+    def test_repository_miss_reads_primary(self):
+        """Промах кеша объектов читается из основной базы"""
+        post = Post.objects.get(text='Пост только в основной')
+        with routers.replica_reads():
+            self.assertEqual(repository.posts([post.pk]), [post])
+
+    def test_missing_stats_created_on_primary(self):
+        """Статистика, созданная при чтении с реплики, читается из основной"""
+        reader = User.objects.create_user(username='reader')
+        Post.objects.create(text='Пост читателя', author=reader)
+        AuthorStats.objects.filter(user=reader).delete()
+        with routers.replica_reads():
+            self.assertEqual(stats.for_author(reader).posts_count, 1)
+
+    def test_fanout_threads_read_from_replica(self):
+        """Потоки posts.fanout наследуют выбор базы запроса"""
+        with routers.replica_reads():
+            results = fanout.gather(Post.objects.count, Post.objects.count)
+        self.assertEqual(results, [1, 1])
+
+    def test_replica_queries_measured(self):
+        """Запросы к реплике, в том числе из потоков, попадают в замеры"""
+        url = reverse('profile', kwargs={'username': 'GulyaevEO'})
+        counts = []
+        for pinned in (True, False):
+            cache.clear()
+            registry.reset()
+            client = self.authorized_client
+            if pinned:
+                client.cookies[routers.PIN_COOKIE] = '1'
+            else:
+                del client.cookies[routers.PIN_COOKIE]
+            client.get(url)
+            counts.append(registry.snapshot()['profile']['queries']['max'])
+        self.assertGreater(counts[0], 0)
+        self.assertEqual(counts[1], counts[0])
+
+    def test_writes_and_migrations_go_to_primary(self):
+        """Запись и миграции - только в основную базу"""
+        router = routers.ReplicaRouter()
+        with routers.replica_reads():
+            self.assertEqual(router.db_for_read(Post), REPLICA)
+            self.assertEqual(router.db_for_write(Post), routers.PRIMARY)
+        self.assertEqual(router.db_for_read(Post), routers.PRIMARY)
+        self.assertFalse(router.allow_migrate(REPLICA, 'posts'))
+        self.assertTrue(router.allow_migrate('default', 'posts'))
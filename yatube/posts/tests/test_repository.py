@@ -0,0 +1,154 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import repository
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class RepositoryTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Коты', slug='cats')
+        cls.posts = [
+            Post.objects.create(
+                text=f'Пост {i}', author=cls.user, group=cls.group
+            )
+            for i in range(3)
+        ]
+        cls.ids = [post.pk for post in reversed(cls.posts)]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_misses_loaded_with_one_query(self):
+        """Промахи догружаются одним запросом, затем берутся из кеша"""
+        repository.posts(RepositoryTests.ids[:1])
+        with self.assertNumQueries(1):
+            posts = repository.posts(RepositoryTests.ids)
+        with self.assertNumQueries(0):
+            self.assertEqual(repository.posts(RepositoryTests.ids), posts)
+            self.assertEqual(posts[0].author, RepositoryTests.user)
+            self.assertEqual(posts[0].group, RepositoryTests.group)
+            self.assertEqual(posts[0].comment_count, 0)
+        self.assertEqual([post.pk for post in posts], RepositoryTests.ids)
+
+    def test_single_cache_round_trip(self):
+        """Все ключи читаются одним get_many и пишутся одним set_many"""
+        with mock.patch.object(
+            repository.cache, 'get_many', wraps=repository.cache.get_many
+        ) as get_many, mock.patch.object(
+            repository.cache, 'set_many', wraps=repository.cache.set_many
+        ) as set_many:
+            repository.posts(RepositoryTests.ids)
+        self.assertEqual(get_many.call_count, 1)
+        self.assertEqual(set_many.call_count, 1)
+
+    def test_deleted_skipped(self):
+        """Несуществующие ключи пропускаются"""
+        self.assertEqual(repository.posts([0]), [])
+        self.assertIsNone(repository.get_post(0))
+
+    def test_post_edit_invalidates(self):
+        """Правка поста удаляет его из кеша"""
+        repository.posts(RepositoryTests.ids)
+        post = Post.objects.get(pk=RepositoryTests.ids[0])
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(
+            repository.get_post(post.pk).text, 'Новый текст'
+        )
+
+    def test_comment_invalidates(self):
+        """Новый комментарий меняет число комментариев поста"""
+        post_id = RepositoryTests.ids[0]
+        repository.posts(RepositoryTests.ids)
+        Comment.objects.create(
+            post_id=post_id, author=RepositoryTests.reader, text='Мяу'
+        )
+        self.assertEqual(repository.get_post(post_id).comment_count, 1)
+
+    def test_group_rename_invalidates(self):
+        """Переименование группы обновляет группу и ее посты"""
+        group = RepositoryTests.group
+        repository.posts(RepositoryTests.ids)
+        repository.get_group('cats')
+        group.title = 'Кошки'
+        group.save()
+        self.assertEqual(repository.get_group('cats').title, 'Кошки')
+        self.assertEqual(
+            repository.get_post(RepositoryTests.ids[0]).group.title, 'Кошки'
+        )
+
+    def test_user_change_invalidates(self):
+        """Изменение автора обновляет его посты, а вход - нет"""
+        user = User.objects.get(pk=RepositoryTests.user.pk)
+        repository.posts(RepositoryTests.ids)
+        Client().force_login(user)
+        with self.assertNumQueries(0):
+            repository.posts(RepositoryTests.ids)
+        user.first_name = 'Евгений'
+        user.save()
+        self.assertEqual(
+            repository.get_user('GulyaevEO').first_name, 'Евгений'
+        )
+        self.assertEqual(
+            repository.get_post(RepositoryTests.ids[0]).author.first_name,
+            'Евгений',
+        )
+
+    def test_lookup_by_unique_field(self):
+        """Группа и автор по slug и имени берутся из кеша"""
+        self.assertIsNone(repository.get_group('dogs'))
+        repository.get_group('cats')
+        repository.get_user('GulyaevEO')
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                repository.get_group('cats'), RepositoryTests.group
+            )
+            self.assertEqual(
+                repository.get_user('GulyaevEO'), RepositoryTests.user
+            )
+
+    def test_renamed_lookup_misses(self):
+        """Старое имя после переименования не находит пользователя"""
+        user = User.objects.get(pk=RepositoryTests.user.pk)
+        repository.get_user('GulyaevEO')
+        user.username = 'Gulyaev'
+        user.save()
+        self.assertIsNone(repository.get_user('GulyaevEO'))
+        self.assertEqual(repository.get_user('Gulyaev'), user)
+
+    def test_recreated_username_found(self):
+        """Пользователь с именем откаченного находится заново"""
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            User.objects.create_user(username='ghost')
+            repository.get_user('ghost')
+            raise RuntimeError
+        User.objects.create_user(username='other')
+        user = User.objects.create_user(username='ghost')
+        self.assertEqual(repository.get_user('ghost').pk, user.pk)
+
+    def test_feed_page_from_cache(self):
+        """Лента выбирает из базы только ключи постов страницы"""
+        client = Client()
+        client.force_login(RepositoryTests.reader)
+        url = reverse('group_posts', kwargs={'slug': 'cats'})
+        client.get(url)
+        with mock.patch(
+            'posts.models.PostQuerySet.in_bulk', side_effect=AssertionError
+        ):
+            response = client.get(url)
+        self.assertEqual(
+            [post.pk for post in response.context['page']],
+            RepositoryTests.ids,
+        )
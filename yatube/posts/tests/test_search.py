@@ -0,0 +1,108 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import search
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        cls.group = Group.objects.create(
+            title='Путешествия',
+            description='Тестовый текст',
+            slug='travel'
+        )
+        cls.post = Post.objects.create(
+            text='Поездка на Байкал зимой',
+            author=cls.user,
+        )
+        cls.group_post = Post.objects.create(
+            text='Фотографии с дороги',
+            author=cls.user,
+            group=cls.group,
+        )
+        cls.commented_post = Post.objects.create(
+            text='Просто пост',
+            author=cls.user,
+        )
+        Comment.objects.create(
+            post=cls.commented_post,
+            author=cls.user,
+            text='А я был на Байкале летом',
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.backend = search.get_backend()
+
+    def found(self, query):
+        return list(self.backend.search(query)[:10])
+
+    def test_finds_posts_comments_and_groups(self):
+        """Поиск идет по тексту поста, комментариям и названию группы"""
+        self.assertEqual(
+            self.found('байкал'),
+            [SearchTests.post, SearchTests.commented_post]
+        )
+        self.assertEqual(self.found('путешеств'), [SearchTests.group_post])
+        self.assertEqual(len(self.backend.search('байкал')), 2)
+
+    def test_index_updates_incrementally(self):
+        """Индекс следует за изменением и удалением постов и групп"""
+        post = Post.objects.get(pk=SearchTests.post.pk)
+        post.text = 'Поездка на Алтай'
+        post.save()
+        self.assertEqual(self.found('алтай'), [post])
+        self.assertEqual(self.found('зимой'), [])
+
+        group = Group.objects.get(pk=SearchTests.group.pk)
+        group.title = 'Горы'
+        group.save()
+        self.assertEqual(self.found('горы'), [SearchTests.group_post])
+
+        Post.objects.filter(pk=SearchTests.commented_post.pk).delete()
+        self.assertEqual(self.found('летом'), [])
+
+    def test_query_syntax_is_escaped(self):
+        """Операторы FTS5 во вводе не ломают запрос"""
+        self.assertEqual(self.found('"байкал AND (NOT*'), [])
+        self.assertEqual(self.found(''), [])
+
+    def test_rebuild_command(self):
+        """rebuild_search_index восстанавливает индекс"""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.POSTS_TABLE}')
+        self.assertEqual(self.found('фотографии'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.found('фотографии'), [SearchTests.group_post])
+
+    def test_search_page(self):
+        """Страница поиска показывает найденные посты"""
+        response = self.client.get(reverse('search'), {'q': 'Байкал'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            list(response.context['page']),
+            [SearchTests.post, SearchTests.commented_post]
+        )
+        self.assertContains(response, 'Найдено постов: 2')
+
+    @override_settings(
+        POSTS_SEARCH_BACKEND='posts.search.DatabaseSearchBackend'
+    )
+    def test_database_backend(self):
+        """Запасной бэкенд ищет без индекса"""
+        backend = search.get_backend()
+        self.assertEqual(
+            set(backend.search('Байкал')),
+            {SearchTests.post, SearchTests.commented_post}
+        )
@@ -0,0 +1,184 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.template import Context, Template
+from django.test import SimpleTestCase
+
+from yatube.fake_redis import FakeRedisServer
+from yatube.metrics import registry
+from yatube.redis_cache import RedisCache
+
+from .. import feed_cache, versioning
+
+
+class RedisCacheTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeRedisServer()
+        cls.cache = RedisCache(
+            cls.server.start(), {'KEY_PREFIX': 'yatube', 'TIMEOUT': 60}
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.cache.clear()
+
+    def test_get_set_delete(self):
+        """Значения любых типов читаются так же, как записаны"""
+        self.cache.set('post', {'text': 'Тест', 'id': 1})
+        self.cache.set('count', 5)
+        self.assertEqual(self.cache.get('post'), {'text': 'Тест', 'id': 1})
+        self.assertEqual(self.cache.get('count'), 5)
+        self.cache.delete('post')
+        self.assertIsNone(self.cache.get('post'))
+        self.assertEqual(self.cache.get('post', 'нет'), 'нет')
+
+    def test_add_only_missing(self):
+        """add не перезаписывает существующий ключ"""
+        self.assertTrue(self.cache.add('lock', 1))
+        self.assertFalse(self.cache.add('lock', 2))
+        self.assertEqual(self.cache.get('lock'), 1)
+
+    def test_expiry(self):
+        """Ключ пропадает по истечении срока"""
+        self.cache.set('short', 'значение', 0.05)
+        self.assertTrue(self.cache.has_key('short'))
+        time.sleep(0.1)
+        self.assertFalse(self.cache.has_key('short'))
+
+    def test_incr(self):
+        """incr атомарен на сервере и требует существующий ключ"""
+        self.cache.set('counter', 10, None)
+        self.assertEqual(self.cache.incr('counter'), 11)
+        self.assertEqual(self.cache.incr('counter', 5), 16)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_many(self):
+        """get_many и set_many работают одним обращением"""
+        self.cache.set_many({'a': 1, 'b': [2]})
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': [2]}
+        )
+        self.cache.delete_many(['a', 'b'])
+        self.assertEqual(self.cache.get_many(['a', 'b']), {})
+
+    def drop_reply(self, command):
+        """Сервер выполняет command, но соединение рвется до ответа"""
+        client = self.cache.client
+        read_replies = client.read_replies
+        dropped = []
+
+        def flaky(commands):
+            replies = read_replies(commands)
+            if commands[0][0] == command and not dropped:
+                dropped.append(command)
+                raise EOFError
+            return replies
+        return mock.patch.object(client, 'read_replies', flaky)
+
+    def test_write_not_repeated_after_disconnect(self):
+        """Запись, дошедшую до сервера, клиент не повторяет"""
+        self.cache.set('counter', 10, None)
+        with self.drop_reply('INCRBY'), self.assertRaises(EOFError):
+            self.cache.incr('counter')
+        self.assertEqual(self.cache.get('counter'), 11)
+
+    def test_read_repeated_after_disconnect(self):
+        """Чтение повторяется на новом соединении, обрыв - промах"""
+        self.cache.set('key', 'значение')
+        with self.drop_reply('GET'):
+            self.assertEqual(self.cache.get('key'), 'значение')
+        with mock.patch.object(
+            self.cache.client, 'read_replies', side_effect=EOFError
+        ):
+            self.assertEqual(self.cache.get('key', 'нет'), 'нет')
+            self.assertEqual(self.cache.get_many(['key']), {})
+
+    def test_keys_namespaced(self):
+        """Ключи разных приложений на общем сервере не пересекаются"""
+        other = RedisCache(
+            self.server.location, {'KEY_PREFIX': 'other', 'TIMEOUT': 60}
+        )
+        self.cache.set('key', 'yatube')
+        other.set('key', 'other')
+        self.assertEqual(self.cache.get('key'), 'yatube')
+
+    def test_feed_versions(self):
+        """Счетчики версий ленты работают поверх общего кеша"""
+        with mock.patch.object(versioning, 'cache', self.cache):
+            version = versioning.get_version(versioning.FEED)
+            versioning.bump(versioning.FEED)
+            self.assertEqual(
+                versioning.get_version(versioning.FEED), version + 1
+            )
+
+
+class FeedCacheTagTests(SimpleTestCase):
+    template = Template(
+        '{% load feed_cache %}'
+        '{% feedcache 60 test_fragment version %}{{ render }}'
+        '{% endfeedcache %}'
+    )
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.calls = 0
+
+    def render(self, version=1):
+        def counter():
+            self.calls += 1
+            return self.calls
+        return self.template.render(
+            Context({'render': counter, 'version': version})
+        )
+
+    def test_hit_and_miss(self):
+        """Повторный рендер берет фрагмент из кеша"""
+        self.assertEqual(self.render(), '1')
+        self.assertEqual(self.render(), '1')
+        self.assertEqual(self.render(version=2), '2')
+        stats = registry.cache_snapshot()['test_fragment']
+        self.assertEqual(stats['miss'], 2)
+        self.assertEqual(stats['hit'], 1)
+
+    def test_early_refresh(self):
+        """Близкий к истечению фрагмент обновляет один процесс"""
+        self.render()
+        with mock.patch.object(
+            feed_cache, 'should_refresh', return_value=True
+        ):
+            self.assertEqual(self.render(), '2')
+            key = make_template_fragment_key('test_fragment', [1])
+            cache.add(feed_cache.lock_key(key), 1)
+            self.assertEqual(self.render(), '2')
+        stats = registry.cache_snapshot()['test_fragment']
+        self.assertEqual(stats['refresh'], 1)
+        self.assertEqual(stats['stale'], 1)
+
+    def test_miss_waits_for_renderer(self):
+        """При промахе процесс ждет рендер, начатый другим"""
+        key = make_template_fragment_key('test_fragment', [1])
+        cache.add(feed_cache.lock_key(key), 1)
+        with mock.patch.object(
+            feed_cache, 'wait_for', return_value=('готово', None, 0)
+        ):
+            self.assertEqual(self.render(), 'готово')
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(
+            registry.cache_snapshot()['test_fragment']['wait'], 1
+        )
+
+    def test_should_refresh_near_expiry(self):
+        """Вероятность досрочного обновления растет к сроку"""
+        now = time.time()
+        self.assertFalse(feed_cache.should_refresh(now + 3600, 0.01, now))
+        self.assertTrue(feed_cache.should_refresh(now, 0.01, now))
@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.db import connections
+from django.test import TransactionTestCase
+
+ALIAS = 'tuned'
+
+
+class SQLiteBackendTests(TransactionTestCase):
+    """Отдельная файловая база: у тестовой базы в памяти нет WAL.
+
+    TransactionTestCase, а не SimpleTestCase: pytest-django иначе
+    запрещает обращения к любой базе.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        connections.databases[ALIAS] = {
+            'ENGINE': 'yatube.sqlite_backend',
+            'NAME': os.path.join(self.directory, 'db.sqlite3'),
+            'PRAGMAS': settings.SQLITE_PRAGMAS,
+        }
+
+    def tearDown(self):
+        connections[ALIAS].close()
+        del connections[ALIAS]
+        del connections.databases[ALIAS]
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def pragma(self, name):
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        """Новое соединение получает PRAGMA из настроек"""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(
+            self.pragma('busy_timeout'),
+            settings.SQLITE_PRAGMAS['busy_timeout'],
+        )
+        self.assertEqual(
+            self.pragma('cache_size'), settings.SQLITE_PRAGMAS['cache_size']
+        )
+        # Настройки Django тоже на месте
+        self.assertEqual(self.pragma('foreign_keys'), 1)
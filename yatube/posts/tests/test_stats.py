@@ -0,0 +1,103 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import stats
+from ..models import AuthorStats, Comment, Follow, Post
+
+User = get_user_model()
+
+
+class AuthorStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='GulyaevEO')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+
+    def get_stats(self, user):
+        return AuthorStats.objects.get(user=user)
+
+    def test_counters_follow_writes(self):
+        """Счетчики меняются при создании и удалении объектов"""
+        post = Post.objects.create(text='Пост', author=self.author)
+        Comment.objects.create(post=post, author=self.reader, text='Ок')
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        author_stats = self.get_stats(self.author)
+        reader_stats = self.get_stats(self.reader)
+        self.assertEqual(author_stats.posts_count, 1)
+        self.assertEqual(author_stats.followers_count, 1)
+        self.assertEqual(reader_stats.following_count, 1)
+        self.assertEqual(reader_stats.comments_count, 1)
+
+        follow.delete()
+        post.delete()
+        author_stats = self.get_stats(self.author)
+        reader_stats = self.get_stats(self.reader)
+        self.assertEqual(author_stats.posts_count, 0)
+        self.assertEqual(author_stats.followers_count, 0)
+        self.assertEqual(reader_stats.following_count, 0)
+        self.assertEqual(reader_stats.comments_count, 0)
+
+    def test_failed_receiver_keeps_counters(self):
+        """Ошибка обработчика откатывает запись вместе со счетчиками"""
+        post = Post.objects.create(text='Пост', author=self.author)
+        self.client.force_login(self.reader)
+
+        def broken(**kwargs):
+            raise OSError('поиск недоступен')
+
+        urls = (
+            (Post, reverse('new_post'), {'text': 'Новый пост'}),
+            (Comment, reverse(
+                'add_comment',
+                kwargs={'username': 'GulyaevEO', 'post_id': post.pk}
+            ), {'text': 'Комментарий'}),
+        )
+        for model, url, data in urls:
+            with self.subTest(url=url):
+                post_save.connect(broken, sender=model)
+                self.addCleanup(post_save.disconnect, broken, sender=model)
+                with self.assertRaises(OSError):
+                    self.client.post(url, data)
+        reader_stats = stats.for_author(self.reader)
+        self.assertEqual(reader_stats.posts_count, 0)
+        self.assertEqual(reader_stats.comments_count, 0)
+        self.assertFalse(Post.objects.filter(author=self.reader).exists())
+        self.assertFalse(Comment.objects.exists())
+
+    def test_recount_command_repairs_counters(self):
+        """recount_author_stats чинит счетчики после bulk_create"""
+        Post.objects.bulk_create(
+            Post(text=f'Пост {i}', author=self.author) for i in range(3)
+        )
+        AuthorStats.objects.filter(user=self.author).update(posts_count=42)
+        call_command('recount_author_stats', stdout=StringIO())
+        self.assertEqual(self.get_stats(self.author).posts_count, 3)
+
+    def test_card_reads_single_row(self):
+        """Карточка автора берет счетчики из AuthorStats"""
+        Post.objects.create(text='Пост', author=self.author)
+        AuthorStats.objects.filter(user=self.author).update(
+            followers_count=7, following_count=5
+        )
+        response = self.client.get(
+            reverse('profile', kwargs={'username': self.author.username})
+        )
+        self.assertContains(response, 'Подписчиков: 7')
+        self.assertContains(response, 'Подписан: 5')
+        self.assertContains(response, 'Записей: 1')
+
+    def test_for_author_creates_missing_row(self):
+        """Статистика создается при первом обращении"""
+        AuthorStats.objects.filter(user=self.reader).delete()
+        self.assertEqual(stats.for_author(self.reader).posts_count, 0)
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post
+from .test_images import make_upload
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        self.client = Client()
+        self.client.force_login(ContentAddressedStorageTests.user)
+        cache.clear()
+
+    def test_same_content_stored_once(self):
+        """Одинаковое содержимое ложится в один файл"""
+        first = default_storage.save('posts/a.txt', ContentFile(b'meme'))
+        second = default_storage.save('posts/b.txt', ContentFile(b'meme'))
+        other = default_storage.save('posts/a.txt', ContentFile(b'other'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertRegex(first, r'^posts/([0-9a-f]{2})/\1[0-9a-f]{62}\.txt$')
+
+    def test_content_read_once(self):
+        """Содержимое хешируется по ходу записи, без отдельного чтения"""
+        content = ContentFile(b'meme')
+        with mock.patch.object(
+            content, 'chunks', wraps=content.chunks
+        ) as chunks:
+            default_storage.save('posts/a.txt', content)
+        self.assertEqual(chunks.call_count, 1)
+        default_storage.save('posts/b.txt', ContentFile(b'meme'))
+        # Временные файлы не остаются ни после записи, ни после повтора
+        self.assertEqual(default_storage.listdir('posts')[1], [])
+
+    def test_reuse_refreshes_mtime(self):
+        """Повторное сохранение продлевает файлу срок до gc_media"""
+        name = default_storage.save('posts/a.txt', ContentFile(b'meme'))
+        path = default_storage.path(name)
+        os.utime(path, (0, 0))
+        default_storage.save('posts/b.txt', ContentFile(b'meme'))
+        self.assertGreater(os.path.getmtime(path), 0)
+
+    def test_repost_reuses_file(self):
+        """Повторная загрузка картинки не создает новый файл"""
+        for text in ('Мем', 'Репост мема'):
+            self.client.post(
+                reverse('new_post'), {'text': text, 'image': make_upload()}
+            )
+        names = set(Post.objects.values_list('image', flat=True))
+        self.assertEqual(len(names), 1)
+        directories, _ = default_storage.listdir('posts')
+        self.assertEqual(len(directories), 1)
+
+    def test_gc_removes_unreferenced(self):
+        """gc_media удаляет только файлы без постов"""
+        post = Post.objects.create(
+            text='Пост', author=ContentAddressedStorageTests.user,
+            image=make_upload(),
+        )
+        orphan = default_storage.save(
+            'posts/orphan.jpg', ContentFile(b'orphan')
+        )
+        out = StringIO()
+        call_command('gc_media', stdout=out)
+        self.assertTrue(default_storage.exists(orphan))
+        call_command('gc_media', grace=0, dry_run=True, stdout=out)
+        self.assertTrue(default_storage.exists(orphan))
+        out = StringIO()
+        call_command('gc_media', grace=0, stdout=out)
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(post.image.name))
+        self.assertIn('удалено: 1', out.getvalue())
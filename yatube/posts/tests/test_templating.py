@@ -0,0 +1,116 @@
+import os
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import engines
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from yatube import templating
+from yatube.metrics import registry
+
+from ..models import Post
+
+User = get_user_model()
+
+
+class TemplateProfilingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+        for i in range(3):
+            Post.objects.create(text=f'Пост {i}', author=cls.user)
+
+    def setUp(self):
+        self.client = Client()
+        cache.clear()
+        registry.reset()
+        templating.install()
+        self.addCleanup(templating.uninstall)
+
+    def test_includes_attributed(self):
+        """Время каждого шаблона учитывается отдельно, с родителем"""
+        self.client.get(reverse('index'))
+        templates = registry.template_snapshot()
+        card = templates['include/post_card.html']
+        self.assertEqual(card['time_ms']['count'], 3)
+        self.assertEqual(
+            templates['include/menu.html']['parents'],
+            {'posts/index.html': 1},
+        )
+        self.assertEqual(
+            templates['base.html']['parents'], {'posts/index.html': 1}
+        )
+        page = templates['posts/index.html']
+        self.assertLessEqual(page['self_time_ms'], page['time_ms']['sum'])
+
+    def test_cached_cards_not_rendered(self):
+        """Карточки, закешированные для гостя, не рендерятся для автора"""
+        self.client.get(reverse('index'))
+        registry.reset()
+        self.client.force_login(TemplateProfilingTests.user)
+        response = self.client.get(reverse('index'))
+        templates = registry.template_snapshot()
+        self.assertNotIn('include/post_card.html', templates)
+        self.assertEqual(
+            templates['include/post_actions.html']['time_ms']['count'], 3
+        )
+        self.assertContains(response, 'Редактировать', count=3)
+
+    def test_uninstall_stops_profiling(self):
+        """После uninstall замеры не пишутся"""
+        templating.uninstall()
+        self.client.get(reverse('index'))
+        self.assertEqual(registry.template_snapshot(), {})
+
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    'OPTIONS': {
+        **settings.TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )],
+    },
+}]
+
+
+class TemplateWarmupTests(TestCase):
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_warm_fills_cached_loader(self):
+        """Прогрев заполняет кеш загрузчика всеми шаблонами"""
+        loaded, errors = templating.warm()
+        self.assertEqual(errors, [])
+        self.assertIn('include/post_item.html', templating.template_names())
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertEqual(len(loader.get_template_cache), loaded)
+
+    def test_command_reports(self):
+        """warm_templates сообщает число разобранных шаблонов"""
+        out = StringIO()
+        call_command('warm_templates', stdout=out)
+        self.assertIn('с ошибками: 0', out.getvalue())
+
+    def test_entry_points_warm_on_import(self):
+        """Точки входа WSGI и ASGI импортируются с прогревом шаблонов"""
+        # Чистый интерпретатор: в тестах Django уже настроен
+        for module in ('yatube.wsgi', 'yatube.asgi'):
+            with self.subTest(module=module):
+                result = subprocess.run(
+                    [sys.executable, '-c', f'import {module}'],
+                    cwd=settings.BASE_DIR,
+                    env={**os.environ, 'YATUBE_DEBUG': '0'},
+                    capture_output=True,
+                    text=True,
+                )
+                self.assertEqual(result.returncode, 0, result.stderr)
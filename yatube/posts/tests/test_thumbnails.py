@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .. import thumbnails
+from ..models import Post
+from ..templatetags import post_images
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(name='photo.png', color='red', size=(1200, 800)):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return SimpleUploadedFile(
+        name=name,
+        content=buffer.getvalue(),
+        content_type='image/png'
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='GulyaevEO')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        shutil.rmtree(os.path.join(MEDIA_ROOT, 'cache'), ignore_errors=True)
+        # Одинаковые картинки получают одно имя: записи sorl о
+        # миниатюрах из прошлого теста не должны пережить их файлы
+        cache.clear()
+
+    def thumbnail_files(self):
+        cache_dir = os.path.join(MEDIA_ROOT, 'cache')
+        return [
+            name
+            for _, _, files in os.walk(cache_dir)
+            for name in files
+        ]
+
+    def test_generate_creates_thumbnails(self):
+        """generate нарезает миниатюры заранее"""
+        post = Post.objects.create(
+            text='Пост с картинкой',
+            author=ThumbnailTests.user,
+            image=make_image(),
+        )
+        self.assertTrue(thumbnails.submit(post.image.name))
+        self.assertEqual(
+            len(self.thumbnail_files()), len(thumbnails.THUMBNAILS)
+        )
+
+    def test_cards_render_srcset(self):
+        """Карточки в ленте, профиле и на странице поста получают srcset"""
+        post = Post.objects.create(
+            text='Пост с картинкой',
+            author=ThumbnailTests.user,
+            image=make_image(),
+        )
+        for url in (
+            reverse('index'),
+            reverse('profile', kwargs={'username': 'GulyaevEO'}),
+            reverse(
+                'post_view',
+                kwargs={'username': 'GulyaevEO', 'post_id': post.pk}
+            ),
+        ):
+            with self.subTest(url=url):
+                response = Client().get(url)
+                self.assertContains(response, 'srcset=', count=1)
+
+    def test_small_image_not_upscaled(self):
+        """Узкая картинка не растягивается, в srcset нет ширин больше нее"""
+        post = Post.objects.create(
+            text='Маленькая картинка',
+            author=ThumbnailTests.user,
+            image=make_image(size=(600, 400)),
+        )
+        items = thumbnails.renditions(post.image)
+        self.assertEqual(items['1920x678'].width, 600)
+        context = post_images.post_image(post.image)
+        widths = [
+            item.split()[-1] for item in context['srcset'].split(', ')
+        ]
+        self.assertEqual(widths, ['480w', '600w'])
+
+    def test_generate_survives_broken_file(self):
+        """Битая картинка не роняет нарезку"""
+        self.assertFalse(thumbnails.generate('posts/missing.png'))
+
+    def test_backfill_command(self):
+        """generate_thumbnails нарезает картинки существующих постов"""
+        for i in range(2):
+            Post.objects.create(
+                text=f'Пост {i}',
+                author=ThumbnailTests.user,
+                image=make_image(f'photo{i}.png', ('red', 'blue')[i]),
+            )
+        out = StringIO()
+        call_command('generate_thumbnails', workers=1, stdout=out)
+        self.assertIn('Обработано картинок: 2, с ошибками: 0', out.getvalue())
+        self.assertEqual(
+            len(self.thumbnail_files()), 2 * len(thumbnails.THUMBNAILS)
+        )
@@ -0,0 +1,111 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import timeline
+from ..models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='GulyaevEO')
+        cls.stranger = User.objects.create_user(username='leo')
+        cls.old_post = Post.objects.create(
+            text='Пост до подписки',
+            author=cls.author,
+        )
+        Post.objects.create(text='Чужой пост', author=cls.stranger)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(TimelineTests.reader)
+
+    def follow(self):
+        self.client.post(
+            reverse(
+                'profile_follow',
+                kwargs={'username': TimelineTests.author.username}
+            )
+        )
+
+    def test_follow_backfills_timeline(self):
+        """После подписки старые посты автора попадают в ленту"""
+        self.follow()
+        self.assertEqual(
+            list(timeline.timeline_posts(TimelineTests.reader)),
+            [TimelineTests.old_post]
+        )
+
+    def test_new_post_fans_out(self):
+        """Новый пост раскладывается в ленты подписчиков"""
+        self.follow()
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=TimelineTests.reader, post=post
+            ).exists()
+        )
+        response = self.client.get(reverse('follow_index'))
+        self.assertEqual(response.context['page'][0], post)
+        self.assertEqual(len(response.context['page']), 2)
+
+    def test_unfollow_removes_entries(self):
+        """После отписки посты автора пропадают из ленты"""
+        self.follow()
+        self.client.post(
+            reverse(
+                'profile_unfollow',
+                kwargs={'username': TimelineTests.author.username}
+            )
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=TimelineTests.reader).exists()
+        )
+        response = self.client.get(reverse('follow_index'))
+        self.assertEqual(len(response.context['page']), 0)
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_is_pulled(self):
+        """Посты популярного автора не раскладываются, а читаются напрямую"""
+        self.follow()
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(
+            list(timeline.timeline_posts(TimelineTests.reader)),
+            [post, TimelineTests.old_post]
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_author_back_under_limit_fans_out(self):
+        """Посты, вышедшие при подтягивании, остаются после отписки"""
+        self.follow()
+        Follow.objects.create(
+            user=TimelineTests.stranger, author=TimelineTests.author
+        )
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        Follow.objects.get(user=TimelineTests.stranger).delete()
+        self.assertEqual(
+            list(timeline.timeline_posts(TimelineTests.reader)),
+            [post, TimelineTests.old_post]
+        )
+
+    def test_rebuild_command(self):
+        """Команда rebuild_timelines восстанавливает ленту"""
+        Follow.objects.bulk_create(
+            [Follow(user=TimelineTests.reader, author=TimelineTests.author)]
+        )
+        self.assertFalse(TimelineEntry.objects.exists())
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(
+            list(timeline.timeline_posts(TimelineTests.reader)),
+            [TimelineTests.old_post]
+        )
@@ -0,0 +1,249 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import OperationalError
+from django.db.models.signals import post_save
+from django.test import (
+    Client, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+
+from .. import write_buffer
+from ..models import AuthorStats, Comment, Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(WRITE_BUFFER_ENABLED=True)
+class WriteBufferTests(TransactionTestCase):
+    """Буфер без фонового потока: сброс вызывается из теста.
+
+    Сигналы уходят после фиксации сброса, поэтому без обертки TestCase
+    в транзакцию.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='GulyaevEO')
+        self.reader = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(text='Вирусный пост', author=self.user)
+        self.post_url = reverse(
+            'post_view',
+            kwargs={'username': 'GulyaevEO', 'post_id': self.post.pk}
+        )
+        self.comment_url = reverse(
+            'add_comment',
+            kwargs={'username': 'GulyaevEO', 'post_id': self.post.pk}
+        )
+        self.profile_url = reverse(
+            'profile', kwargs={'username': 'GulyaevEO'}
+        )
+        cache.clear()
+        self.buffer = write_buffer.WriteBuffer(interval=60)
+        patcher = mock.patch.object(
+            write_buffer, 'get_buffer', return_value=self.buffer
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_comment_visible_to_author_before_flush(self):
+        """Свой комментарий виден сразу, остальным - после сброса"""
+        self.reader_client.post(self.comment_url, {'text': 'Первый!'})
+        self.assertFalse(Comment.objects.exists())
+        response = self.reader_client.get(self.post_url)
+        self.assertContains(response, 'Первый!')
+        author_client = Client()
+        author_client.force_login(self.user)
+        response = author_client.get(self.post_url)
+        self.assertNotContains(response, 'Первый!')
+        self.buffer.flush()
+        comment = Comment.objects.get()
+        self.assertEqual(comment.text, 'Первый!')
+        self.assertEqual(
+            self.buffer.pending_comments(self.post.pk, self.reader.pk), []
+        )
+        response = author_client.get(self.post_url)
+        self.assertContains(response, 'Первый!')
+
+    def test_flush_sends_post_save(self):
+        """После сброса срабатывают обработчики post_save"""
+        for i in range(3):
+            self.reader_client.post(
+                self.comment_url, {'text': f'Комментарий {i}'}
+            )
+        self.reader_client.get(
+            reverse('profile_follow', kwargs={'username': 'GulyaevEO'})
+        )
+        self.buffer.flush()
+        self.assertEqual(Comment.objects.count(), 3)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.reader).comments_count,
+            3,
+        )
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, author=self.user
+        ).exists())
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).followers_count,
+            1,
+        )
+
+    def test_follow_visible_before_flush(self):
+        """Подписчик сразу видит подписку в профиле автора"""
+        self.reader_client.get(
+            reverse('profile_follow', kwargs={'username': 'GulyaevEO'})
+        )
+        self.assertFalse(Follow.objects.exists())
+        response = self.reader_client.get(self.profile_url)
+        self.assertContains(response, 'Отписаться')
+
+    def test_unfollow_discards_pending(self):
+        """Отписка до сброса убирает подписку из буфера"""
+        for name in ('profile_follow', 'profile_unfollow'):
+            self.reader_client.get(
+                reverse(name, kwargs={'username': 'GulyaevEO'})
+            )
+        self.buffer.flush()
+        self.assertFalse(Follow.objects.exists())
+
+    def test_existing_follow_ignored(self):
+        """Повторная подписка не дублирует строку и счетчики"""
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.reader_client.get(
+            reverse('profile_follow', kwargs={'username': 'GulyaevEO'})
+        )
+        self.buffer.flush()
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).followers_count,
+            1,
+        )
+
+    def test_comment_to_deleted_post_dropped(self):
+        post = Post.objects.create(text='Удаляемый', author=self.user)
+        self.buffer.add_comment(
+            Comment(post=post, author=self.reader, text='Поздно')
+        )
+        post.delete()
+        self.buffer.flush()
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(self.buffer.comments, [])
+
+    def test_failed_flush_keeps_writes(self):
+        """При ошибке базы записи остаются до следующего сброса"""
+        self.reader_client.post(self.comment_url, {'text': 'Первый!'})
+        with mock.patch.object(
+            write_buffer, 'write_comments',
+            side_effect=OperationalError('database is locked'),
+        ), self.assertLogs(write_buffer.logger, 'ERROR'):
+            self.buffer.flush()
+        self.assertEqual(len(self.buffer.comments), 1)
+        self.buffer.flush()
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_rolled_back_flush_resets_objects(self):
+        """Откат сброса не отправляет сигналы и не оставляет ключей"""
+        self.reader_client.post(self.comment_url, {'text': 'Первый!'})
+        self.reader_client.get(
+            reverse('profile_follow', kwargs={'username': 'GulyaevEO'})
+        )
+        handler = mock.Mock()
+        post_save.connect(handler, sender=Comment)
+        self.addCleanup(post_save.disconnect, handler, sender=Comment)
+        with mock.patch.object(
+            write_buffer, 'write_follows',
+            side_effect=OperationalError('database is locked'),
+        ), self.assertLogs(write_buffer.logger, 'ERROR'):
+            self.buffer.flush()
+        handler.assert_not_called()
+        self.assertFalse(Comment.objects.exists())
+        comment = self.buffer.comments[0]
+        self.assertIsNone(comment.pk)
+        self.assertTrue(comment._state.adding)
+        self.buffer.flush()
+        handler.assert_called_once()
+        self.assertEqual(Comment.objects.get().pk, comment.pk)
+
+    @override_settings(WRITE_BUFFER_ENABLED=False)
+    def test_disabled_writes_immediately(self):
+        self.reader_client.post(self.comment_url, {'text': 'Сразу'})
+        self.assertTrue(Comment.objects.filter(text='Сразу').exists())
+        self.assertEqual(self.buffer.comments, [])
+
+
+class WriteBufferThreadTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='GulyaevEO')
+        self.post = Post.objects.create(text='Пост', author=self.user)
+
+    def add_comment(self, buffer, text):
+        buffer.add_comment(
+            Comment(post=self.post, author=self.user, text=text)
+        )
+
+    def test_background_flush(self):
+        """Фоновый поток сам записывает буфер"""
+        buffer = write_buffer.WriteBuffer(interval=0.01)
+        buffer.start()
+        self.addCleanup(buffer.stop)
+        self.add_comment(buffer, 'Из потока')
+        deadline = time.monotonic() + 5
+        while buffer.comments and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(Comment.objects.filter(text='Из потока').exists())
+
+    def test_handler_error_rolls_back_flush(self):
+        """Ошибка обработчика post_save откатывает пачку, поток жив"""
+        def broken(**kwargs):
+            raise OSError('кеш недоступен')
+
+        post_save.connect(broken, sender=Comment)
+        buffer = write_buffer.WriteBuffer(interval=0.01)
+        buffer.start()
+        self.addCleanup(buffer.stop)
+        with self.assertLogs(write_buffer.logger, 'ERROR') as logs:
+            self.add_comment(buffer, 'Первый')
+            deadline = time.monotonic() + 5
+            while not logs.records and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # Комментарий и счетчик не разошлись: оба не записаны
+            self.assertFalse(Comment.objects.exists())
+            self.assertEqual(
+                AuthorStats.objects.get(user=self.user).comments_count, 0
+            )
+            post_save.disconnect(broken, sender=Comment)
+        deadline = time.monotonic() + 5
+        while buffer.comments and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(buffer.thread.is_alive())
+        self.assertTrue(Comment.objects.filter(text='Первый').exists())
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).comments_count, 1
+        )
+
+    def test_thread_survives_flush_error(self):
+        """Любая ошибка сброса логируется, поток продолжает работу"""
+        buffer = write_buffer.WriteBuffer(interval=0.01)
+        flush = buffer.flush
+        with mock.patch.object(
+            buffer, 'flush', side_effect=[RuntimeError('сбой'), None]
+        ) as broken, self.assertLogs(write_buffer.logger, 'ERROR'):
+            buffer.start()
+            deadline = time.monotonic() + 5
+            while broken.call_count < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        buffer.flush = flush
+        self.addCleanup(buffer.stop)
+        self.assertTrue(buffer.thread.is_alive())
+
+    def test_stop_flushes(self):
+        """Остановка записывает остаток буфера"""
+        buffer = write_buffer.WriteBuffer(interval=60)
+        buffer.start()
+        self.add_comment(buffer, 'На выходе')
+        buffer.stop()
+        self.assertFalse(buffer.thread)
+        self.assertTrue(Comment.objects.filter(text='На выходе').exists())
@@ -0,0 +1,96 @@
+"""Заблаговременная нарезка миниатюр картинок постов.
+
+Шаблоны выводят картинку тегом {% post_image %} с вариантами разной
+ширины в srcset; нарезанные во время рендера, они заставили бы первого
+зрителя поста ждать Pillow. После сохранения формы миниатюры
+ставятся в очередь фонового пула потоков, а тег в шаблоне находит уже
+готовый результат в хранилище sorl.
+"""
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from sorl.thumbnail import get_thumbnail
+
+from . import images
+
+logger = logging.getLogger(__name__)
+
+# Варианты для srcset в пропорциях карточки 960x339; тег post_image
+# берет их отсюда же, поэтому ключи кеша sorl совпадут. Крупные
+# варианты не растягивают маленькую картинку: копия вышла бы тяжелее
+# исходника и не четче; в srcset такие варианты не попадают
+THUMBNAILS = (
+    ('480x170', {'crop': 'center', 'upscale': True}),
+    ('960x339', {'crop': 'center', 'upscale': False}),
+    ('1920x678', {'crop': 'center', 'upscale': False}),
+)
+
+# Вариант для src у браузеров без srcset
+DEFAULT_THUMBNAIL = '960x339'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                thread_name_prefix='thumbnails',
+            )
+            atexit.register(_executor.shutdown)
+        return _executor
+
+
+def renditions(image):
+    """Миниатюры картинки по THUMBNAILS: {геометрия: миниатюра}"""
+    return {
+        geometry: get_thumbnail(
+            image, geometry, format=images.get_format(), **options
+        )
+        for geometry, options in THUMBNAILS
+    }
+
+
+def generate(name):
+    """Нарезать все миниатюры картинки; True, если все получилось"""
+    try:
+        for thumbnail in renditions(name).values():
+            # sorl не бросает исключение, если исходника нет, а
+            # возвращает несуществующую миниатюру
+            if not thumbnail.exists():
+                logger.warning('Нет исходной картинки %s', name)
+                return False
+        return True
+    except Exception:
+        logger.exception('Не удалось нарезать миниатюры для %s', name)
+        return False
+
+
+def generate_in_thread(name):
+    try:
+        return generate(name)
+    finally:
+        # Соединения потока пула не должны висеть открытыми
+        connections.close_all()
+
+
+def submit(name):
+    """Поставить картинку в очередь; без пула режем сразу"""
+    if not settings.THUMBNAIL_WORKERS:
+        return generate(name)
+    return get_executor().submit(generate_in_thread, name)
+
+
+def schedule(post):
+    """Нарезать миниатюры поста после фиксации транзакции"""
+    if not post.image:
+        return
+    name = post.image.name
+    transaction.on_commit(lambda: submit(name))
@@ -1,13 +1,20 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 urlpatterns = [
     path("", views.index, name="index"),
     path("follow/", views.follow_index, name="follow_index"),
     path("group/<slug:slug>/", views.group_posts, name="group_posts"),
+    path("group/<slug:slug>/rss/", feeds.group_rss, name="group_rss"),
+    path("group/<slug:slug>/atom/", feeds.group_atom, name="group_atom"),
+    path("feeds/rss/", feeds.site_rss, name="rss"),
+    path("feeds/atom/", feeds.site_atom, name="atom"),
     path("new/", views.new_post, name="new_post"),
+    path("search/", views.search_posts, name="search"),
     path('<str:username>/', views.profile, name='profile'),
+    path('<str:username>/rss/', feeds.author_rss, name='profile_rss'),
+    path('<str:username>/atom/', feeds.author_atom, name='profile_atom'),
     path(
         '<str:username>/<int:post_id>/',
         views.post_view,
@@ -18,6 +25,11 @@ urlpatterns = [
         views.post_edit,
         name='post_edit',
     ),
+    path(
+        '<str:username>/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path(
         '<str:username>/<int:post_id>/comment/',
         views.add_comment,
@@ -0,0 +1,83 @@
+"""Счетчики версий для инвалидации кеша по событиям.
+
+Ключи кеша включают номер версии; изменение данных увеличивает номер,
+и все старые ключи разом перестают читаться, а сами записи вытесняются
+по TTL. Поэтому кешировать можно надолго без риска показать устаревшее.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+FEED = 'feed'
+# Общая версия карточек постов (posts.cards)
+CARDS = 'post_cards'
+
+KEY_PREFIX = 'posts:version:'
+
+
+def make_key(name):
+    return f'{KEY_PREFIX}{name}'
+
+
+# Счетчики отдельных страниц: их сдвигают изменения, видимые
+# только на этих страницах (posts.page_cache)
+def group(slug):
+    return f'group:{slug}'
+
+
+def profile(username):
+    return f'profile:{username}'
+
+
+def post(post_id):
+    return f'post:{post_id}'
+
+
+def timeline(user_id):
+    """Состав ленты подписок пользователя"""
+    return f'timeline:{user_id}'
+
+
+def initial_version():
+    # Не 1: если счетчик вытеснен из кеша, новая версия не совпадет
+    # со старыми ключами, которые могли еще не истечь
+    return time.time_ns() // 1000
+
+
+def get_versions(*names):
+    """Текущие версии нескольких счетчиков за одно обращение к кешу"""
+    keys = {make_key(name): name for name in names}
+    found = cache.get_many(keys)
+    missing = {
+        key: initial_version() for key in keys if key not in found
+    }
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {keys[key]: value for key, value in found.items()}
+
+
+def get_version(name):
+    return get_versions(name)[name]
+
+
+def bump(*names):
+    """Сдвинуть версии: закешированное под старыми версиями устаревает.
+
+    Внутри транзакции сдвиг повторяется после фиксации: читатель мог
+    между сдвигом и фиксацией закешировать прежние данные под новой
+    версией.
+    """
+    increment(names)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: increment(names))
+
+
+def increment(names):
+    for name in names:
+        key = make_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, initial_version(), timeout=None)
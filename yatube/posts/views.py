@@ -1,35 +1,86 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
 
+from . import (
+    fanout, repository, search, stats, thumbnails, timeline, versioning,
+    write_buffer,
+)
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post
+from .models import Comment, Follow, Post
+from .page_cache import cache_anonymous_page
+from .paginator import CursorPaginator
 
 User = get_user_model()
 MAX_POST_PER_PAGE = 10
+COMMENTS_PER_PAGE = 50
 
 
+def paginate(request, post_list, ordering=('-pub_date', '-id')):
+    """Страница ленты по курсору ?cursor= без COUNT(*) и OFFSET.
+
+    Из базы выбираются только ключи постов страницы, сами посты
+    берутся из кеша repository.
+    """
+    fields = [name.lstrip('-') for name in ordering]
+    paginator = CursorPaginator(
+        post_list.values('pk', *fields),
+        MAX_POST_PER_PAGE,
+        ordering=ordering,
+        with_count=False,
+    )
+    page = paginator.get_page(request.GET.get('cursor'))
+    page.object_list = repository.posts(
+        [row['pk'] for row in page.object_list]
+    )
+    return page
+
+
+def paginate_comments(post_id, cursor):
+    """Порция комментариев поста по курсору, от старых к новым"""
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author'
+    ).order_by('created', 'id')
+    paginator = CursorPaginator(
+        comments,
+        COMMENTS_PER_PAGE,
+        ordering=('created', 'id'),
+        with_count=False,
+    )
+    return comments, paginator.get_page(cursor)
+
+
+@cache_anonymous_page(lambda: [versioning.FEED])
 def index(request):
     """Главная страница"""
     post_list = Post.objects.all()
-    paginator = Paginator(post_list, MAX_POST_PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    # Страница вычисляется лениво: при попадании в кеш шаблона
+    # запрос ленты к базе не выполняется
+    page = SimpleLazyObject(lambda: paginate(request, post_list))
     return render(
         request,
         'posts/index.html',
-        {'page': page}
+        {
+            'page': page,
+            'cursor': request.GET.get('cursor', ''),
+            'feed_version': versioning.get_version(versioning.FEED),
+            'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
+        }
     )
 
 
 @login_required
 def follow_index(request):
     """Страница подписчика с постами"""
-    post_list = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(post_list, MAX_POST_PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = timeline.timeline_posts(request.user)
+    page = paginate(request, post_list, timeline.ORDERING)
     return render(
         request,
         'posts/follow.html',
@@ -42,7 +93,7 @@ def profile_follow(request, username):
     follower = request.user
     following = get_object_or_404(User, username=username)
     if follower != following:
-        Follow.objects.get_or_create(user=follower, author=following)
+        write_buffer.follow(follower, following)
     return redirect(
         'profile',
         username=username
@@ -51,23 +102,23 @@ def profile_follow(request, username):
 
 @login_required
 def profile_unfollow(request, username):
-    Follow.objects.filter(
-        user=request.user,
-        author=get_object_or_404(User, username=username)
-    ).delete()
+    write_buffer.unfollow(
+        request.user, get_object_or_404(User, username=username)
+    )
     return redirect(
         'profile',
         username=username,
     )
 
 
+@cache_anonymous_page(lambda slug: [versioning.group(slug)])
 def group_posts(request, slug):
     """Страница группы"""
-    group = get_object_or_404(Group, slug=slug)
+    group = repository.get_group(slug)
+    if group is None:
+        raise Http404
     post_list = group.posts.all()
-    paginator = Paginator(post_list, MAX_POST_PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    page = paginate(request, post_list)
     return render(
         request,
         "posts/group.html",
@@ -75,6 +126,19 @@ def group_posts(request, slug):
     )
 
 
+def search_posts(request):
+    """Поиск по постам, комментариям и группам"""
+    query = request.GET.get('q', '').strip()
+    results = search.get_backend().search(query)
+    paginator = Paginator(results, MAX_POST_PER_PAGE)
+    page = paginator.get_page(request.GET.get('page'))
+    return render(
+        request,
+        'posts/search.html',
+        {'page': page, 'query': query}
+    )
+
+
 @login_required
 def new_post(request):
     """Страница создания нового поста"""
@@ -87,21 +151,32 @@ def new_post(request):
         )
     post = form.save(commit=False)
     post.author = request.user
-    post.save()
+    # Счетчики, лента и поиск обновляются сигналами в той же
+    # транзакции, что и запись поста
+    with transaction.atomic():
+        post.save()
+    thumbnails.schedule(post)
 
     return redirect("index")
 
 
+@cache_anonymous_page(lambda username: [versioning.profile(username)])
 def profile(request, username):
     """Страница автора (профайл)"""
-    author = get_object_or_404(User, username=username)
+    author = repository.get_user(username)
+    if author is None:
+        raise Http404
+    # Пользователь сессии загружается здесь, а не в потоке пула
+    user = request.user if request.user.is_authenticated else None
     post_list = author.posts.all()
-    paginator = Paginator(post_list, MAX_POST_PER_PAGE)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    following = (
-        request.user.is_authenticated
-        and Follow.objects.filter(user=request.user, author=author).exists()
+    page, following, author_stats = fanout.gather(
+        lambda: paginate(request, post_list),
+        lambda: (
+            write_buffer.is_following(user, author)
+            or user is not None
+            and Follow.objects.filter(user=user, author=author).exists()
+        ),
+        lambda: stats.for_author(author),
     )
     return render(
         request,
@@ -111,23 +186,89 @@ def profile(request, username):
             'author': author,
             'username': username,
             'following': following,
+            'stats': author_stats,
         }
     )
 
 
+@cache_anonymous_page(
+    lambda username, post_id: [
+        versioning.post(post_id), versioning.profile(username)
+    ]
+)
 def post_view(request, username, post_id):
     """Страница поста с комментариями"""
-    author = get_object_or_404(User, username=username)
-    post = get_object_or_404(Post, pk=post_id, author__username=username)
+    def load_author():
+        author = repository.get_user(username)
+        if author is None:
+            raise Http404
+        return author, stats.for_author(author)
+
+    def load_post():
+        post = repository.get_post(post_id)
+        if post is None or post.author.username != username:
+            raise Http404
+        return post
+
+    (author, author_stats), post, (comments, comments_page) = fanout.gather(
+        load_author,
+        load_post,
+        lambda: paginate_comments(
+            post_id, request.GET.get('comments_cursor')
+        ),
+    )
     form = CommentForm()
-    comments = post.comments.all()
     return render(
         request,
         'posts/post.html',
-        {'post': post, 'author': author, 'form': form, 'comments': comments}
+        {
+            'post': post,
+            'author': author,
+            'stats': author_stats,
+            'form': form,
+            'comments': comments,
+            'comments_page': comments_page,
+            'pending_comments': write_buffer.pending_comments(
+                post_id, request.user
+            ),
+        }
     )
 
 
+def post_comments(request, username, post_id):
+    """Следующая порция комментариев поста в JSON для подгрузки"""
+    post = get_object_or_404(
+        Post.objects.only('id', 'author'),
+        pk=post_id,
+        author__username=username
+    )
+    _, page = paginate_comments(post.pk, request.GET.get('cursor'))
+    next_url = None
+    if page.has_next():
+        next_url = '{}?cursor={}'.format(
+            reverse('post_comments', args=(username, post.pk)),
+            page.next_cursor,
+        )
+    return JsonResponse({
+        'comments': [
+            {
+                'id': comment.pk,
+                'author': comment.author.username,
+                'text': comment.text,
+                'created': comment.created.isoformat(),
+            }
+            for comment in page
+        ],
+        'html': render_to_string(
+            'include/comment_list.html',
+            {'comments_page': page},
+            request,
+        ),
+        'next_cursor': page.next_cursor,
+        'next_url': next_url,
+    })
+
+
 @login_required
 def post_edit(request, username, post_id):
     """Страница редактирования поста"""
@@ -149,7 +290,10 @@ def post_edit(request, username, post_id):
             'posts/new.html',
             {'form': form, 'is_edit': True, 'post': post}
         )
-    form.save()
+    with transaction.atomic():
+        post = form.save()
+    if 'image' in form.changed_data:
+        thumbnails.schedule(post)
     return redirect(
         post_view,
         username=username,
@@ -166,7 +310,7 @@ def add_comment(request, username, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        write_buffer.save_comment(comment)
     return redirect(
         post_view,
         username=username,
@@ -0,0 +1,272 @@
+"""Буфер записи комментариев и подписок.
+
+Под всплеском трафика на популярный пост каждый комментарий и каждая
+подписка - отдельная транзакция, и запросы SQLite ждут друг друга на
+блокировке записи ("database is locked"). При WRITE_BUFFER_ENABLED
+запросы только кладут объект в буфер процесса, а фоновый поток раз в
+WRITE_BUFFER_INTERVAL секунд пишет накопленное одной транзакцией
+через bulk_create(ignore_conflicts=True).
+
+bulk_create не отправляет post_save, поэтому буфер сам отправляет его
+для новых строк в той же транзакции: ленты, счетчики и поиск
+обновляются теми же обработчиками, что и при save(), и ошибка
+обработчика откатывает всю пачку до следующего сброса. Пока запись в
+буфере, автор видит свой комментарий и подписку (read-your-writes);
+другие процессы увидят их после сброса. При остановке процесса буфер
+сбрасывается.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.db.models.signals import post_save
+
+from . import stats
+from .models import Comment, Follow, Post
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+
+class WriteBuffer:
+    def __init__(self, interval):
+        self.interval = interval
+        self.lock = threading.Lock()
+        # Один сброс за раз; отписка ждет текущий сброс
+        self.flush_lock = threading.Lock()
+        self.comments = []
+        self.follows = {}
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(
+            target=self.run, name='write-buffer', daemon=True
+        )
+        self.thread.start()
+        atexit.register(self.stop)
+
+    def run(self):
+        try:
+            while not self.stopping.wait(self.interval):
+                try:
+                    self.flush()
+                except Exception:
+                    # Поток должен пережить любую ошибку, иначе буфер
+                    # будет только расти до остановки процесса
+                    logger.exception('Ошибка сброса буфера записи')
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        """Остановить поток и записать остаток буфера"""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.flush()
+
+    def add_comment(self, comment):
+        with self.lock:
+            self.comments.append(comment)
+
+    def add_follow(self, follow):
+        with self.lock:
+            self.follows.setdefault(
+                (follow.user_id, follow.author_id), follow
+            )
+
+    def discard_follow(self, user_id, author_id):
+        """Убрать подписку из буфера, если она еще не записана"""
+        with self.flush_lock, self.lock:
+            self.follows.pop((user_id, author_id), None)
+
+    def pending_comments(self, post_id, user_id):
+        with self.lock:
+            return [
+                comment for comment in self.comments
+                if comment.post_id == post_id and comment.author_id == user_id
+            ]
+
+    def is_following(self, user_id, author_id):
+        with self.lock:
+            return (user_id, author_id) in self.follows
+
+    def flush(self):
+        """Записать накопленное одной транзакцией"""
+        with self.flush_lock:
+            with self.lock:
+                comments = list(self.comments)
+                follows = list(self.follows.values())
+            if not comments and not follows:
+                return
+            try:
+                with transaction.atomic():
+                    created = write_comments(comments)
+                    created += write_follows(follows)
+                    send_created(created)
+            except Exception:
+                # Записи останутся в буфере до следующего сброса
+                logger.exception(
+                    'Не удалось записать буфер: комментариев %s, '
+                    'подписок %s', len(comments), len(follows)
+                )
+                for instance in comments + follows:
+                    reset(instance)
+                return
+            # Пока шла запись, буфер мог пополниться
+            with self.lock:
+                written = set(map(id, comments))
+                self.comments = [
+                    comment for comment in self.comments
+                    if id(comment) not in written
+                ]
+                for follow in follows:
+                    key = (follow.user_id, follow.author_id)
+                    if self.follows.get(key) is follow:
+                        del self.follows[key]
+
+
+def reset(instance):
+    """Вернуть объект в состояние до неудавшейся вставки"""
+    instance.pk = None
+    instance._state.adding = True
+    instance._state.db = None
+
+
+def send_created(instances):
+    """post_save для строк, вставленных bulk_create"""
+    for instance in instances:
+        post_save.send(
+            sender=type(instance),
+            instance=instance,
+            created=True,
+            update_fields=None,
+            raw=False,
+            using=instance._state.db,
+        )
+
+
+def write_comments(comments):
+    """Вставить комментарии; вернуть вставленные"""
+    if not comments:
+        return []
+    # Комментарии к постам, удаленным за время ожидания, теряются
+    post_ids = set(Post.objects.filter(
+        pk__in={comment.post_id for comment in comments}
+    ).values_list('pk', flat=True))
+    comments = [
+        comment for comment in comments if comment.post_id in post_ids
+    ]
+    if not comments:
+        return []
+    # Иначе первый post_save пересчитал бы счетчики вместе со всей
+    # пачкой, а следующие прибавили бы свои строки еще раз
+    stats.ensure({comment.author_id for comment in comments})
+    Comment.objects.bulk_create(comments, ignore_conflicts=True)
+    # SQLite не возвращает ключи из bulk_create; строки находятся по
+    # посту, автору и времени создания, заполненному bulk_create
+    rows = Comment.objects.filter(
+        post_id__in=post_ids,
+        created__gte=min(comment.created for comment in comments),
+    ).values_list('post_id', 'author_id', 'created', 'pk')
+    keys = {row[:3]: row[3] for row in rows}
+    for comment in comments:
+        comment.pk = keys.get(
+            (comment.post_id, comment.author_id, comment.created)
+        )
+        comment._state.adding = False
+        comment._state.db = Comment.objects.db
+    return [comment for comment in comments if comment.pk]
+
+
+def write_follows(follows):
+    """Вставить новые подписки; вернуть вставленные"""
+    if not follows:
+        return []
+    user_ids = {follow.user_id for follow in follows} | {
+        follow.author_id for follow in follows
+    }
+    user_ids = set(
+        User.objects.filter(pk__in=user_ids).values_list('pk', flat=True)
+    )
+    existing = set(Follow.objects.filter(
+        user_id__in={follow.user_id for follow in follows},
+        author_id__in={follow.author_id for follow in follows},
+    ).values_list('user_id', 'author_id'))
+    follows = [
+        follow for follow in follows
+        if (follow.user_id, follow.author_id) not in existing
+        and follow.user_id in user_ids and follow.author_id in user_ids
+    ]
+    if not follows:
+        return []
+    stats.ensure({follow.user_id for follow in follows} | {
+        follow.author_id for follow in follows
+    })
+    Follow.objects.bulk_create(follows, ignore_conflicts=True)
+    rows = Follow.objects.filter(
+        user_id__in={follow.user_id for follow in follows},
+        author_id__in={follow.author_id for follow in follows},
+    ).values_list('user_id', 'author_id', 'pk')
+    keys = {row[:2]: row[2] for row in rows}
+    for follow in follows:
+        follow.pk = keys.get((follow.user_id, follow.author_id))
+        follow._state.adding = False
+        follow._state.db = Follow.objects.db
+    return [follow for follow in follows if follow.pk]
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = WriteBuffer(settings.WRITE_BUFFER_INTERVAL)
+            _buffer.start()
+        return _buffer
+
+
+def save_comment(comment):
+    """Сохранить комментарий сразу или через буфер"""
+    if not settings.WRITE_BUFFER_ENABLED:
+        # Вместе со счетчиками и поиском из обработчиков post_save
+        with transaction.atomic():
+            comment.save()
+        return
+    get_buffer().add_comment(comment)
+
+
+def follow(user, author):
+    """Подписаться сразу или через буфер"""
+    if not settings.WRITE_BUFFER_ENABLED:
+        Follow.objects.get_or_create(user=user, author=author)
+        return
+    get_buffer().add_follow(Follow(user=user, author=author))
+
+
+def unfollow(user, author):
+    if settings.WRITE_BUFFER_ENABLED:
+        get_buffer().discard_follow(user.pk, author.pk)
+    Follow.objects.filter(user=user, author=author).delete()
+
+
+def pending_comments(post_id, user):
+    """Еще не записанные комментарии пользователя к посту"""
+    if not settings.WRITE_BUFFER_ENABLED or not user.is_authenticated:
+        return []
+    return get_buffer().pending_comments(post_id, user.pk)
+
+
+def is_following(user, author):
+    """Подписка пользователя, еще не записанная в базу"""
+    if not settings.WRITE_BUFFER_ENABLED or user is None:
+        return False
+    return get_buffer().is_following(user.pk, author.pk)
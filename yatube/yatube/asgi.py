@@ -0,0 +1,25 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named
+``application``, e.g. for ``uvicorn yatube.asgi:application``.
+"""
+
+import os
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from .asgi_handler import WsgiToAsgi
+from .templating import warm
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+# get_wsgi_application() вызывает django.setup(): прогрев - после него
+application = WsgiToAsgi(
+    get_wsgi_application(),
+    max_workers=settings.ASGI_WORKER_THREADS,
+)
+
+if settings.TEMPLATE_WARMUP:
+    warm()
@@ -0,0 +1,199 @@
+"""Локальная замена сервера Redis для разработки и тестов.
+
+Понимает подмножество протокола RESP, которое нужно RedisCache:
+строки с истечением срока, MGET, DEL, INCRBY, FLUSHDB. Данные живут
+в памяти процесса; несколько процессов Django, подключенных к одному
+серверу, получают общий кеш, как с настоящим Redis.
+
+    python -m yatube.fake_redis --port 6379
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+
+class Store:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.databases = {}
+
+    def data(self, db):
+        return self.databases.setdefault(db, {})
+
+
+def lookup(data, key):
+    """Значение и срок ключа; истекший ключ удаляется при обращении"""
+    item = data.get(key)
+    if item is None or item[1] is None or item[1] > time.monotonic():
+        return item
+    del data[key]
+    return None
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.db = 0
+        while True:
+            try:
+                command = self.read_command()
+            except (EOFError, ConnectionError):
+                return
+            if not command:
+                return
+            name = command[0].decode().upper()
+            method = getattr(self, f'command_{name.lower()}', None)
+            if method is None:
+                self.wfile.write(f'-ERR unknown command {name}\r\n'.encode())
+                continue
+            with self.server.store.lock:
+                data = self.server.store.data(self.db)
+                try:
+                    reply = method(data, *command[1:])
+                except (ValueError, IndexError) as error:
+                    reply = Error(f'ERR {error}')
+            self.wfile.write(encode(reply))
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            raise EOFError
+        if not line.startswith(b'*'):
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def command_ping(self, data, *args):
+        return Status('PONG')
+
+    def command_select(self, data, db):
+        self.db = int(db)
+        return Status('OK')
+
+    def command_get(self, data, key):
+        item = lookup(data, key)
+        return item[0] if item else None
+
+    def command_mget(self, data, *keys):
+        return [self.command_get(data, key) for key in keys]
+
+    def command_set(self, data, key, value, *options):
+        options = [option.upper() for option in options]
+        expires = None
+        exists = lookup(data, key) is not None
+        if b'NX' in options and exists:
+            return None
+        if b'XX' in options and not exists:
+            return None
+        for unit, scale in ((b'EX', 1), (b'PX', 0.001)):
+            if unit in options:
+                ttl = int(options[options.index(unit) + 1]) * scale
+                expires = time.monotonic() + ttl
+        data[key] = (value, expires)
+        return Status('OK')
+
+    def command_del(self, data, *keys):
+        return sum(
+            lookup(data, key) is not None and data.pop(key) is not None
+            for key in keys
+        )
+
+    def command_exists(self, data, *keys):
+        return sum(lookup(data, key) is not None for key in keys)
+
+    def command_incrby(self, data, key, delta):
+        value, expires = lookup(data, key) or (b'0', None)
+        value = int(value) + int(delta)
+        data[key] = (str(value).encode(), expires)
+        return value
+
+    def command_incr(self, data, key):
+        return self.command_incrby(data, key, b'1')
+
+    def command_pexpire(self, data, key, ttl):
+        if lookup(data, key) is None:
+            return 0
+        data[key] = (data[key][0], time.monotonic() + int(ttl) / 1000)
+        return 1
+
+    def command_expire(self, data, key, ttl):
+        return self.command_pexpire(data, key, int(ttl) * 1000)
+
+    def command_persist(self, data, key):
+        item = lookup(data, key)
+        if item is None or item[1] is None:
+            return 0
+        data[key] = (data[key][0], None)
+        return 1
+
+    def command_flushdb(self, data):
+        data.clear()
+        return Status('OK')
+
+
+class Status(str):
+    pass
+
+
+class Error(str):
+    pass
+
+
+def encode(reply):
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, Status):
+        return f'+{reply}\r\n'.encode()
+    if isinstance(reply, Error):
+        return f'-{reply}\r\n'.encode()
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, bytes):
+        return b'$%d\r\n%s\r\n' % (len(reply), reply)
+    if isinstance(reply, list):
+        return b'*%d\r\n' % len(reply) + b''.join(map(encode, reply))
+    raise TypeError(f'Нельзя закодировать ответ {reply!r}')
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=('127.0.0.1', 0)):
+        super().__init__(address, Handler)
+        self.store = Store()
+
+    @property
+    def location(self):
+        host, port = self.server_address[:2]
+        return f'redis://{host}:{port}/0'
+
+    def start(self):
+        """Запустить в фоновом потоке; вернуть адрес для LOCATION"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self.location
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    args = parser.parse_args()
+    server = FakeRedisServer((args.host, args.port))
+    print(f'Слушаю {server.location}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
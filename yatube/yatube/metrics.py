@@ -0,0 +1,150 @@
+"""Агрегированные замеры запросов: время, число и время SQL-запросов.
+
+Замеры складываются в гистограммы с фиксированными границами по имени
+URL (и по имени шаблона для yatube.templating), поэтому память не
+растет с числом запросов. Реестр живет в
+процессе; каждый воркер отдает свои цифры.
+"""
+import threading
+
+# Верхние границы корзин гистограмм; последняя корзина - все остальное
+TIME_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+TEMPLATE_BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, value):
+        index = len(self.bounds)
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                index = i
+                break
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def as_dict(self):
+        labels = [f'le_{bound}' for bound in self.bounds] + ['inf']
+        return {
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'mean': round(self.total / self.count, 3) if self.count else 0,
+            'max': round(self.max, 3),
+            'buckets': dict(zip(labels, self.buckets)),
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.time_ms = Histogram(TIME_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_time_ms = Histogram(TIME_BUCKETS_MS)
+        self.over_budget = 0
+
+    def as_dict(self):
+        return {
+            'time_ms': self.time_ms.as_dict(),
+            'queries': self.queries.as_dict(),
+            'db_time_ms': self.db_time_ms.as_dict(),
+            'over_budget': self.over_budget,
+        }
+
+
+class TemplateMetrics:
+    def __init__(self):
+        # С вложенными шаблонами и без них
+        self.time_ms = Histogram(TEMPLATE_BUCKETS_MS)
+        self.self_time_ms = 0
+        # Откуда шаблон подключался ({% include %}, {% extends %})
+        self.parents = {}
+
+    def as_dict(self):
+        return {
+            'time_ms': self.time_ms.as_dict(),
+            'self_time_ms': round(self.self_time_ms, 3),
+            'parents': dict(sorted(self.parents.items())),
+        }
+
+
+class Registry:
+    """Потокобезопасное хранилище замеров по именам URL и кешам"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.cache = {}
+        self.templates = {}
+
+    def record(self, name, time_ms, queries, db_time_ms, over_budget=False):
+        with self.lock:
+            metrics = self.views.get(name)
+            if metrics is None:
+                metrics = self.views[name] = ViewMetrics()
+            metrics.time_ms.add(time_ms)
+            metrics.queries.add(queries)
+            metrics.db_time_ms.add(db_time_ms)
+            metrics.over_budget += over_budget
+
+    def record_cache(self, name, event):
+        """Событие кеша: hit, miss, stale, refresh или wait"""
+        with self.lock:
+            events = self.cache.setdefault(name, {})
+            events[event] = events.get(event, 0) + 1
+
+    def record_template(self, name, parent, time_ms, self_time_ms):
+        with self.lock:
+            metrics = self.templates.get(name)
+            if metrics is None:
+                metrics = self.templates[name] = TemplateMetrics()
+            metrics.time_ms.add(time_ms)
+            metrics.self_time_ms += self_time_ms
+            if parent is not None:
+                metrics.parents[parent] = metrics.parents.get(parent, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: metrics.as_dict()
+                for name, metrics in sorted(self.views.items())
+            }
+
+    def cache_snapshot(self):
+        with self.lock:
+            result = {}
+            for name, events in sorted(self.cache.items()):
+                hits = sum(
+                    events.get(event, 0) for event in ('hit', 'stale', 'wait')
+                )
+                total = hits + events.get('miss', 0) + events.get(
+                    'refresh', 0
+                )
+                result[name] = {
+                    **events,
+                    'hit_rate': round(hits / total, 3) if total else 0,
+                }
+            return result
+
+    def template_snapshot(self):
+        with self.lock:
+            return {
+                name: metrics.as_dict()
+                for name, metrics in sorted(self.templates.items())
+            }
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+            self.cache = {}
+            self.templates = {}
+
+
+registry = Registry()
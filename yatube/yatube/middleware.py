@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import routers, templating
+from .metrics import registry
+
+logger = logging.getLogger('yatube.metrics')
+
+
+class QueryBudgetExceeded(Exception):
+    """Страница сделала больше запросов, чем разрешено QUERY_BUDGETS"""
+
+
+class QueryCollector:
+    """Обертка execute: считает запросы и время в базе.
+
+    Может стоять на соединениях нескольких баз и потоков
+    (yatube.routers, posts.fanout).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.count += 1
+                self.time += elapsed
+
+
+class InstrumentationMiddleware:
+    """Замеряет время, число и время SQL-запросов каждой страницы.
+
+    Стоит первым в MIDDLEWARE, чтобы учитывать и запросы сессий и
+    аутентификации. Превышение бюджета из QUERY_BUDGETS пишется в лог,
+    а при QUERY_BUDGETS_STRICT - поднимает исключение, и тест падает.
+    При TEMPLATE_PROFILING включает замеры рендера шаблонов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if settings.TEMPLATE_PROFILING:
+            templating.install()
+
+    def __call__(self, request):
+        collector = QueryCollector()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            # Ленты читаются с реплик: запросы считаются во всех базах
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(collector)
+                )
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        if match is None:
+            return response
+        name = match.view_name
+        budget = settings.QUERY_BUDGETS.get(name)
+        over_budget = budget is not None and collector.count > budget
+        registry.record(
+            name,
+            elapsed * 1000,
+            collector.count,
+            collector.time * 1000,
+            over_budget,
+        )
+        if over_budget:
+            message = (
+                f'{name}: {collector.count} запросов к базе '
+                f'при бюджете {budget} ({request.path})'
+            )
+            if settings.QUERY_BUDGETS_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Направляет чтение страниц-лент на реплики (yatube.routers).
+
+    Флаг ставится в process_view, когда известно имя страницы, и
+    снимается по окончании запроса. После записи клиент получает
+    cookie и до ее истечения читает из основной базы.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with routers.replica_reads(False):
+            response = self.get_response(request)
+        match = request.resolver_match
+        if (
+            request.method not in routers.SAFE_METHODS
+            or match is not None
+            and match.view_name in settings.REPLICA_WRITE_VIEWS
+        ):
+            response.set_cookie(
+                routers.PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routers.set_replica(
+            request.method in routers.SAFE_METHODS
+            and request.resolver_match.view_name
+            in settings.REPLICA_READ_VIEWS
+            and routers.PIN_COOKIE not in request.COOKIES
+        )
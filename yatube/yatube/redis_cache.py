@@ -0,0 +1,265 @@
+"""Кеш Django на сервере с протоколом Redis (RESP).
+
+Небольшой клиент без внешних зависимостей: соединение на поток,
+команды GET/SET/MGET/DEL/INCRBY. Целые числа хранятся как есть, чтобы
+incr выполнялся атомарно на сервере (счетчики versioning), остальные
+значения - pickle. LOCATION: redis://host:port/db.
+
+Недоступный сервер при чтении означает промах кеша; запись при
+обрыве бросает исключение, чтобы устаревшее значение не осталось
+незамеченным.
+"""
+import pickle
+import socket
+import threading
+from urllib.parse import urlsplit
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+# Команды без побочных эффектов: их можно повторить после обрыва
+READ_COMMANDS = frozenset(('GET', 'MGET', 'EXISTS'))
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisClient:
+    """Клиент RESP: по соединению на поток, переподключение при обрыве"""
+
+    def __init__(self, location, socket_timeout=1.0):
+        url = urlsplit(location or 'redis://127.0.0.1:6379/0')
+        self.host = url.hostname or '127.0.0.1'
+        self.port = url.port or 6379
+        self.db = int(url.path.strip('/') or 0)
+        self.socket_timeout = socket_timeout
+        self.local = threading.local()
+
+    def connect(self):
+        sock = socket.create_connection(
+            (self.host, self.port), timeout=self.socket_timeout
+        )
+        self.local.sock = sock
+        self.local.reader = sock.makefile('rb')
+        if self.db:
+            self.send([('SELECT', self.db)])
+
+    def close(self):
+        sock = getattr(self.local, 'sock', None)
+        if sock is not None:
+            self.local.reader.close()
+            sock.close()
+            self.local.sock = None
+
+    def execute(self, *args):
+        return self.pipeline([args])[0]
+
+    def pipeline(self, commands):
+        """Отправить команды одним пакетом; вернуть ответы по порядку.
+
+        После обрыва пакет повторяется на новом соединении, только если
+        он не ушел на сервер или состоит из одних чтений: сервер мог
+        выполнить запись до обрыва, и повтор выполнил бы ее дважды.
+        """
+        retry_safe = all(
+            str(command[0]).upper() in READ_COMMANDS for command in commands
+        )
+        for attempt in range(2):
+            try:
+                if getattr(self.local, 'sock', None) is None:
+                    self.connect()
+                self.local.sock.sendall(self.encode_many(commands))
+            except OSError:
+                self.close()
+                if attempt:
+                    raise
+                continue
+            try:
+                return self.read_replies(commands)
+            except (OSError, EOFError):
+                self.close()
+                if attempt or not retry_safe:
+                    raise
+
+    def send(self, commands):
+        self.local.sock.sendall(self.encode_many(commands))
+        return self.read_replies(commands)
+
+    def read_replies(self, commands):
+        replies = [self.read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    def encode_many(self, commands):
+        return b''.join(self.encode(command) for command in commands)
+
+    def encode(self, command):
+        parts = [b'*%d\r\n' % len(command)]
+        for arg in command:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def read_reply(self):
+        line = self.local.reader.readline()
+        if not line:
+            raise EOFError('Сервер закрыл соединение')
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            return RedisError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self.local.reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self.read_reply() for _ in range(length)]
+        raise RedisError(f'Неизвестный ответ сервера: {line!r}')
+
+
+class RedisCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.client = RedisClient(
+            location, socket_timeout=options.get('SOCKET_TIMEOUT', 1.0)
+        )
+
+    def get_ttl_ms(self, timeout=DEFAULT_TIMEOUT):
+        """Срок жизни в миллисекундах; None - бессрочно"""
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        return max(0, int(timeout * 1000))
+
+    def encode(self, value):
+        if type(value) is int:
+            return str(value).encode()
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data):
+        if data is None:
+            return None
+        try:
+            return int(data)
+        except ValueError:
+            return pickle.loads(data)
+
+    def read(self, *command):
+        """Чтение, для которого обрыв соединения - промах кеша"""
+        try:
+            return self.client.execute(*command)
+        except (OSError, EOFError):
+            return None
+
+    def make_and_validate_key(self, key, version=None):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def set_command(self, key, value, timeout, *flags):
+        command = ['SET', key, self.encode(value), *flags]
+        ttl = self.get_ttl_ms(timeout)
+        if ttl is not None:
+            command += ['PX', max(ttl, 1)]
+        return command
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self.get_ttl_ms(timeout) == 0:
+            return False
+        key = self.make_and_validate_key(key, version)
+        return self.client.execute(
+            *self.set_command(key, value, timeout, 'NX')
+        ) is not None
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version)
+        value = self.decode(self.read('GET', key))
+        return default if value is None else value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version)
+        if self.get_ttl_ms(timeout) == 0:
+            self.client.execute('DEL', key)
+            return
+        self.client.execute(*self.set_command(key, value, timeout))
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version)
+        ttl = self.get_ttl_ms(timeout)
+        if ttl is None:
+            self.client.execute('PERSIST', key)
+            return bool(self.client.execute('EXISTS', key))
+        return bool(self.client.execute('PEXPIRE', key, ttl))
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version)
+        self.client.execute('DEL', key)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        made = [self.make_and_validate_key(key, version) for key in keys]
+        values = self.read('MGET', *made) or []
+        return {
+            key: self.decode(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if not data:
+            return []
+        commands = [
+            self.set_command(
+                self.make_and_validate_key(key, version), value, timeout
+            )
+            for key, value in data.items()
+        ]
+        if self.get_ttl_ms(timeout) == 0:
+            commands = [('DEL', command[1]) for command in commands]
+        self.client.pipeline(commands)
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(key, version) for key in keys]
+        if keys:
+            self.client.execute('DEL', *keys)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version)
+        return bool(self.read('EXISTS', key))
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version)
+        # INCRBY создает отсутствующий ключ, а incr Django должен
+        # в этом случае бросить ValueError
+        value = self.client.execute('GET', key)
+        if value is None:
+            raise ValueError(f"Key '{key}' not found")
+        try:
+            int(value)
+        except ValueError:
+            raise ValueError(f"Key '{key}' is not an integer")
+        return self.client.execute('INCRBY', key, delta)
+
+    def clear(self):
+        self.client.execute('FLUSHDB')
+
+    def close(self, **kwargs):
+        # Соединения живут в потоках и переиспользуются между запросами
+        pass
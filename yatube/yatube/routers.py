@@ -0,0 +1,78 @@
+"""Чтение лент с реплик базы данных.
+
+Страницы из REPLICA_READ_VIEWS читают с реплик DATABASE_REPLICAS,
+все остальное - запись и чтение внутри форм - идет в default.
+Флаг хранится в потоке запроса и ставится ReplicaRoutingMiddleware;
+posts.fanout переносит его в свои потоки.
+
+Реплика отстает от основной базы, поэтому после записи (POST или
+страница из REPLICA_WRITE_VIEWS) клиент на REPLICA_PIN_SECONDS
+получает cookie, и его чтение тоже идет в default: автор сразу
+видит свой пост и комментарий.
+"""
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = 'default'
+
+PIN_COOKIE = 'db_pin'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = threading.local()
+
+
+def use_replica():
+    return getattr(_state, 'replica', False)
+
+
+def set_replica(enabled):
+    _state.replica = enabled
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Включить (или выключить) чтение с реплик в текущем потоке"""
+    previous = use_replica()
+    set_replica(enabled)
+    try:
+        yield
+    finally:
+        set_replica(previous)
+
+
+def get_replicas():
+    """Реплики, отличные от основной базы.
+
+    В тестах реплики - зеркала тестовой default (TEST MIRROR), то
+    есть та же база; чтение из default видит и транзакцию теста.
+    """
+    primary = connections[PRIMARY].settings_dict['NAME']
+    return [
+        alias for alias in settings.DATABASE_REPLICAS
+        if connections[alias].settings_dict['NAME'] != primary
+    ]
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if use_replica():
+            replicas = get_replicas()
+            if replicas:
+                return random.choice(replicas)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики - копии default: объекты из них можно связывать
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплик приходит вместе с данными из основной базы
+        return db not in settings.DATABASE_REPLICAS
@@ -4,7 +4,8 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 SECRET_KEY = '*!+9jk#2)r+crha(g1jx$i%hlg9po2a_1%)t4xywb5_((j*k1='
 
-DEBUG = True
+# В продакшене: YATUBE_DEBUG=0
+DEBUG = os.environ.get('YATUBE_DEBUG', '1') == '1'
 
 ALLOWED_HOSTS = [
     "localhost",
@@ -18,6 +19,7 @@ INSTALLED_APPS = [
     'users',
     'posts',
     'about',
+    'benchmarks',
     'django.contrib.staticfiles',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -29,6 +31,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yatube.middleware.InstrumentationMiddleware',
+    'yatube.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -46,12 +50,24 @@ INTERNAL_IPS = [
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    # Разобранные шаблоны живут в памяти процесса: правки файлов
+    # подхватываются только после перезапуска
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         "DIRS": [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -64,13 +80,89 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# Замеры рендера каждого шаблона в yatube.metrics (yatube.templating)
+TEMPLATE_PROFILING = os.environ.get('YATUBE_TEMPLATE_PROFILING') == '1'
+
+# Разобрать все шаблоны при старте воркера WSGI/ASGI, а не на первых
+# запросах; имеет смысл с кеширующим загрузчиком
+TEMPLATE_WARMUP = not DEBUG
+
+# Потоки, в которых yatube.asgi обрабатывает запросы ASGI-сервера
+ASGI_WORKER_THREADS = 8
+
+# PRAGMA для каждого нового соединения (yatube.sqlite_backend):
+# WAL - чтение не ждет запись и наоборот; synchronous=NORMAL в WAL
+# не теряет целостность, только последние транзакции при сбое питания;
+# mmap_size и cache_size (отрицательный - в КиБ) держат горячие
+# страницы в памяти; busy_timeout - сколько мс ждать блокировку записи
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yatube.sqlite_backend',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'PRAGMAS': SQLITE_PRAGMAS,
+        # Соединение переиспользуется запросами потока сервера
+        'CONN_MAX_AGE': int(os.environ.get('YATUBE_DB_CONN_MAX_AGE', 600)),
     }
 }
 
+# Реплики только для чтения, через запятую:
+# YATUBE_DB_REPLICAS=/var/lib/yatube/replica1.sqlite3,...
+# В тестах реплики смотрят в тестовую default
+DATABASE_REPLICAS = []
+
+for number, name in enumerate(
+    filter(None, os.environ.get('YATUBE_DB_REPLICAS', '').split(',')),
+    start=1,
+):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'yatube.sqlite_backend',
+        'NAME': name,
+        # Режим журнала реплики задает тот, кто ее пишет
+        'PRAGMAS': {
+            pragma: value for pragma, value in SQLITE_PRAGMAS.items()
+            if pragma != 'journal_mode'
+        },
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['yatube.routers.ReplicaRouter']
+
+# Страницы, которые читают с реплик
+REPLICA_READ_VIEWS = (
+    'index',
+    'follow_index',
+    'group_posts',
+    'profile',
+    'post_view',
+    'post_comments',
+    'api_index',
+    'api_follow_index',
+    'api_group_posts',
+    'api_profile',
+    'api_post',
+    'rss',
+    'atom',
+    'group_rss',
+    'group_atom',
+    'profile_rss',
+    'profile_atom',
+)
+
+# Страницы-записи, доступные через GET; после них, как и после любого
+# POST, клиент читает из основной базы REPLICA_PIN_SECONDS секунд
+REPLICA_WRITE_VIEWS = ('profile_follow', 'profile_unfollow')
+REPLICA_PIN_SECONDS = 10
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -103,6 +195,15 @@ STATIC_URL = '/static/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
+# Загрузки хранятся под именами из хеша содержимого и не дублируются;
+# миниатюры sorl лежат в обычном хранилище под своими именами
+DEFAULT_FILE_STORAGE = 'yatube.storage.ContentAddressedStorage'
+THUMBNAIL_STORAGE = 'django.core.files.storage.FileSystemStorage'
+
+# gc_media не трогает файлы моложе этого срока: пост с только что
+# загруженной картинкой может быть еще не сохранен
+MEDIA_GC_GRACE_SECONDS = 60 * 60
+
 # Login
 
 LOGIN_URL = "/auth/login/"
@@ -115,8 +216,116 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
+# Cache
+
+# locmem - свой кеш в каждом процессе; file - общий кеш в каталоге;
+# redis - общий кеш на сервере с протоколом Redis (для разработки
+# подойдет python -m yatube.fake_redis)
+CACHE_BACKEND = os.environ.get('YATUBE_CACHE_BACKEND', 'locmem')
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', ''),
+    'file': (
+        'django.core.cache.backends.filebased.FileBasedCache',
+        os.path.join(BASE_DIR, 'cache'),
+    ),
+    'redis': ('yatube.redis_cache.RedisCache', 'redis://127.0.0.1:6379/0'),
+}
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.environ.get(
+            'YATUBE_CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]
+        ),
+        # Общий сервер кеша может обслуживать и другие проекты;
+        # внутри проекта ключи приложений начинаются с его имени
+        'KEY_PREFIX': 'yatube',
     }
 }
+
+# Timeline
+
+# Посты авторов с большим числом подписчиков не раскладываются по лентам,
+# а подтягиваются при чтении
+TIMELINE_FANOUT_LIMIT = 1000
+
+# Сколько последних постов автора попадает в ленту при подписке
+TIMELINE_BACKFILL_SIZE = 200
+
+# Время жизни закешированной ленты; актуальность обеспечивает версия
+# ленты, которую сдвигают изменения постов и комментариев
+FEED_CACHE_TIMEOUT = 60 * 5
+
+# Страницы для гостей кешируются целиком (posts.page_cache): в своем
+# кеше - до сдвига версии страницы, в обратном прокси - на
+# PAGE_CACHE_PROXY_TIMEOUT секунд, дальше прокси перепроверяет ETag
+PAGE_CACHE_TIMEOUT = 60 * 5
+PAGE_CACHE_PROXY_TIMEOUT = 10
+
+# Время жизни отрендеренной карточки поста (posts.cards); правка поста
+# или новый комментарий меняют ключ карточки, а не ждут TTL
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Время жизни постов, групп и пользователей в кеше posts.repository;
+# изменения удаляют записи сигналами, TTL ограничивает только гонки
+REPOSITORY_CACHE_TIMEOUT = 60 * 5
+
+# Число постов в лентах RSS и Atom
+SYNDICATION_ITEMS = 20
+
+# Search
+
+# posts.search.DatabaseSearchBackend - поиск без индекса для других СУБД
+POSTS_SEARCH_BACKEND = 'posts.search.SQLiteFTSBackend'
+
+# Views
+
+# Потоки для параллельных независимых запросов страницы (posts.fanout);
+# 0 - выполнять по очереди
+VIEW_FANOUT_WORKERS = 4
+
+# Буфер записи комментариев и подписок (posts.write_buffer): запросы
+# кладут записи в память процесса, фоновый поток пишет их пачками раз в
+# WRITE_BUFFER_INTERVAL секунд
+WRITE_BUFFER_ENABLED = (
+    os.environ.get('YATUBE_WRITE_BUFFER', '0') == '1'
+)
+WRITE_BUFFER_INTERVAL = 0.2
+
+# Thumbnails
+
+# Потоки фоновой нарезки миниатюр; 0 - резать сразу в запросе
+THUMBNAIL_WORKERS = 2
+
+# Uploads
+
+# Загрузки пишутся во временный файл, а не держатся в памяти
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Ограничения картинки поста: размер файла и число пикселей
+IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+IMAGE_MAX_PIXELS = 40_000_000
+
+# Картинка уменьшается до этой стороны и пересохраняется в IMAGE_FORMAT
+# (WEBP или JPEG; без поддержки WebP в Pillow - JPEG)
+IMAGE_MAX_SIDE = 2048
+IMAGE_FORMAT = 'WEBP'
+
+# Metrics
+
+# Сколько запросов к базе может сделать страница, по имени URL;
+# превышение пишется в лог yatube.metrics
+QUERY_BUDGETS = {
+    'index': 4,
+    'follow_index': 5,
+    'group_posts': 5,
+    'profile': 6,
+    'post_view': 8,
+    'search': 6,
+}
+
+# Поднимать исключение при превышении бюджета вместо записи в лог
+QUERY_BUDGETS_STRICT = False
@@ -0,0 +1,20 @@
+"""SQLite с настройкой каждого нового соединения.
+
+PRAGMA из ключа PRAGMAS настроек базы выполняются сразу после
+открытия соединения, по порядку:
+
+    'PRAGMAS': {'busy_timeout': 5000, 'journal_mode': 'WAL', ...}
+
+busy_timeout стоит ставить первым: переключение журнала тоже ждет
+блокировку. Соединение живет CONN_MAX_AGE секунд, поэтому PRAGMA
+выполняются один раз на соединение, а не на запрос.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get('PRAGMAS', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
@@ -0,0 +1,82 @@
+"""Хранилище файлов с адресацией по содержимому.
+
+Файл сохраняется под именем из SHA-256 своего содержимого:
+posts/ab/abcdef....webp, где posts/ - каталог upload_to. Одинаковая
+картинка, загруженная повторно, не пишется второй раз: пост получает
+имя уже лежащего файла, а sorl находит для него готовые миниатюры.
+
+Файл может быть общим для нескольких постов, поэтому при удалении
+поста он не удаляется; файлы, на которые не ссылается ни один пост,
+убирает команда gc_media.
+"""
+import hashlib
+import os
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def make_directory(self, path):
+        directory = os.path.dirname(path)
+        if self.directory_permissions_mode is not None:
+            # Как в FileSystemStorage: umask не должен урезать права
+            old_umask = os.umask(0)
+            try:
+                os.makedirs(
+                    directory, self.directory_permissions_mode, exist_ok=True
+                )
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+    def write_hashed(self, path, content):
+        """Записать content в path; вернуть SHA-256 записанного"""
+        digest = hashlib.sha256()
+        fd = os.open(
+            path,
+            os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0),
+            0o666,
+        )
+        with open(fd, 'wb') as output:
+            for chunk in content.chunks(CHUNK_SIZE):
+                digest.update(chunk)
+                output.write(chunk)
+        if self.file_permissions_mode is not None:
+            os.chmod(path, self.file_permissions_mode)
+        return digest.hexdigest()
+
+    def _save(self, name, content):
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        # Имя станет известно только после записи: файл пишется рядом
+        # под временным именем и хешируется по ходу, без второго чтения.
+        # Брошенные временные файлы убирает gc_media
+        temp_path = self.path(
+            os.path.join(directory, f'.upload-{uuid.uuid4().hex}')
+        )
+        self.make_directory(temp_path)
+        try:
+            digest = self.write_hashed(temp_path, content)
+            name = os.path.join(directory, digest[:2], f'{digest}{extension}')
+            path = self.path(name)
+            if os.path.exists(path):
+                try:
+                    # gc_media не удаляет файлы моложе grace: повторная
+                    # загрузка защищает файл, пока пост еще не сохранен
+                    os.utime(path)
+                    return name
+                except FileNotFoundError:
+                    # Файл без постов только что удалил gc_media
+                    pass
+            self.make_directory(path)
+            # Тот же файл мог одновременно сохранить другой запрос:
+            # содержимое совпадает, поэтому замена ничего не портит
+            os.replace(temp_path, path)
+            return name
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -0,0 +1,127 @@
+"""Профилирование рендера шаблонов и прогрев кеша загрузчика.
+
+При TEMPLATE_PROFILING каждый рендер шаблона - страницы, базового
+шаблона из {% extends %} и каждого {% include %} - замеряется и
+попадает в yatube.metrics: полное время, собственное время без
+вложенных шаблонов и то, откуда шаблон подключен. Так видно, что
+include/post_card.html, рендеримый для каждого поста, стоит
+странице больше, чем сама страница.
+
+warm() заранее разбирает все шаблоны проекта и приложений, чтобы
+кеширующий загрузчик процесса был заполнен до первого запроса.
+"""
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.base import Template
+from django.template.loader import get_template
+from django.template.loader_tags import IncludeNode
+from django.template.utils import get_app_template_dirs
+
+from .metrics import registry
+
+# Остальные файлы в каталогах шаблонов (картинки) не разбираются
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+_state = threading.local()
+_original_render = None
+_original_include = None
+_install_lock = threading.Lock()
+
+
+def template_name(template):
+    return template.origin.template_name or template.name or '<string>'
+
+
+def profiled_render(self, context):
+    stack = getattr(_state, 'stack', None)
+    if stack is None:
+        stack = _state.stack = []
+    parent = stack[-1] if stack else None
+    # {% include %} внутри {% block %} рендерится внутри базового
+    # шаблона, но записывается на шаблон, в тексте которого стоит
+    parent_name = getattr(_state, 'include_origin', None) or (
+        parent['name'] if parent is not None else None
+    )
+    _state.include_origin = None
+    frame = {'name': template_name(self), 'children_time': 0.0}
+    stack.append(frame)
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        stack.pop()
+        if parent is not None:
+            parent['children_time'] += elapsed
+        registry.record_template(
+            frame['name'],
+            parent_name,
+            elapsed * 1000,
+            (elapsed - frame['children_time']) * 1000,
+        )
+
+
+def profiled_include(self, context):
+    previous = getattr(_state, 'include_origin', None)
+    _state.include_origin = self.origin.template_name
+    try:
+        return _original_include(self, context)
+    finally:
+        _state.include_origin = previous
+
+
+def install():
+    """Включить замеры рендера шаблонов в процессе"""
+    global _original_render, _original_include
+    with _install_lock:
+        if _original_render is None:
+            _original_render = Template._render
+            _original_include = IncludeNode.render
+            Template._render = profiled_render
+            IncludeNode.render = profiled_include
+
+
+def uninstall():
+    global _original_render, _original_include
+    with _install_lock:
+        if _original_render is not None:
+            Template._render = _original_render
+            IncludeNode.render = _original_include
+            _original_render = _original_include = None
+
+
+def template_names():
+    """Имена всех шаблонов из каталогов проекта и приложений"""
+    directories = []
+    for engine in settings.TEMPLATES:
+        directories += engine.get('DIRS', [])
+    directories += get_app_template_dirs('templates')
+    names = set()
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for filename in files:
+                if not filename.endswith(TEMPLATE_EXTENSIONS):
+                    continue
+                path = os.path.join(root, filename)
+                names.add(os.path.relpath(path, directory).replace(
+                    os.sep, '/'
+                ))
+    return sorted(names)
+
+
+def warm():
+    """Разобрать все шаблоны; вернуть число разобранных и ошибки"""
+    loaded = 0
+    errors = []
+    for name in template_names():
+        try:
+            get_template(name)
+        except (TemplateDoesNotExist, TemplateSyntaxError) as error:
+            errors.append((name, error))
+        else:
+            loaded += 1
+    return loaded, errors
@@ -3,10 +3,14 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from . import views
+
 urlpatterns = [
     path("auth/", include("users.urls")),
     path("auth/", include("django.contrib.auth.urls")),
     path("admin/", admin.site.urls),
+    path("internal/metrics/", views.metrics, name="metrics"),
+    path("api/v1/", include("posts.api_urls")),
     path("", include("posts.urls")),
     path("about/", include("about.urls")),
 ]